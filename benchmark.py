@@ -0,0 +1,437 @@
+import numpy as np
+import pandas as pd
+import argparse
+import contextlib
+import datetime
+import http.server
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import seaborn as sns
+import covid_counties as cc
+import covid_graphs as cg
+import covid_stats as cs
+import synthetic
+
+""" Benchmarks for the Stats and Graph hot paths.  Import time of
+covid_stats and covid_graphs is measured in fresh interpreters.  Every
+other benchmark runs over the bundled CSV snapshots and, with --scales,
+over inputs holding several copies of every state, either copied from the
+snapshot or generated by synthetic.py (--source synthetic).  The
+vaccination API is replaced by a local HTTP stub so nothing leaves the
+machine.  Wall time, CPU time and tracemalloc peak are written as JSON so
+results can be compared across versions, e.g.
+
+    python benchmark.py --scales 1 2 --repeat 3 --out bench_results.json """
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+VIEWS = ['info', 'monthly', 'rolling', 'bump', 'averages', 'totals', 'cfrir', 'vax', 'grid', 'gridmonthly', 'heatmap']
+
+def vaxRecords():
+    """Generates CDC API records matching the bundled 'popvaxxed.csv'
+
+    Returns:
+        records (list):  one dictionary per location, including the
+        extra location Stats.vax() drops
+    """
+
+    popvaxxed = pd.read_csv(os.path.join(HERE, 'popvaxxed.csv'))
+    locations = popvaxxed['abbr'].tolist()+['MH']
+    vaccinated = popvaxxed['fully_vaccinated'].tolist()+[0]
+
+    return [{'date':'2022-08-25T00:00:00.000', 'location':loc, 'series_complete_yes':str(num)}
+            for loc, num in zip(locations, vaccinated)]
+
+def stubServer():
+    """Starts a local HTTP server standing in for the CDC vaccination API
+
+    Side effects:
+        the server runs in a daemon thread until shutdown() is called
+
+    Returns:
+        server (ThreadingHTTPServer):  running server, call shutdown()
+        url (str):  address to use in place of the CDC URL
+    """
+
+    body = json.dumps(vaxRecords()).encode()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server, "http://127.0.0.1:%d/unsk-b7fc.json" % server.server_address[1]
+
+def scaledInputs(directory, scale):
+    """Writes input CSV files holding 'scale' copies of every state
+
+    Copies are named after the state with a number appended, e.g.
+    'Maryland 2', and get matching population, area and abbreviation rows.
+
+    Args:
+        directory (str):  folder the CSV files are written to
+        scale (int):  number of copies of every state
+
+    Side effects:
+        the states, population, area and abbreviation files are written
+        to directory
+
+    Returns:
+        paths (list):  paths of the states, population, area and
+        abbreviation files, in the order used by Stats.data
+    """
+
+    states = pd.read_csv(os.path.join(HERE, 'us-states.csv'))
+    pop = pd.read_csv(os.path.join(HERE, 'nst-est2020.csv'), dtype={'SUMLEV':str, 'STATE':str})
+    sqmi = pd.read_csv(os.path.join(HERE, 'states-sqmi20.csv'))
+    abbr = pd.read_csv(os.path.join(HERE, 'abbr.csv'))
+
+    statesLst, popLst, sqmiLst, abbrLst = [states], [pop], [sqmi], [abbr]
+    stateRows = pop[pop['SUMLEV'] == '040']
+    for copy in range(2, scale+1):
+        suffix = " "+str(copy)
+        statesLst.append(states.assign(state=states['state']+suffix))
+        popLst.append(stateRows.assign(NAME=stateRows['NAME']+suffix))
+        sqmiLst.append(sqmi.assign(states=sqmi['states']+suffix))
+        abbrLst.append(abbr.assign(abbr=abbr['abbr']+str(copy), full_name=abbr['full_name']+suffix))
+
+    paths = []
+    for name, frames in [('us-states.csv', statesLst), ('nst-est2020.csv', popLst),
+                         ('states-sqmi20.csv', sqmiLst), ('abbr.csv', abbrLst)]:
+        path = os.path.join(directory, name)
+        pd.concat(frames, ignore_index=True).to_csv(path, index=False)
+        paths.append(path)
+
+    return paths
+
+def measure(fn, setup=None, repeat=3, memory=True):
+    """Times a function and records its peak memory
+
+    Args:
+        fn (function):  code being measured
+        setup (function):  optional code run before every call, not timed
+        repeat (int):  number of timed calls
+        memory (bool):  runs one extra call under tracemalloc when True
+
+    Returns:
+        result (dict):  wall and CPU seconds of every call, their minimum
+        and median, and the tracemalloc peak of one extra call in KiB
+    """
+
+    walls, cpus = [], []
+    for num in range(repeat):
+        if setup is not None:
+            setup()
+        wall, cpu = time.perf_counter(), time.process_time()
+        fn()
+        walls.append(time.perf_counter()-wall)
+        cpus.append(time.process_time()-cpu)
+
+    peak = None
+    if memory:
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        fn()
+        peak = round(tracemalloc.get_traced_memory()[1]/1024, 1)
+        tracemalloc.stop()
+
+    return {'wall':walls, 'wall_min':min(walls), 'wall_median':statistics.median(walls),
+            'cpu_median':statistics.median(cpus), 'peak_kib':peak}
+
+def drawAll():
+    """Renders and closes every open figure, the way a notebook would"""
+
+    for num in plt.get_fignums():
+        plt.figure(num).canvas.draw()
+    plt.close('all')
+
+class Bench:
+    """ Objects shared by the benchmarks of one set of inputs, built once
+        before any of them is timed.
+
+        Attributes:
+            data (list):  list of CSV files and URL links for Stats
+            state (str):  abbreviation of the US state being reported
+            window (tuple):  currmo, lastmo, curryear, lastyear
+            counties (str):  'us-counties.csv' or None
+            stats (Stats):  Stats object over the inputs
+            graph (Graph):  Graph of stats
+            newDF (DataFrame):  stats.getDF()
+            datesDF (DataFrame):  daily cases and deaths of the state
+            rollup (Rollup):  rollup of stats
+            rollupSpan (tuple):  date range of the window on the rollup
+            store (CountyStore):  store of 'counties', None without it
+            span (tuple):  date range of the window on the store
+            fips (int):  FIPS code of the first county of the state
+            axes (Axes):  line plot drawn by self.lineAxes()
+
+        """
+
+    def __init__(self, data, state, window, counties=None):
+        self.data = data
+        self.state = state
+        self.window = window
+        self.counties = counties
+        self.stats = self.build()
+        self.graph = cg.Graph(self.stats.allstats)
+        self.newDF = self.stats.getDF()
+        self.datesDF = self.stats.datesDF
+        self.rollup = self.stats.rollup()
+        self.rollupSpan = self.rollup.window(*window)
+        self.y = self.datesDF['cases'].to_numpy()
+        self.xs = np.arange(len(self.y))
+        self.allVal = np.column_stack([self.xs, self.y])
+        self.axes = None
+
+        self.store, self.span, self.fips = None, None, None
+        if counties is not None:
+            self.store = cc.CountyStore.load(counties, 'county_store')
+            self.span = self.store.window(*window)
+            self.fips = int(self.store.countyTable(self.span, self.stats.state)['fips'].iloc[0])
+
+    def build(self):
+        """Builds a new Stats object over the inputs"""
+
+        currmo, lastmo, curryear, lastyear = self.window
+        return cg.Stats(state=self.state, currmo=currmo, lastmo=lastmo,
+                        curryear=curryear, lastyear=lastyear, data=self.data)
+
+    def clear(self, *names):
+        """Empties the Stats memos and removes the named daily CSV caches,
+        e.g. 'df.csv'"""
+
+        today = datetime.date.today().isoformat()
+        cg.Stats.frames.clear()
+        cg.Stats.windows.clear()
+        cg.Stats.rollups.clear()
+        cg.Stats.populations.clear()
+        for name in names:
+            if os.path.exists(today+"_"+name):
+                os.remove(today+"_"+name)
+
+    def resetStats(self):
+        """Undoes what startProgram() leaves on self.stats"""
+
+        self.stats.state = self.state
+        self.stats.series = None
+
+    def lineAxes(self):
+        """Draws the daily cases as pretty_graph() gets them"""
+
+        plt.close('all')
+        self.graph.context.apply()
+        plt.figure(figsize=(40,20))
+        self.axes = sns.lineplot(data=self.datesDF, y='cases', x='date', linewidth=7, color='black')
+
+# every benchmark in the order they run: name, code timed, code run
+# before every call (None when nothing) and smallest scale, both taking
+# the Bench of the inputs; new benchmarks are added here.  The 'county'
+# ones also need a county file, which synthetic.py writes above scale 1
+
+BENCHMARKS = [
+    ('getDF (cold)', lambda b: b.stats.getDF(), lambda b: b.clear('df.csv'), 1),
+    ('getDF (cached)', lambda b: b.stats.getDF(), lambda b: b.clear(), 1),
+    ('getDF (memo)', lambda b: b.stats.getDF(), None, 1),
+    ('all_time (cold)', lambda b: b.stats.all_time(), lambda b: b.clear('bothDF.csv'), 1),
+    ('all_time (cached)', lambda b: b.stats.all_time(), None, 1),
+    ('vax (stub)', lambda b: b.stats.vax(), lambda b: b.clear('popvaxxed.csv'), 1),
+    ('vax (cached)', lambda b: b.stats.vax(), None, 1),
+    ('calculateDF', lambda b: b.stats.calculateDF(b.newDF, b.stats.state), None, 1),
+    ('startProgram', lambda b: b.stats.startProgram(), lambda b: (b.clear(), b.stats.getDF(), b.resetStats()), 1),
+    ('startProgram (memo)', lambda b: b.stats.startProgram(), lambda b: b.resetStats(), 1),
+    ('monthlyStats', lambda b: b.stats.monthlyStats(), None, 1),
+    ('loadData (cold)', lambda b: b.build(), lambda b: b.clear('df.csv', 'bothDF.csv', 'popvaxxed.csv'), 1),
+    ('loadData (cached)', lambda b: b.build(), lambda b: b.clear(), 1),
+    ('loadData (memo)', lambda b: b.build(), None, 1),
+    ('populationTable', lambda b: b.stats.populationTable(), lambda b: cg.Stats.populations.clear(), 1),
+    ('rollup', lambda b: b.stats.rollup(), lambda b: cg.Stats.rollups.clear(), 1),
+    ('rollup table', lambda b: [b.rollup.table(level, b.rollupSpan) for level in ['state', 'division', 'region', 'nation']],
+     None, 1),
+    ('sweep', lambda b: b.rollup.sweep('state'), None, 1),
+    ('getPoints', lambda b: b.graph.getPoints(b.allVal, b.y.min(), b.y.max(), b.xs, b.y), None, 1),
+    ('pretty_graph', lambda b: (b.graph.pretty_graph(b.axes, b.datesDF, 'date', 'cases'), drawAll()),
+     lambda b: b.lineAxes(), 1),
+    ('TimePyramid', lambda b: cs.TimePyramid.of(b.graph.data), lambda b: cs.TimePyramid.built.clear(), 1),
+    ('waves', lambda b: b.graph.data.waves('cases'), lambda b: cs.Waves.built.clear(), 1),
+    ('similarity', lambda b: b.graph.data.similarity().order(), lambda b: cs.Similarity.built.clear(), 1),
+    ('DeathLag', lambda b: cs.DeathLag.of(b.stats.series, key=b.stats.windowKey()),
+     lambda b: cs.DeathLag.built.clear(), 1),
+    ('DataQuality', lambda b: cs.DataQuality.of(b.newDF, b.stats.dataKey()).summary(),
+     lambda b: cs.DataQuality.built.clear(), 1),
+    *[('DataQuality '+policy, lambda b, policy=policy: cs.DataQuality.of(b.newDF, b.stats.dataKey()).correct(policy),
+       lambda b: cs.DataQuality.of(b.newDF, b.stats.dataKey()).corrected.clear(), 1)
+      for policy in ['clip', 'redistribute']],
+    *[('getGraph '+view, lambda b, view=view: (b.graph.getGraph(view), drawAll()), None, 1) for view in VIEWS],
+    ('getGraph info (pyramid)', lambda b: (b.graph.getGraph('info', downsample='pyramid', points=60), drawAll()),
+     None, 1),
+    ('county ingest', lambda b: cc.CountyStore.build(b.counties, 'county_ingest'), None, 2),
+    ('county table', lambda b: b.store.countyTable(b.span), None, 2),
+    ('county report', lambda b: b.store.report(b.fips, b.span), None, 2),
+    ('county similarity', lambda b: b.stats.rollup(b.store).similarity('county', b.rollupSpan).order(), None, 2),
+]
+
+def benchmarks(data, state, window, counties=None, scale=1):
+    """Builds the list of benchmarks for one set of inputs from
+    BENCHMARKS
+
+    Args:
+        data (list):  list of CSV files and URL links for Stats
+        state (str):  abbreviation of the US state being reported
+        window (tuple):  currmo, lastmo, curryear, lastyear
+        counties (str):  optional 'us-counties.csv' for the CountyStore
+        benchmarks
+        scale (int):  copies of every state in the inputs
+
+    Returns:
+        cases (list):  (name, function, setup) tuples
+    """
+
+    bench = Bench(data, state, window, counties)
+    cases = []
+    for name, fn, setup, smallest in BENCHMARKS:
+        if scale < smallest or (name.startswith('county') and bench.store is None):
+            continue
+        cases.append((name, lambda fn=fn: fn(bench), None if setup is None else lambda setup=setup: setup(bench)))
+
+    return cases
+
+def importTime(module, repeat=3):
+    """Times a fresh import of a module with 'python -X importtime'
+
+    Args:
+        module (str):  module name, e.g. 'covid_stats'
+        repeat (int):  number of fresh interpreters
+
+    Returns:
+        result (dict):  cumulative import seconds of every run, their
+        minimum and median, and the heavy optional libraries the import
+        loaded
+    """
+
+    code = ("import sys, %s; print(' '.join(name for name in ('matplotlib', 'seaborn', 'requests', 'IPython') "
+            "if name in sys.modules))" % module)
+    walls = []
+    for num in range(repeat):
+        run = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=HERE,
+                             capture_output=True, text=True, check=True)
+        for line in run.stderr.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == module:
+                walls.append(int(fields[1])/1000000)
+
+    return {'wall':walls, 'wall_min':min(walls), 'wall_median':statistics.median(walls),
+            'cpu_median':None, 'peak_kib':None, 'loaded':run.stdout.split()}
+
+def gitVersion():
+    """Returns the current git commit, None outside a git checkout"""
+
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    """Runs the benchmarks picked on the command line
+
+    Args:
+        argv (list):  command line arguments, sys.argv by default
+
+    Side effects:
+        progress is printed to stderr and the results are written to
+        the JSON file named by --out
+    """
+
+    parser = argparse.ArgumentParser(description="Times the Stats and Graph hot paths and writes the results as JSON.")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 2],
+                        help="copies of every state in the synthetic inputs, 1 is the bundled snapshot")
+    parser.add_argument('--source', choices=['copies', 'synthetic'], default='copies',
+                        help="scaled inputs copy the bundled snapshot or come from synthetic.py")
+    parser.add_argument('--counties', type=int, default=0,
+                        help="counties per state written by synthetic.py, only with --source synthetic")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--state', default='MD')
+    parser.add_argument('--window', type=int, nargs=4, default=[1, 6, 22, 20],
+                        metavar=('CURRMO', 'LASTMO', 'CURRYEAR', 'LASTYEAR'))
+    parser.add_argument('--only', nargs='+', help="run only benchmarks whose name starts with one of these")
+    parser.add_argument('--skip-memory', action='store_true', help="skip the tracemalloc run, which is slow")
+    parser.add_argument('--out', default='bench_results.json')
+    args = parser.parse_args(argv)
+
+    out = os.path.abspath(args.out)
+    server, url = stubServer()
+    cg.RenderContext.default = cg.RenderContext(watermark=os.path.join(HERE, 'watermarkMAR.png'))
+    results = []
+    start = os.getcwd()
+
+    for module in ['covid_stats', 'covid_graphs']:
+        name = 'import '+module
+        if args.only and not name.startswith(tuple(args.only)):
+            continue
+        result = importTime(module, args.repeat)
+        result.update({'name':name, 'scale':None, 'rows':None})
+        results.append(result)
+        print("%-24s      %9.4f s  loads %s" % (name, result['wall_median'], ", ".join(result['loaded']) or "nothing"),
+              file=sys.stderr)
+
+    try:
+        for scale in args.scales:
+            with tempfile.TemporaryDirectory() as work:
+                os.chdir(work)
+                if args.source == 'synthetic' and scale > 1:
+                    paths = synthetic.generate(work, copies=scale, counties=args.counties, end='2023-03-23')
+                    states, pop, sqmi, abbr = [paths[name] for name in ['us-states.csv', 'nst-est2020.csv',
+                                                                         'states-sqmi20.csv', 'abbr.csv']]
+                    counties = paths.get('us-counties.csv')
+                else:
+                    states, pop, sqmi, abbr = scaledInputs(work, scale)
+                    counties = None
+                rows = sum(1 for line in open(states))-1
+                data = [states, pop, sqmi, url, abbr]
+                with contextlib.redirect_stdout(io.StringIO()):
+                    cases = benchmarks(data, args.state, tuple(args.window), counties, scale)
+                for name, fn, setup in cases:
+                    if args.only and not name.startswith(tuple(args.only)):
+                        continue
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        result = measure(fn, setup, args.repeat, not args.skip_memory)
+                    result.update({'name':name, 'scale':scale, 'rows':rows})
+                    results.append(result)
+                    print("%-24s x%-3d %9.4f s  %s KiB" % (name, scale, result['wall_median'], result['peak_kib']),
+                          file=sys.stderr)
+                os.chdir(start)
+    finally:
+        os.chdir(start)
+        server.shutdown()
+
+    meta = {'commit':gitVersion(), 'python':platform.python_version(), 'numpy':np.__version__,
+            'pandas':pd.__version__, 'matplotlib':matplotlib.__version__, 'source':args.source,
+            'date':datetime.datetime.now().isoformat(timespec='seconds'),
+            'state':args.state, 'window':args.window, 'repeat':args.repeat}
+    with open(out, 'w') as f:
+        json.dump({'meta':meta, 'results':results}, f, indent=1)
+    print("Results written to "+out, file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,483 @@
+import numpy as np
+import pandas as pd
+import datetime
+import json
+import os
+import shutil
+import tempfile
+
+""" County-level COVID-19 statistics from the New York Times
+'us-counties.csv'.  The file is read once, in chunks, into a CountyStore
+of compact arrays partitioned by state FIPS code; reports and rankings
+for any date range are then read from the store. """
+
+class CountyStore:
+    """ Cumulative county counts over one shared date axis, saved as one
+        folder per state FIPS code.
+
+        For every county the store keeps its cumulative cases and deaths
+        carried forward over days without a report, and the running
+        number of days reported, all as [county, day] arrays.  Totals and
+        averages over any date range are then two lookups per county.
+        The 'all' folder holds the same arrays of every county as [day,
+        county] arrays, so the totals of every county over a date range
+        are two rows and tables never open the state folders.
+
+        Attributes:
+            directory (str):  folder holding the store
+            start (numpy datetime64):  first date of the date axis
+            days (int):  number of days on the date axis
+            states (dict):  state FIPS code keyed by state name
+            partitions (dict):  arrays of every partition loaded so far,
+            keyed by state FIPS code
+            every (dict):  arrays of the 'all' folder once loaded, see
+            self.everyCounty()
+
+        """
+
+    version = 2
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        self.start = np.datetime64(self.manifest['start'], 'D')
+        self.days = self.manifest['days']
+        self.states = self.manifest['states']
+        self.partitions = {}
+        self.every = None
+
+    @classmethod
+    def load(cls, path, directory='county_store', chunksize=500000):
+        """Method that opens the store of a county file, building it
+        first when it is missing or older than the file
+
+        Args:
+            path (str):  location of 'us-counties.csv'
+            directory (str):  folder holding the store
+            chunksize (int):  rows read at a time while building
+
+        Returns:
+            store (CountyStore):  store of the file
+        """
+
+        info = os.stat(path)
+        source = {'path':os.path.abspath(path), 'size':info.st_size, 'mtime':info.st_mtime}
+        try:
+            with open(os.path.join(directory, "manifest.json")) as f:
+                manifest = json.load(f)
+            if manifest['source'] == source and manifest['version'] == cls.version:
+                return cls(directory)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        cls.build(path, directory, chunksize)
+
+        return cls(directory)
+
+    @classmethod
+    def build(cls, path, directory='county_store', chunksize=500000):
+        """Method that streams a county file into a new store
+
+        Each chunk is cut down to four integer columns and appended to a
+        spill file of its state, so only one chunk is held while reading.
+        The states are then built one at a time from their spill files,
+        so memory grows with the largest state, not with the whole file,
+        and copied into the 'all' folder through memory-mapped files.
+        Counties without a FIPS code, such as "New York City" or
+        "Unknown", get negative codes and are filed under their state.
+
+        Args:
+            path (str):  location of 'us-counties.csv'
+            directory (str):  folder the store is written to
+            chunksize (int):  rows read at a time
+
+        Side effects:
+            replaces the store in directory
+
+        Returns:
+            directory (str):  folder of the new store
+        """
+
+        names = {}
+        others = {}
+        stateCodes = {}
+        first, last = None, None
+
+        os.makedirs(directory, exist_ok=True)
+        spill = tempfile.mkdtemp(prefix="spill", dir=directory)
+        spills = {}
+
+        reader = pd.read_csv(path, chunksize=chunksize, usecols=['date','county','state','fips','cases','deaths'],
+                             dtype={'county':str, 'state':str, 'fips':'float64', 'cases':'float64',
+                                    'deaths':'float64'})
+        for chunk in reader:
+            fips = chunk['fips'].to_numpy()
+            missing = np.isnan(fips)
+            keys = np.where(missing, 0, fips).astype('int64')
+            if missing.any():
+                pairs = list(zip(chunk['state'].to_numpy()[missing], chunk['county'].to_numpy()[missing]))
+                for pair in set(pairs):
+                    others.setdefault(pair, -(len(others)+1))
+                keys[missing] = [others[pair] for pair in pairs]
+
+            firsts = chunk.assign(key=keys).drop_duplicates('key')
+            for key, county, state in zip(firsts['key'], firsts['county'], firsts['state']):
+                names.setdefault(int(key), (county, state))
+                if key > 0:
+                    stateCodes.setdefault(state, int(key//1000))
+
+            day = pd.to_datetime(chunk['date'], format='%Y-%m-%d').to_numpy().astype('datetime64[D]').astype('int32')
+            first = int(day.min()) if first is None else min(first, int(day.min()))
+            last = int(day.max()) if last is None else max(last, int(day.max()))
+            records = np.column_stack([day, keys.astype('int32'),
+                                       np.nan_to_num(chunk['cases'].to_numpy(), nan=-1).astype('int32'),
+                                       np.nan_to_num(chunk['deaths'].to_numpy(), nan=-1).astype('int32')])
+
+            # counties with a FIPS code are filed by code, the others by
+            # state name until the code of their state is known
+            groups = (keys//1000).astype(str).astype(object)
+            groups[missing] = chunk['state'].to_numpy()[missing]
+            index, found = pd.factorize(groups)
+            order = np.argsort(index, kind='stable')
+            bounds = np.searchsorted(index[order], np.arange(len(found)+1))
+            for num, group in enumerate(found):
+                if group not in spills:
+                    spills[group] = os.path.join(spill, "%d.bin" % len(spills))
+                with open(spills[group], 'ab') as f:
+                    records[order[bounds[num]:bounds[num+1]]].tofile(f)
+
+        days = last-first+1
+        partitions = {}
+        for group in spills:
+            code = int(group) if group.isdigit() else stateCodes.get(group, 0)
+            partitions.setdefault(code, []).append(spills[group])
+
+        counties = 0
+        everyFips, everyNames = [], []
+        for code in sorted(partitions):
+            records = np.concatenate([np.fromfile(file, dtype='int32').reshape(-1, 4)
+                                      for file in partitions[code]])
+            keys, row = np.unique(records[:, 1], return_inverse=True)
+            day = records[:, 0]-first
+
+            cases = np.full((len(keys), days), -1, dtype='int32')
+            cases[row, day] = records[:, 2]
+            deaths = np.full((len(keys), days), -1, dtype='int32')
+            deaths[row, day] = records[:, 3]
+            del records
+
+            reported = np.cumsum(cases >= 0, axis=1, dtype='int32')
+            cases = cls.carry(cases)
+            deaths = cls.carry(deaths)
+
+            folder = os.path.join(directory, "%02d" % code)
+            os.makedirs(folder, exist_ok=True)
+            np.save(os.path.join(folder, "fips.npy"), keys.astype('int32'))
+            np.save(os.path.join(folder, "cases.npy"), cases)
+            np.save(os.path.join(folder, "deaths.npy"), deaths)
+            np.save(os.path.join(folder, "reported.npy"), reported)
+            with open(os.path.join(folder, "names.json"), 'w') as f:
+                json.dump([names[int(key)] for key in keys], f)
+            everyFips.append(keys.astype('int32'))
+            everyNames += [names[int(key)] for key in keys]
+            counties += len(keys)
+
+        shutil.rmtree(spill)
+
+        folder = os.path.join(directory, "all")
+        os.makedirs(folder, exist_ok=True)
+        np.save(os.path.join(folder, "fips.npy"), np.concatenate(everyFips))
+        with open(os.path.join(folder, "names.json"), 'w') as f:
+            json.dump(everyNames, f)
+        for name in ['cases', 'deaths', 'reported']:
+            every = np.lib.format.open_memmap(os.path.join(folder, name+".npy"), mode='w+', dtype='int32',
+                                              shape=(days, counties))
+            column = 0
+            for code in sorted(partitions):
+                values = np.load(os.path.join(directory, "%02d" % code, name+".npy"), mmap_mode='r')
+                every[:, column:column+len(values)] = values.T
+                column += len(values)
+            every.flush()
+            del every
+
+        info = os.stat(path)
+        manifest = {'version':cls.version,
+                    'source':{'path':os.path.abspath(path), 'size':info.st_size, 'mtime':info.st_mtime},
+                    'start':str(np.datetime64(first, 'D')), 'days':days, 'counties':counties,
+                    'states':stateCodes, 'partitions':sorted(partitions)}
+        with open(os.path.join(directory, "manifest.json"), 'w') as f:
+            json.dump(manifest, f, indent=1)
+
+        return directory
+
+    @staticmethod
+    def carry(values):
+        """Method that carries cumulative counts forward over days
+        without a report
+
+        Args:
+            values (numpy array):  [county, day] counts, -1 where missing
+
+        Returns:
+            values (numpy array):  counts with each missing day holding
+            the last report before it, 0 before the first report
+        """
+
+        held = np.where(values >= 0, np.arange(values.shape[1]), -1)
+        np.maximum.accumulate(held, axis=1, out=held)
+        filled = np.take_along_axis(values, np.maximum(held, 0), axis=1)
+        filled[held < 0] = 0
+
+        return filled
+
+    def partition(self, code):
+        """Method that loads the arrays of one state
+
+        Args:
+            code (int):  state FIPS code
+
+        Side effects:
+            the arrays are memory-mapped and kept in self.partitions
+
+        Returns:
+            partition (dict):  'fips', 'names', 'cases', 'deaths' and
+            'reported' of every county in the state
+        """
+
+        if code not in self.partitions:
+            folder = os.path.join(self.directory, "%02d" % code)
+            partition = {name:np.load(os.path.join(folder, name+".npy"), mmap_mode='r')
+                         for name in ['fips', 'cases', 'deaths', 'reported']}
+            with open(os.path.join(folder, "names.json")) as f:
+                partition['names'] = json.load(f)
+            self.partitions[code] = partition
+
+        return self.partitions[code]
+
+    def everyCounty(self):
+        """Method that loads the arrays of every county
+
+        Side effects:
+            the arrays are memory-mapped and kept in self.every
+
+        Returns:
+            every (dict):  'fips', 'names', and [day, county] 'cases',
+            'deaths' and 'reported' of every county, in the order of the
+            partitions
+        """
+
+        if self.every is None:
+            folder = os.path.join(self.directory, "all")
+            self.every = {name:np.load(os.path.join(folder, name+".npy"), mmap_mode='r')
+                          for name in ['fips', 'cases', 'deaths', 'reported']}
+            with open(os.path.join(folder, "names.json")) as f:
+                self.every['names'] = json.load(f)
+
+        return self.every
+
+    def window(self, currmo, lastmo, curryear=22, lastyear=22):
+        """Method that turns a Stats date range into positions on the
+        date axis
+
+        Args:
+            currmo, lastmo, curryear, lastyear (int):  see Stats
+
+        Returns:
+            first (int):  position of the first day of 'lastmo', or of
+            the first day of data
+            last (int):  position of the last day of 'currmo', or of the
+            last day of data
+        """
+
+        begin = np.datetime64(datetime.date(2000+lastyear, lastmo, 1), 'D')
+        end = np.datetime64(datetime.date(2000+curryear, currmo, 1), 'M')+1
+        first = int(max((begin-self.start).astype('int64'), 0))
+        last = int(min((end.astype('datetime64[D]')-self.start).astype('int64')-1, self.days-1))
+
+        return first, last
+
+    def countyTable(self, window, state=None):
+        """Generates the statistics of every county over a date range
+
+        Args:
+            window (tuple):  first and last position, see self.window()
+            state (str):  optional name of US state keeping only its
+            counties; ranks are always among every county, read from
+            two rows of the 'all' folder, see self.everyCounty()
+
+        Returns:
+            countyDF (DataFrame):  one row per county with its totals,
+            daily averages and case fatality ratio, with its rank in its
+            state and in the country, 1 being the highest value
+        """
+
+        first, last = window
+        every = self.everyCounty()
+        values = {}
+        for name in ['cases', 'deaths', 'reported']:
+            values[name] = np.asarray(every[name][last], dtype='int64')
+            if first > 0:
+                values[name] = values[name]-every[name][first-1]
+
+        countyDF = pd.DataFrame({'fips':np.asarray(every['fips']),
+                                 'county':[name[0] for name in every['names']],
+                                 'state':[name[1] for name in every['names']],
+                                 'total_cases':values['cases'], 'total_deaths':values['deaths'],
+                                 'days':values['reported']})
+        countyDF = countyDF[countyDF['days'] > 0].reset_index(drop=True)
+        countyDF['avg_cases'] = (countyDF['total_cases']/countyDF['days']).round(2)
+        countyDF['avg_deaths'] = (countyDF['total_deaths']/countyDF['days']).round(2)
+        countyDF['cfr'] = (countyDF['total_deaths']/countyDF['total_cases'].where(countyDF['total_cases'] > 0)*100).round(3)
+        for col in ['total_cases', 'total_deaths', 'avg_cases', 'avg_deaths', 'cfr']:
+            countyDF[col+'_rank'] = countyDF[col].rank(ascending=False, method='first').astype('Int64')
+            countyDF[col+'_state_rank'] = (countyDF.groupby('state')[col]
+                                           .rank(ascending=False, method='first').astype('Int64'))
+        if state is not None:
+            countyDF = countyDF[countyDF['state'] == state].reset_index(drop=True)
+
+        return countyDF
+
+    def locate(self, fips):
+        """Method that finds the partition and row of a county
+
+        Args:
+            fips (int):  county FIPS code
+
+        Raises:
+            KeyError when the county is not in the store
+
+        Returns:
+            part (dict):  partition of the county, see self.partition()
+            row (int):  row of the county in the partition
+        """
+
+        if fips > 0:
+            codes = [fips//1000]
+        else:
+            # counties without a FIPS code are filed under their state
+            every = self.everyCounty()
+            rows = np.flatnonzero(np.asarray(every['fips']) == fips)
+            codes = [self.states.get(every['names'][rows[0]][1], 0)] if len(rows) else []
+        for code in codes:
+            if code in self.manifest['partitions']:
+                part = self.partition(code)
+                rows = np.flatnonzero(np.asarray(part['fips']) == fips)
+                if len(rows):
+                    return part, int(rows[0])
+
+        raise KeyError("county "+str(fips)+" not found")
+
+    def daily(self, fips, window):
+        """Generates the daily cases and deaths of one county
+
+        Args:
+            fips (int):  county FIPS code
+            window (tuple):  first and last position, see self.window()
+
+        Returns:
+            datesDF (DataFrame):  one row per reported day with the date
+            and the cases and deaths reported that day, like the
+            'datesDF' of a Stats object
+        """
+
+        part, row = self.locate(fips)
+        first, last = window
+        lo = max(first-1, 0)
+        columns = {}
+        for name in ['cases', 'deaths', 'reported']:
+            values = np.asarray(part[name][row, lo:last+1], dtype='int64')
+            columns[name] = np.diff(values) if first > 0 else np.diff(values, prepend=0)
+
+        dates = (self.start+np.arange(first, last+1)).astype(str)
+        reported = columns['reported'] > 0
+
+        return pd.DataFrame({'date':dates[reported], 'cases':columns['cases'][reported],
+                             'deaths':columns['deaths'][reported]})
+
+    def report(self, fips, window):
+        """Method that gathers the statistics of one county
+
+        Args:
+            fips (int):  county FIPS code
+            window (tuple):  first and last position, see self.window()
+
+        Returns:
+            report (CountyReport):  statistics of the county with its
+            ranks in its state and in the country
+        """
+
+        countyDF = self.countyTable(window)
+        row = countyDF[countyDF['fips'] == fips]
+        if len(row) < 1:
+            raise KeyError("county "+str(fips)+" has no report in the date range")
+
+        return CountyReport(row.iloc[0], self.daily(fips, window))
+
+class CountyReport:
+    """ Statistics of one county over a date range, with its rank in its
+        state and in the country.  Text is only built when asked for.
+
+        Attributes:
+            county (str):  name of the county
+            state (str):  name of its state
+            fips (int):  county FIPS code
+            dates (tuple):  first and last reported date, 'YYYY-MM-DD'
+            days (int):  number of days reported
+            values (dict):  value of every column in CountyReport.columns
+            ranks (dict):  rank in the country of every column
+            stateRanks (dict):  rank in the state of every column
+            datesDF (DataFrame):  daily cases and deaths
+
+        """
+
+    columns = ['avg_cases', 'avg_deaths', 'cfr', 'total_cases', 'total_deaths']
+
+    def __init__(self, row, datesDF):
+        self.county = row['county']
+        self.state = row['state']
+        self.fips = int(row['fips'])
+        self.dates = (datesDF.iloc[0]['date'], datesDF.iloc[-1]['date']) if len(datesDF) else (None, None)
+        self.days = int(row['days'])
+        self.values = {col:row[col] for col in CountyReport.columns}
+        self.ranks = {col:row[col+'_rank'] for col in CountyReport.columns}
+        self.stateRanks = {col:row[col+'_state_rank'] for col in CountyReport.columns}
+        self.datesDF = datesDF
+
+    def lines(self):
+        """Method that formats the statistics as sentences
+
+        Returns:
+            lines (list):  one sentence per statistic, the first naming
+            the county
+        """
+
+        values, ranks, state = self.values, self.ranks, self.stateRanks
+        days = str(self.days)
+        where = " in "+self.state+", #{} in the United States."
+
+        return [self.county+", "+self.state,
+                ("Average of {:,} cases per day in "+days+" days, ranked #{}"+where).format(values['avg_cases'], state['avg_cases'], ranks['avg_cases']),
+                ("Average of {:,} deaths per day in "+days+" days, ranked #{}"+where).format(values['avg_deaths'], state['avg_deaths'], ranks['avg_deaths']),
+                ("Case Fatality Ratio from "+str(self.dates[0])+" to "+str(self.dates[1])+": {}%, ranked #{}"+where).format(values['cfr'], state['cfr'], ranks['cfr']),
+                ("There have been {:,} cases, ranked #{}"+where).format(values['total_cases'], state['total_cases'], ranks['total_cases']),
+                ("There have been {:,} deaths, ranked #{}"+where).format(values['total_deaths'], state['total_deaths'], ranks['total_deaths'])]
+
+    def text(self):
+        """Method that formats the whole report as plain text"""
+
+        return "\n".join(self.lines())+"\n"
+
+    def toDict(self):
+        """Method that returns the report as plain Python values, e.g.
+        for JSON"""
+
+        report = {'county':self.county, 'state':self.state, 'fips':self.fips,
+                  'first_date':self.dates[0], 'last_date':self.dates[1], 'days':self.days}
+        for col in CountyReport.columns:
+            value = self.values[col]
+            report[col] = None if pd.isna(value) else (value.item() if hasattr(value, 'item') else value)
+            report[col+'_rank'] = None if pd.isna(self.ranks[col]) else int(self.ranks[col])
+            report[col+'_state_rank'] = None if pd.isna(self.stateRanks[col]) else int(self.stateRanks[col])
+
+        return report
@@ -1,965 +1,246 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import requests
 import datetime
-import matplotlib.image as img
 import json
+import re
 import sys
+import os
+import hashlib
+import argparse
+import contextlib
+import io
+import shutil
+import concurrent.futures
+
+from covid_stats import LazyModule, Profiler, DataQuality, Stats, StatsResult, display
+from covid_counties import CountyStore
+
+plt = LazyModule('matplotlib.pyplot')
+sns = LazyModule('seaborn')
+img = LazyModule('matplotlib.image')
 
 """ Classes for displaying COVID-19 statistics per state in the 
 United States. """
 
-class Stats:
-    def __init__(self, state, currmo, lastmo, curryear=22, lastyear=22):
-        """Calculating and displaying COVID-19 statistics per state.
+# Stats is provided here as well, so notebooks only need this module
+__all__ = ['RenderContext', 'ChartCache', 'Graph', 'TemplateRenderer', 'Stats', 'VIEWS', 'STATEVIEWS',
+           'parseWindow', 'windowName', 'initWorker', 'runTask', 'main']
+
+class RenderContext:
+    """ Styling and watermark shared by every Graph object.
 
         Attributes:
-            data (list): list of CSV files and URL links
-            firstdate (str): date generated from 'currmo' and 'curryear'
-            seconddate (str): date generated from 'lastmo' and 'lastyear'
-            datesDF (DataFrame): DataFrame storing COVID-19 data for one chosen state
-            allstats (list): list containing COVID-19 data that will be used for Graph objects
-            finalcases (list): list containing case rates for each US state
-            finaldeaths (list): list containing death rates for each US state
-            finaldates (list): list containing dates for each US state
-            finalstates (list): list containing each US state
-            loadData() (method): method where the script begins
+            watermark (str):  path to the watermark image
+            version (int):  style version, raise when the look of the
+            graphs changes so cached charts are rendered again
+            styled (bool):  True once the seaborn style has been applied
+            image (numpy array):  watermark image, read on first use
 
-        Side effects:
-            after initialization, loadData() method is called to begin script
         """
 
-        self.data = ["../../../Documents/GitHub/covid-19-data/us-states.csv","nst-est2020.csv","states-sqmi20.csv","https://data.cdc.gov/resource/unsk-b7fc.json","abbr.csv"]
-        self.state = state
-        self.currmo = currmo
-        self.lastmo = lastmo
-        self.curryear = curryear
-        self.lastyear = lastyear
-
-        self.firstdate = None
-        self.seconddate = None
-        self.datesDF = pd.DataFrame()
-        self.allstats = []
-        self.finalcases = []
-        self.finaldeaths = []
-        self.finaldates = []
-        self.finalstates = []
-        self.loadData()
-
-    def vax(self):
-        """Generates a DataFrame object displaying vaccinations rates per state.
+    default = None
+    version = 1
 
-        Side effects:
-            makes a request to an API and creates a DataFrame object, 
-            loads DataFrame from local computer, saves DataFrame to local computer
+    def __init__(self, watermark='watermarkMAR.png'):
+        self.watermark = watermark
+        self.styled = False
+        self.image = None
 
-        Raises:
-            general exception which checks if a file exists and if it can be read,
-            exception prints a message to the console and allows the method to continue 
-            and generate a new DataFrame
+    @classmethod
+    def shared(cls):
+        """Method that returns the RenderContext used by default, created
+        on first call
 
         Returns:
-            popvaxxed (DataFrame):  contains the name and abbreviations of 
-            each state, fully vaccinated numbers and percentages of vaccination 
-            rates, current population per rate
-            totalvaxx (float):  percent of fully vaccinated per state, the sum 
-            of fully_vaccinated divided by the sum of curr_pop
+            default (RenderContext):  context shared by the process
         """
 
-        today = datetime.date.today().isoformat()
+        if cls.default is None:
+            cls.default = cls()
 
-        try:
-            popvaxxed = pd.read_csv(today+"_"+"popvaxxed.csv")
-            totalvaxx=popvaxxed['fully_vaccinated'].astype('int64').sum()/popvaxxed['curr_pop'].sum()
-            return popvaxxed, totalvaxx
-        except:
-            print("Grabbing latest vaccination data...")
-
-        pop2=pd.read_csv(self.data[1])
-        vaxxURL=self.data[3]
-        CDCdata=requests.get(vaxxURL)
-        statesvaxx=pd.DataFrame.from_records(data=CDCdata.json())
-        statesvaxx=statesvaxx[['date','location','series_complete_yes']]
-        statesvaxx.columns=['date','location','fully_vaccinated']
-        statesvaxx.loc[:,'date']=statesvaxx['date'].apply(lambda x: 
-                                                          datetime.datetime.strptime(
-                                                              x,'%Y-%m-%dT%H:%M:%S.000'
-                                                          ).strftime('%Y-%m-%d'))
-        statesvaxx.loc[:,'day']=statesvaxx['date'].apply(lambda x: 
-                                                         datetime.datetime.strptime(
-                                                             x,'%Y-%m-%d').strftime('%d'))
-        statesvaxx=statesvaxx.groupby('location')['fully_vaccinated'].agg('last').reset_index()
-        statesvaxx=statesvaxx[(statesvaxx['location']!='AS') 
-                              & (statesvaxx['location']!='BP2') 
-                              & (statesvaxx['location']!='DD2') 
-                              & (statesvaxx['location']!='FM') 
-                              & (statesvaxx['location']!='GU') 
-                              & (statesvaxx['location']!='IH2') 
-                              & (statesvaxx['location']!='LTC') 
-                              & (statesvaxx['location']!='MP')
-                              & (statesvaxx['location']!='PW')
-                              & (statesvaxx['location']!='RP') 
-                              & (statesvaxx['location']!='US') 
-                              & (statesvaxx['location']!='VA2') 
-                              & (statesvaxx['location']!='VI')].reset_index(drop=True)
-        pop2.columns=['SUMLEV', 'REGION', 'DIVISION', 'state', 'name', 'CENSUS2010POP',
-               'ESTIMATESBASE2010', 'POPESTIMATE2010', 'POPESTIMATE2011',
-               'POPESTIMATE2012', 'POPESTIMATE2013', 'POPESTIMATE2014',
-               'POPESTIMATE2015', 'POPESTIMATE2016', 'POPESTIMATE2017',
-               'POPESTIMATE2018', 'POPESTIMATE2019', 'POPESTIMATE042020',
-               'pop2020']
-        pop2=pop2[['name','pop2020']].iloc[[5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21
-                                            ,22,23,24,25,26,27,28,29,30,31,32,33,34,35,36
-                                            ,37,38,39,40,41,42,43,56,44,45,46,47,48,49,50
-                                            ,51,52,53,54,55]].reset_index(drop=True)
-        pop2=pop2.iloc[[1,0,3,2,4,5,6,8,7,9,10,11,15,12,13,14,16,17,18,21,20,19,22,23,25
-                        ,24,26,33,34,27,29,30,31,28,32,35,36,37,38,39,40,41,42,43,44,45
-                        ,47,46,48,50,49,51]].reset_index(drop=True)
-        statesvaxx=statesvaxx.drop([22]).reset_index(drop=True)
-        popvaxxed=pd.concat([statesvaxx,pop2],axis=1)
-        popvaxxed.columns=['abbr','fully_vaccinated','full_name','curr_pop']
-        popvaxxed.loc[:,'percent']=round((popvaxxed['fully_vaccinated']
-                                          .astype('int64')/popvaxxed['curr_pop'])*100,2)
-        totalvaxx=popvaxxed['fully_vaccinated'].astype('int64').sum()/popvaxxed['curr_pop'].sum()
-        popvaxxed.to_csv(today+"_"+"popvaxxed.csv",index=False)
-
-        return popvaxxed, totalvaxx
-
-    def all_time(self):
-        """Generates a DataFrame object that contains the latest 
-        aggregated COVID-19 data
+        return cls.default
 
-        Side effects:
-            loads DataFrame from local computer, saves DataFrame to local computer,
-        
-        Raises:
-            general exception which checks if a file exists and if it can be read, 
-            exception prints a message to the console and allows the method to continue 
-            and generate a new DataFrame
+    def apply(self):
+        """Method that applies the seaborn style once per process
 
-        Returns:
-            bothDF (DataFrame):  contains aggregated data which includes 
-            recorded cases, deaths, total population, people per square mile,
-            total square miles, case fatality, and incidence rates per state,
-            organized by latest date available
+        Side effects:
+            sets seaborn font scale and 'whitegrid' style on first call
         """
 
-        today = datetime.date.today().isoformat()
-
-        try:
-            bothDF = pd.read_csv(today+"_"+"bothDF.csv")
-            return bothDF
-        except:
-            print("Grabbing all state COVID-19 data...")
-
-        df=pd.read_csv(self.data[0])
-        df.loc[:,'day']=df['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%d'))
-        df.loc[:,'month']=df['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%m'))
-        df.loc[:,'year']=df['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%y'))
-        df=df[['date','state','cases','deaths','day','month','year']]
-        df['day']=df['day'].astype('int64')
-        df['month']=df['month'].astype('int64')
-        df['year']=df['year'].astype('int64')
-        pop=pd.read_csv(self.data[1])
-        pop.columns=['SUMLEV', 'REGION', 'DIVISION', 'STATE', 'NAME', 'CENSUS2010POP',
-               'ESTIMATESBASE2010', '2010', '2011',
-               '2012', '2013', '2014',
-               '2015', '2016', '2017',
-               '2018', '2019', '042020',
-               'POP2020']
-        pop=pop[['NAME','POP2020']]
-        pop=pop.iloc[[5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,
-                     28,29,30,31,32,33,34,35,36,37,38,39,40,41,42,43,56,44,45,46,47,48,49,
-                     50,51,52,53,54,55]].reset_index(drop=True)
-        pop.columns=['state','POP2020']
-        bothDF=df.merge(pop)
-        states_sqmi=pd.read_csv(self.data[2])
-        bothDF=bothDF.merge(states_sqmi,left_on='state',right_on='states')
-        bothDF=bothDF.groupby('state')[[
-            'cases','deaths','day','month','year','POP2020','ppsm','sq_mi']].agg('last').reset_index()
-        bothDF.loc[:,'case_fatality']=round((bothDF['deaths']/bothDF['cases'])*100,3)
-        bothDF.loc[:,'incidence_rate']=round((bothDF['cases']/bothDF['POP2020'])*100000,3)
-        bothDF.to_csv(today+"_"+"bothDF.csv",index=False)
-
-        return bothDF
-
-    def getDF(self):
-        """Generates a DataFrame object used when beginning the script
-
-        Side effects:
-            loads DataFrame from local computer, saves DataFrame to local computer,
-            deletes DataFrame from local computer, prints messages to console
+        if not self.styled:
+            sns.set(font_scale=3)
+            sns.set_style("whitegrid")
+            self.styled = True
 
-        Raises:
-            general exception which checks if a file exists and if it can be read,
-            exception prints a message to the console and allows the method to continue 
-            and generate a new DataFrame
+        return None
 
-        Returns:
-            df (DataFrame):  contains COVID-19 data for each US state which 
-            includes recorded cases, deaths, and total population per state, 
-            organized by first recorded date to most recent
+    def reset(self):
+        """Method that forces the style and watermark to be loaded again
+        on next use, e.g. after matplotlib rcParams were changed
         """
 
-        today = datetime.date.today().isoformat()
-
-        try:
-            df = pd.read_csv(today+"_"+"df.csv")
-            return df
-        except:
-            #file = today+"_"+"df.csv"
-            #if(os.path.exists(file) and os.path.isfile(file)):
-            #    os.remove(file)
-            #    print(today+"_"+"df.csv"+" deleted.")
-            #    print("Grabbing latest COVID-19 information.")
-            #else:
-            #    print("Remember to pull latest updates from GitHub, grabbing + "
-            #          "latest COVID-19 information.")
-            print("Remember to pull latest updates from GitHub, grabbing latest COVID-19 information.")
-
-        df=pd.read_csv(self.data[0])
-        pop=pd.read_csv(self.data[1])
-        pop.columns=['SUMLEV', 'REGION', 'DIVISION', 'STATE', 'NAME', 'CENSUS2010POP',
-               'ESTIMATESBASE2010', '2010', '2011',
-               '2012', '2013', '2014',
-               '2015', '2016', '2017',
-               '2018', '2019', '042020',
-               'POP2020']
-        pop=pop[['NAME','POP2020']]
-        pop=pop.iloc[[5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,
-                     28,29,30,31,32,33,34,35,36,37,38,39,40,41,42,43,56,44,45,46,47,48,49,
-                     50,51,52,53,54,55]].reset_index(drop=True)
-        pop.columns=['state','POP2020']
-        sqmi=pd.read_csv(self.data[2])
-        df.loc[:,'day']=df['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%d'))
-        df.loc[:,'month']=df['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%m'))
-        df.loc[:,'year']=df['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%y'))
-        df=df[['date','state','cases','deaths','day','month','year']]
-        df['day']=df['day'].astype('int64')
-        df['month']=df['month'].astype('int64')
-        df['year']=df['year'].astype('int64')
-        df=df.merge(pop)
-        abbr=pd.read_csv(self.data[4])
-        df=df.merge(abbr, left_on='state',right_on='full_name')
-
-        df.to_csv(today+"_"+"df.csv",index=False)
-
-        return df
-
-    def calculateDF(self, df, state):
-        """Generates DataFrame objects using information provided by
-        the user
-
-        Args:
-            df (DataFrame):  DataFrame object with information needed to 
-            generate a new DataFrame
-            state (str):  name of US state used as a filter to gather
-            relevant information
+        self.styled = False
+        self.image = None
 
-        Side effects:
-            if date validation fails, a message is printed to the console
-            and the method returns None
+        return None
 
-        Attributes:
-            self.lastyear, self.curryear, self.lastmo, and self.currmo 
-            are referenced to obtain new DataFrame objects
+    def logo(self):
+        """Method that returns the watermark image, reading it on first call
 
         Returns:
-            firstdf (DataFrame):  DataFrame is constructed and organized 
-            by name for each US state and the dates provided by the user
+            image (numpy array):  watermark image
         """
 
-        yearCount = []
-        yearNum = self.lastyear
-        moNum = self.lastmo
-        countNum = 0
-
-        if self.curryear == self.lastyear:
-            if self.currmo == self.lastmo:
-                firstdf = df[(df['state'] == state) & (df['month'] == self.currmo) & (df['year'] == self.curryear)]
-
-            elif self.currmo > self.lastmo:
-                
-                firstdf = df[(df['state'] == state) & (df['month'] <= self.currmo) & (df['month'] >=self.lastmo) & (df['year'] == self.lastyear)]
-
-            else:
-                print("'lastmo' cannot be greater than 'currmo'.")
-                return None
-
-        elif self.curryear > self.lastyear:
-            if self.currmo == self.lastmo:
-                while yearNum < self.curryear+1:
-                    if countNum == 0:
-                        if self.lastmo == 12:
-                            yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum) & (df['month'] == self.lastmo)])
-                        else:
-                            yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum) & (df['month'] >= self.lastmo)])
-                    else:
-                        yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum)])
-                    yearNum += 1
-                    countNum += 1
-
-                yearCount[-1] = df[(df['state'] == state) & (df['year'] == self.curryear) & (df['month'] <= self.currmo)]
-
-                countNum = 1
-                firstdf = yearCount[0]
-
-                for dfs in yearCount:
-                    if countNum >= len(yearCount):
-                        break
-                    firstdf = firstdf.append(yearCount[countNum])
-                    countNum += 1
-
-            elif self.currmo < self.lastmo:
-                while yearNum < self.curryear+1:
-                    if countNum == 0:
-                        if self.lastmo == 12:
-                            yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum) & (df['month'] == self.lastmo)])
-                        else:
-                            yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum) & (df['month'] >= self.lastmo)])
-                    else:
-                        yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum)])
-                    yearNum += 1
-                    countNum += 1
-
-                yearCount[-1] = df[(df['state'] == state) & (df['year'] == self.curryear) & (df['month'] <= self.currmo)]
-
-                countNum = 1
-                firstdf = yearCount[0]
-
-                for dfs in yearCount:
-                    if countNum >= len(yearCount):
-                        break
-                    firstdf = firstdf.append(yearCount[countNum])
-                    countNum += 1
-
-            else:
-                while yearNum < self.curryear+1:
-                    if countNum == 0:
-                        yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum) & (df['month'] >= self.lastmo)])
-                    else:
-                        yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum)])
-
-                    yearNum += 1
-                    countNum += 1
-                    
-                countNum = 1
-                yearCount[-1] = df[(df['state'] == state) & (df['year'] == self.curryear) & (df['month'] <= self.currmo)]
-                
-                countNum = 1
-                firstdf = yearCount[0]
+        if self.image is None:
+            self.image = img.imread(fname=self.watermark)
 
-                for dfs in yearCount:
-                    if countNum >= len(yearCount):
-                        break
-                    firstdf = firstdf.append(yearCount[countNum])
-                    countNum += 1
+        return self.image
 
-        else:
-            print("'lastyear' cannot be greater than 'curryear'.")
-            return None
+class ChartCache:
+    """ Rendered charts saved on disk and looked up by content.
 
-        return firstdf
-    
-    def calculateMonths(self):
-        """Generates a list object containing values which represent
-        each month found in current DataFrame object
+        Each chart is keyed by a hash of its view, metric, state, date
+        range, data and style version, so a chart is only rendered again
+        when something it depends on changes.  Least recently used charts
+        are deleted once the directory grows past 'maxBytes'.
 
-        Side effects:
-            if date validation fails, a message is printed to the console
-            and the method returns None
-            
         Attributes:
-            self.lastyear, self.curryear, self.lastmo, and self.currmo 
-            are referenced to obtain new DataFrame objects
+            directory (str):  folder where charts are saved
+            maxBytes (int):  largest total size of saved charts
+            fmt (str):  image format, either 'png' or 'svg'
 
-        Returns:
-            getMonths (list):  contains integer values representing 
-            each month to be used for visualization for Graph objects
         """
 
-        yearCount = []
-        getMonths = []
-        yearNum = self.lastyear
-        moNum = self.lastmo
-        countNum = 0
-        findDF = pd.DataFrame()
-        
-        if self.curryear == self.lastyear:
-            if self.currmo == self.lastmo:
-                getMonths.append(moNum)
-
-            elif self.currmo > self.lastmo:
-                if self.currmo == 12:
-                    findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] >= moNum)]
-                else:
-                    findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] >= moNum) & (self.datesDF['month'] <= self.currmo)]
-                for num in findDF['month'].unique().tolist():
-                    getMonths.append(num)
-
-            else:
-                print("'lastmo' cannot be greater than 'currmo'.")
-                return None
-
-        elif self.curryear > self.lastyear:
-            if self.currmo == self.lastmo:
-                while yearNum < self.curryear+1:
-                    if countNum == 0:
-                        if self.lastmo == 12:
-                            findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] == self.lastmo)]
-                            for num in findDF['month'].unique().tolist():
-                                getMonths.append(num)
-
-                        else:
-                            findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] >= self.lastmo)]
-                            for num in findDF['month'].unique().tolist():
-                                getMonths.append(num)
-
-                    else:
-                        findDF = self.datesDF[self.datesDF['year'] == yearNum]
-                        for num in findDF['month'].unique().tolist():
-                            getMonths.append(num)
-
-                    getMonths.append(yearNum)
-                    yearNum += 1
-                    countNum += 1
-
-            elif self.currmo < self.lastmo:
-                while yearNum < self.curryear+1:
-                    if countNum == 0:
-                        if self.lastmo == 12:
-                            findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] == self.lastmo)]
-                            for num in findDF['month'].unique().tolist():
-                                getMonths.append(num)
-
-                        else:
-                            findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] >= self.lastmo)]
-                            for num in findDF['month'].unique().tolist():
-                                getMonths.append(num)
-
-                    else:
-                        findDF = self.datesDF[self.datesDF['year'] == yearNum]
-                        for num in findDF['month'].unique().tolist():
-                            getMonths.append(num)
-
-                    getMonths.append(yearNum)
-                    yearNum += 1
-                    countNum += 1
+    def __init__(self, directory='chart_cache', maxBytes=256*1024*1024, fmt='png'):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.fmt = fmt
+        os.makedirs(directory, exist_ok=True)
 
-            else:
-                while yearNum < self.curryear+1:
-                    if countNum == 0:
-                        findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] >= self.lastmo)]
-                        for num in findDF['month'].unique().tolist():
-                            getMonths.append(num)
-
-                    else:
-                        findDF = self.datesDF[self.datesDF['year'] == yearNum]
-                        for num in findDF['month'].unique().tolist():
-                            getMonths.append(num)
-
-                    getMonths.append(yearNum)
-                    yearNum += 1
-                    countNum += 1
-
-        else:
-            print("'lastyear' cannot be greater than 'curryear'.")
-            return None
-
-        return getMonths
+    def key(self, view, metric, state, window, df, extra=None, version=1):
+        """Method that hashes everything a chart depends on
 
-    def startProgram(self):
-        """Method that organizes DataFrames for each US state and calculates
-        death and case rates
-
-        Side effects:
-            if date validation fails, a message is printed to the console
-            and the method returns None
-            self.getDF() is called to obtain a DataFrame object
-            self.calculateDF() is called to construct DataFrame objects
-            to be used for graphing
+        Args:
+            view (str):  Graph view, e.g. 'info' or 'averages'
+            metric (str):  column being graphed
+            state (str):  name of US state, None for charts of every state
+            window (tuple):  first and last date of the Stats object
+            df (DataFrame):  data being graphed
+            extra (tuple):  other options changing the chart
+            version (int):  style version of the RenderContext
 
-        Attributes:
-            self.finalcases, self.finaldeaths, self.finaldates, self.finalstates, 
-            self.allstats are appended with information used for visualization 
-            with Graph objects 
-            self.allstates and self.state are referenced to obtain values
+        Returns:
+            key (str):  hexadecimal SHA-256 digest
         """
 
-        caseslst = []
-        deathlst = []
-        dateslst = []
-        newDF = self.getDF()
-        self.allstates = newDF['state'].unique().tolist()
-        self.state = newDF[newDF['abbr'] == self.state].iloc[0]['state']
-        getfirstDF = pd.DataFrame()
-
-        for sts in self.allstates:
-            while True:
-                try:
-                    if self.lastyear > 20:
-                        if self.lastmo == 1:
-                            getfirstDF = newDF[(newDF['state']==sts) & (newDF['month'] == 12) & (newDF['year'] == self.lastyear-1)].iloc[-1]
-                        else:
-                            getfirstDF = newDF[(newDF['state']==sts) & (newDF['month'] == self.lastmo-1) & (newDF['year'] == self.lastyear)].iloc[-1]
-                    else:
-                        if self.lastmo != 1:
-                            getfirstDF = newDF[(newDF['state']==sts) & (newDF['month'] == self.lastmo-1) & (newDF['year'] == self.lastyear)].iloc[-1]
-
-                except Exception as e:
-                    print("error: ",e)
-                    break
-                break
-
-            if self.curryear == self.lastyear:
-                if self.currmo == self.lastmo:
-                    if len(getfirstDF) < 1:
-                        statsDF = self.calculateDF(newDF,sts)
-                        statsDF = statsDF.reset_index(drop=True)
-                    else:
-                        statsDF = self.calculateDF(newDF,sts)
-                        statsDF = statsDF.append(getfirstDF).reset_index(drop=True)
-
-                elif self.currmo > self.lastmo:
-                    if len(getfirstDF) < 1:
-                        statsDF = self.calculateDF(newDF,sts)
-                        statsDF = statsDF.reset_index(drop=True)
-                    else:
-                        statsDF = self.calculateDF(newDF,sts)
-                        statsDF = statsDF.append(getfirstDF).reset_index(drop=True)
-                else:
-                    print("'lastmo' cannot be greater than 'currmo'.")
-                    return None
-
-            elif self.curryear > self.lastyear:
-                if self.currmo == self.lastmo:
-                    if len(getfirstDF) < 1:
-                        statsDF = self.calculateDF(newDF,sts)
-                        statsDF = statsDF.reset_index(drop=True)
-                    else:
-                        statsDF = self.calculateDF(newDF,sts)
-                        statsDF = statsDF.append(getfirstDF).reset_index(drop=True)
-
-                elif self.currmo < self.lastmo:
-                    if len(getfirstDF) < 1:
-                        statsDF = self.calculateDF(newDF,sts)
-                        statsDF = statsDF.reset_index(drop=True)
-                    else:
-                        statsDF = self.calculateDF(newDF, sts)
-                        statsDF = statsDF.append(getfirstDF).reset_index(drop=True)
-                else:
-                    if len(getfirstDF) < 1:
-                        statsDF = self.calculateDF(newDF,sts)
-                        statsDF = statsDF.reset_index(drop=True)
-                    else:
-                        statsDF = self.calculateDF(newDF,sts)
-                        statsDF = statsDF.append(getfirstDF).reset_index(drop=True)
-
-            else:
-                print("'lastyear' cannot be greater than 'curryear'.")
-                return None
-
-            if len(statsDF) == 0:
-                statsDF = newDF.copy(deep=False)
-                continue
-
-            casestats = statsDF['cases'].tolist()
-            deathstats = statsDF['deaths'].tolist()
-            datestats = statsDF['date'].tolist()
-
-            for dates in datestats:
-                dateslst.append(dates)
-
-            count = 1
-            for cases, deaths in zip(casestats, deathstats):
-                caseslst.append(casestats[count] - casestats[count-1])
-                deathlst.append(deathstats[count] - deathstats[count-1])
-                count += 1
-                if count >= len(statsDF):
-                    break
+        digest = hashlib.sha256()
+        digest.update(repr((view, metric, state, tuple(window), extra, version, self.fmt)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
 
-            if len(getfirstDF) >= 1:
-                firstcasecount = casestats[0] - getfirstDF[2]
-                firstdeathcount = deathstats[0] - getfirstDF[3]
-                caseslst.insert(0, firstcasecount)
-                deathlst.insert(0, firstdeathcount)
-                dateslst.pop()
-                caseslst.pop()
-                deathlst.pop()
-            else:
-                caseslst.insert(0, casestats[0])
-                deathlst.insert(0, deathstats[0])
+        return digest.hexdigest()
 
-            self.finalcases.append(caseslst)
-            self.finaldeaths.append(deathlst)
-            self.finaldates.append(dateslst)
-            self.finalstates.append(sts)
+    def path(self, key):
+        """Method that returns the file name of a chart
 
-            if sts == self.state:
-                self.allstats.append(sts)
+        Args:
+            key (str):  chart key from self.key()
 
-            del casestats[:]
-            del deathstats[:]
-            del datestats[:]
-            statsDF = newDF.copy(deep=False)
-            caseslst = []
-            deathlst = []
-            dateslst = []
+        Returns:
+            path (str):  location of the chart in self.directory
+        """
 
-        self.allstats.append((self.finalcases,self.finaldeaths,self.finaldates,self.finalstates))
+        return os.path.join(self.directory, key+"."+self.fmt)
 
-        return None
+    def get(self, key):
+        """Method that looks up a saved chart
 
-    def checkParameters(self):
-        """Method that validates user entry of Stats object parameters
+        Args:
+            key (str):  chart key from self.key()
 
         Side effects:
-            if date validation fails, a message is printed to the console
-            and the method returns None
-
-        Attributes:
-            self.currmo, self.lastmo, self.curryear, self.lastyear are 
-            referenced for date validation
+            the modification time of a found chart is updated, marking
+            it as recently used
 
         Returns:
-            check (bool):  a default value of True is returned if date validation
-            passes each conditional, otherwise a value of None is returned
+            path (str):  location of the chart, None if it was not saved
         """
 
-        check = True
-        latestMonth = datetime.date.today().isoformat()
-        latestMonth = int(latestMonth[5:7])
-        latestYear = datetime.date.today().isoformat()
-        latestYear = int(latestYear[2:4])
-
-        if self.lastmo < 1 or self.currmo < 1:
-            print("Enter a valid month.")
-            return None
-        
-        if self.lastmo > 12 or self.currmo > 12:
-            print("Enter a valid month.")
-            return None
-        
-        if self.lastyear < 20 or self.curryear < 20:
-            print("Enter valid year.")
-            return None
-
-        if self.lastyear > latestYear or self.curryear > latestYear:
-            print("Enter valid year.")
-            return None
-        
-        if self.curryear == 22 and self.currmo > latestMonth:
-            print("Enter valid month for current year.")
+        path = self.path(key)
+        if not os.path.isfile(path):
             return None
+        os.utime(path)
 
-        if self.curryear == self.lastyear:
-            if self.currmo == self.lastmo:
-                return check
-            elif self.currmo > self.lastmo:
-                return check
-            else:
-                print("'lastmo' cannot be greater than 'currmo'.")
-                return None
-
-        elif self.curryear > self.lastyear:
-            if self.currmo == self.lastmo:
-                return check
-            elif self.currmo < self.lastmo:
-                return check
-            else:
-                return check
+        return path
 
-        else:
-            print("'lastyear' cannot be greater than 'curryear'.")
-            return None
+    def put(self, key, fig):
+        """Method that saves a chart
 
-        return check
-    
-    def monthlyStats(self):
-        """Method that collects DataFrame information organized by month
+        Args:
+            key (str):  chart key from self.key()
+            fig (matplotlib figure):  rendered chart
 
         Side effects:
-            if date validation fails, a message is printed to the console
-            and the method returns None
-            self.CalculateMonths() is called to obtain a list of values
-
-        Attributes:
-            self.datesDF is referenced to obtain values
+            saves the chart to self.directory, self.evict() is called
 
         Returns:
-            countedMonths (list):  contains four values; first is the 
-            current month being evaluated, second is the sum of COVID-19 
-            deaths for that month, third is the sum of COVID-19 cases, 
-            fourth is the average number of deaths, fifth is the average 
-            number of cases
+            path (str):  location of the chart
         """
 
-        countedMonths = []
-        checkYear = self.lastyear
-        getMonths = self.calculateMonths()
-        count = 0
-
-        if self.curryear == self.lastyear:
-            if self.currmo == self.lastmo:
-
-                newStatsDF = self.datesDF[(self.datesDF['month'] == getMonths[0]) & (self.datesDF['year'] == self.lastyear)]
-                firstdate = self.datesDF[['date','month','year']]
-                firstdate = firstdate[(firstdate['month'] == getMonths[0]) & (firstdate['year'] == self.lastyear)].iloc[0]['date']
-
-                countedMonths.append((firstdate,round(newStatsDF['deaths'].sum(),2),
-                                      round(newStatsDF['cases'].sum(),2),
-                                      round(newStatsDF['deaths'].sum()/len(newStatsDF['deaths']),2),
-                                      round(newStatsDF['cases'].sum()/len(newStatsDF['cases']),2)))
-
-            elif self.currmo > self.lastmo:
-
-                while count < len(getMonths):
-                    newStatsDF = self.datesDF[(self.datesDF['month'] == getMonths[count]) & (self.datesDF['year'] == checkYear)]
-                    firstdate = self.datesDF[['date','month','year']]
-                    firstdate = firstdate[(firstdate['month'] == getMonths[count]) & (firstdate['year'] == checkYear)].iloc[0]['date']
-
-                    countedMonths.append((firstdate,round(newStatsDF['deaths'].sum(),2),
-                                          round(newStatsDF['cases'].sum(),2),
-                                          round(newStatsDF['deaths'].sum()/len(newStatsDF['deaths']),2),
-                                          round(newStatsDF['cases'].sum()/len(newStatsDF['cases']),2)))
-                    count += 1
-
-            else:
-                print("'lastmo' cannot be greater than 'currmo'.")
-                return None
-
-        elif self.curryear > self.lastyear:
-
-            if self.currmo == self.lastmo:
-
-                while count < len(getMonths):
-                    if getMonths[count] == checkYear:
-                        checkYear += 1
-                        count += 1
-                        continue
-                    else:
-                        newStatsDF = self.datesDF[(self.datesDF['month'] == getMonths[count]) & (self.datesDF['year'] == checkYear)]
-                        firstdate = self.datesDF[['date','month','year']]
-                        firstdate = firstdate[(firstdate['month'] == getMonths[count]) & (firstdate['year'] == checkYear)].iloc[0]['date']
-
-                        countedMonths.append((firstdate,round(newStatsDF['deaths'].sum(),2),
-                                              round(newStatsDF['cases'].sum(),2),
-                                              round(newStatsDF['deaths'].sum()/len(newStatsDF['deaths']),2),
-                                              round(newStatsDF['cases'].sum()/len(newStatsDF['cases']),2)))
-                    count += 1
-
-            elif self.currmo < self.lastmo:
-
-                while count < len(getMonths):
-                    if getMonths[count] == checkYear:
-                        checkYear += 1
-                        count += 1
-                        continue
-                    else:
-                        newStatsDF = self.datesDF[(self.datesDF['month'] == getMonths[count]) & (self.datesDF['year'] == checkYear)]
-                        firstdate = self.datesDF[['date','month','year']]
-                        firstdate = firstdate[(firstdate['month'] == getMonths[count]) & (firstdate['year'] == checkYear)].iloc[0]['date']
-
-                        countedMonths.append((firstdate,round(newStatsDF['deaths'].sum(),2),
-                                              round(newStatsDF['cases'].sum(),2),
-                                              round(newStatsDF['deaths'].sum()/len(newStatsDF['deaths']),2),
-                                              round(newStatsDF['cases'].sum()/len(newStatsDF['cases']),2)))
-                    count += 1
+        path = self.path(key)
+        fig.savefig(path, format=self.fmt, bbox_inches='tight')
+        self.evict()
 
-            else:
-                while count < len(getMonths):
-                    if getMonths[count] == checkYear:
-                        checkYear += 1
-                        count += 1
-                        continue
-                    else:
-                        newStatsDF = self.datesDF[(self.datesDF['month'] == getMonths[count]) & (self.datesDF['year'] == checkYear)]
-                        firstdate = self.datesDF[['date','month','year']]
-                        firstdate = firstdate[(firstdate['month'] == getMonths[count]) & (firstdate['year'] == checkYear)].iloc[0]['date']
-
-                        countedMonths.append((firstdate,round(newStatsDF['deaths'].sum(),2),
-                                              round(newStatsDF['cases'].sum(),2),
-                                              round(newStatsDF['deaths'].sum()/len(newStatsDF['deaths']),2),
-                                              round(newStatsDF['cases'].sum()/len(newStatsDF['cases']),2)))
-                    count += 1
-
-        else:
-            print("'lastyear' cannot be greater than 'curryear'.")
-            return None
+        return path
 
-        return countedMonths
-
-    def loadData(self):
-        """Method that collects data obtained from other methods and loads
-        them into lists to be used for visualization with Graph objects
+    def evict(self):
+        """Method that deletes least recently used charts until the
+        directory is no larger than self.maxBytes
 
         Side effects:
-            self.checkParameters() is called for validation measures
-            self.startProgram() is called to begin obtaining information
-            for visualization using Graph objects
-            self.getDF() is called to obtain a new Stats class DataFrame 
-            object
-            self.vax() is called to obtain a DataFrame and float value 
-            containing vaccination information and US vaccination rate, 
-            respectively
-            self.all_time() is called to obtain a DataFrame which contains 
-            aggregated COVID-19 information
-            self.monthlyStats() is called to obtain COVID-19
-            information by month
-            statistics regarding the state chosen by user is printed
-            at the end of the method call
-
-        Attributes:
-            self.datesDF is referenced to store state information chosen 
-            by user
-            self.firstdate and self.seconddate are referenced to store 
-            dates
-            self.allstats is appended with various objects used for 
-            visualization with Graph objects
-
-        Returns:
-            None
+            deletes files from self.directory
         """
 
-        if self.checkParameters() == None:
-            return None
-        else:
-            self.startProgram()
-
-        IRlst=[]
-        CFRlst=[]
-        avgCases=[]
-        avgDeaths=[]
-        totalCases=[]
-        totalDeaths=[]
-        foundstates = []
-        newDF = self.getDF()
-
-        for info in zip(self.finalcases, self.finaldeaths, self.finaldates, self.finalstates):
-            if info[3] == self.state:
-                self.datesDF = pd.DataFrame({'date':info[2],'cases':info[0],'deaths':info[1]})
-            stats=newDF[newDF['state']==info[3]].reset_index(drop=True) # creates DF of each state
-            IRlst.append(round((sum(info[0])/stats['POP2020'].iloc[0])*100000,3)) # IR stats appended to list
-            CFRlst.append(round((sum(info[1])/sum(info[0]))*100,3)) # CFR stats appended to list
-            avgCases.append(round(sum(info[0])/len(info[0]),2)) 
-            avgDeaths.append(round(sum(info[1])/len(info[1]),2))
-            totalCases.append(sum(info[0]))
-            totalDeaths.append(sum(info[1]))
-            foundstates.append(info[3])
-
-        if len(self.datesDF) < 1:
-            print(f"{self.state} not found.")
-            return None
+        charts = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(('.png', '.svg')):
+                info = entry.stat()
+                charts.append((info.st_mtime, info.st_size, entry.path))
 
-        if int(self.datesDF.iloc[0]['date'][5:7]) != self.lastmo:
-            print("'self.lastmo' starting at "+str(int(self.datesDF.iloc[0]['date'][5:7]))+".")
-
-        allStatesDF = pd.DataFrame({'full_name':foundstates,
-                                    'total_cases':totalCases,'total_deaths':totalDeaths,
-                                    'avg_cases':avgCases,'avg_deaths':avgDeaths,
-                                    'cfr':CFRlst,'ir':IRlst})
-
-        self.datesDF.loc[:,'day']=self.datesDF['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%d'))
-        self.datesDF.loc[:,'month']=self.datesDF['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%m'))
-        self.datesDF.loc[:,'year']=self.datesDF['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%y'))
-        self.datesDF=self.datesDF[['date','cases','deaths','day','month','year']]
-        self.datesDF['day']=self.datesDF['day'].astype('int64')
-        self.datesDF['month']=self.datesDF['month'].astype('int64')
-        self.datesDF['year']=self.datesDF['year'].astype('int64')
-
-        popvaxxed, totalVax = self.vax()
-        allStatesDF = allStatesDF.merge(popvaxxed[['full_name','abbr','curr_pop','percent']],on='full_name')
-        self.firstdate=datetime.datetime.strptime(self.datesDF.iloc[0]['date'],'%Y-%m-%d').strftime("%B %d '%y")
-        self.seconddate=datetime.datetime.strptime(self.datesDF.iloc[-1]['date'],'%Y-%m-%d').strftime("%B %d '%y")
-
-        allTime = self.all_time()
-        countedMonths = self.monthlyStats()
-        allTime.columns = ['state', 'all_cases', 'all_deaths', 'day', 'month', 'year', 'POP2020', 'ppsm',
-       'sq_mi', 'all_case', 'all_incidence']
-        allStatesDF = allStatesDF.merge(allTime[['state','all_cases','all_deaths',
-                                                 'ppsm','sq_mi','all_case','all_incidence']],
-                                                 left_on='full_name',right_on='state')
-        stateDF = allStatesDF[allStatesDF['full_name'] == self.state]
-
-        self.allstats.append(allStatesDF)
-        self.allstats.append(stateDF)
-        self.allstats.append(self.datesDF)
-        self.allstats.append(countedMonths)
-        self.allstats.append(totalVax)
-        self.allstats.append((self.firstdate,self.seconddate))
-
-        currYear = int(self.seconddate[-2:])
-        lastYear = int(self.firstdate[-2:])
-        if currYear == lastYear:
-            self.firstdate = self.firstdate[:-4]
-
-        display("State of "+self.state)
-        avgRank=allStatesDF.sort_values(by='avg_cases',ascending=False).reset_index(drop=True)
-        avgRank=avgRank.index[avgRank['full_name'] == self.state]
-        txt="Average of {:,} cases per day in "+str(len(self.datesDF['date']))+" days, currently ranked #"+str(avgRank[0]+1)+" in the United States."                    
-        display(txt.format(round(stateDF.iloc[0]['avg_cases'],2)))
-        avgRank=allStatesDF.sort_values(by='avg_deaths',ascending=False).reset_index(drop=True)
-        avgRank=avgRank.index[avgRank['full_name'] == self.state]
-        txt="Average of {:,} deaths per day in "+str(len(self.datesDF['date']))+" days, currently ranked #"+str(avgRank[0]+1)+" in the United States."
-        display(txt.format(round(stateDF.iloc[0]['avg_deaths'],2)))
-
-        avgRank=allStatesDF.sort_values(by='cfr',ascending=False).reset_index(drop=True)
-        avgRank=avgRank.index[avgRank['full_name'] == self.state]
-        display("Case Fatality Ratio from "+self.firstdate+" to "+self.seconddate+": "+str(stateDF.iloc[0]['cfr'])+"%, currently ranked #"+str(avgRank[0]+1)+" in the United States.")
-        avgRank=allStatesDF.sort_values(by='ir',ascending=False).reset_index(drop=True)
-        avgRank=avgRank.index[avgRank['full_name'] == self.state]
-        txt="Incidence Rate from "+self.firstdate+" to "+self.seconddate+": {:,} per 100k, currently ranked #"+str(avgRank[0]+1)+" in the United States."
-        display(txt.format(stateDF.iloc[0]['ir']))
-        avgRank=allStatesDF.sort_values(by='total_cases',ascending=False).reset_index(drop=True)
-        avgRank=avgRank.index[avgRank['full_name'] == self.state]
-        txt="There have been {:,} cases from "+self.firstdate+" To "+self.seconddate+", currently ranked #{} in the United States."
-        display(txt.format(stateDF.iloc[0]['total_cases'],avgRank[0]+1))
-        avgRank=allStatesDF.sort_values(by='total_deaths',ascending=False).reset_index(drop=True)
-        avgRank=avgRank.index[avgRank['full_name'] == self.state]
-        txt="There have been {:,} deaths from "+self.firstdate+" To "+self.seconddate+", currently ranked #{} in the United States."
-        display(txt.format(stateDF.iloc[0]['total_deaths'],avgRank[0]+1))
-
-        avgRank=allStatesDF.sort_values(by='percent',ascending=False).reset_index(drop=True)
-        avgRank=avgRank.index[avgRank['full_name'] == self.state]
-        display(self.state+" is "+str(stateDF.iloc[0]['percent'])+"% fully vaccinated, currently ranked #"+str(avgRank[0]+1)+" in the United States.")
-        avgRank=allStatesDF.sort_values(by='curr_pop',ascending=False).reset_index(drop=True)
-        avgRank=avgRank.index[avgRank['full_name'] == self.state]
-        txt="Total population: {:,}, ranked #"+str(avgRank[0]+1)+" in the United States."
-        display(txt.format(stateDF.iloc[0]['curr_pop']))
-        avgRank=allStatesDF.sort_values(by='ppsm',ascending=False).reset_index(drop=True)
-        avgRank=avgRank.index[avgRank['full_name'] == self.state]
-        txt="There are {:,} people per square mile, ranked #"+str(avgRank[0]+1)+" in the United States." 
-        display(txt.format(stateDF.iloc[0]['ppsm']))
-        avgRank=allStatesDF.sort_values(by='sq_mi',ascending=False).reset_index(drop=True)
-        avgRank=avgRank.index[avgRank['full_name'] == self.state]
-        txt=self.state+" has {:,} total square miles, ranking #"+str(avgRank[0]+1)+" in the United States."
-        display(txt.format(stateDF.iloc[0]['sq_mi']))
-        avgRank=allStatesDF.sort_values(by='all_case',ascending=False).reset_index(drop=True)
-        avgRank=avgRank.index[avgRank['full_name'] == self.state]
-        display("All Time Case Fatality Ratio: "+str(stateDF.iloc[0]['all_case'])+"%, currently ranked #"+str(avgRank[0]+1)+" in the United States.")
-        avgRank=allStatesDF.sort_values(by='all_incidence',ascending=False).reset_index(drop=True)
-        avgRank=avgRank.index[avgRank['full_name'] == self.state]
-        txt="All Time Incidence Rate: {:,} per 100k, currently ranked #"+str(avgRank[0]+1)+" in the United States."
-        display(txt.format(stateDF.iloc[0]['all_incidence']))
-        display(round(self.datesDF[['cases','deaths']].describe().T,2))
+        total = sum(chart[1] for chart in charts)
+        for mtime, size, path in sorted(charts):
+            if total <= self.maxBytes:
+                break
+            os.remove(path)
+            total -= size
 
         return None
 
 class Graph:
     """ Visualizations for Stats objects.
 
+        Attributes:
+            data (StatsResult):  results being graphed, built from the
+            Stats 'allstats' list when one is given
+            charts (list):  (view, metric, path) of every chart shown from
+            or saved to self.cache
+
         Side effects:
             displays text and various charts to the console
 
         """
 
-    def __init__(self, data):
-        self.data = data
+    def __init__(self, data, context=None, cache=None, profile=None):
+        self.data = data if data is None or isinstance(data, StatsResult) else StatsResult.fromList(data)
+        self.profile = profile if profile is not None else os.environ.get("COVID_PROFILE")
+        self.context = context if context is not None else RenderContext.shared()
+        self.cache = cache
+        self.key = None
+        self.label = None
+        self.charts = []
+        self.frames = {}
 
         print("~~Stats to graph~~")
-        print("'info', 'monthly', 'averages', 'totals', 'cfrir', 'vax'")
+        print("'info', 'monthly', 'rolling', 'bump', 'averages', 'totals', 'cfrir', 'vax', 'grid', 'gridmonthly', 'heatmap'")
         print()
 
     def getPoints(self, allVal, minY, maxY, x, y):
@@ -1204,24 +485,46 @@ class Graph:
 
         return finalmax,finalmin,finalmid,maxDR,minDR,midDR,allmaxs,allmins
 
-    def pretty_graph(self, x, df, cal, feat):
-        """Method that adds colors to the graph
-        
+    def dailyPoints(self, df, feat):
+        """Method that obtains the data points of pretty_graph() from
+        every row of df, whatever line was plotted
+
+        Args:
+            df (DataFrame):  Stats DataFrame object
+            feat (str):  either 'cases' or 'deaths'
+
+        Returns:
+            allVal (numpy array 2D):  position and value of every row
+            points (tuple):  see self.getPoints()
+        """
+
+        y = df[feat].to_numpy(dtype='float64')
+        x = np.arange(len(y), dtype='float64')
+        allVal = np.column_stack([x, y])
+
+        return allVal, self.getPoints(allVal, y.min(), y.max(), x, y)
+
+    def statsText(self, df, cal, feat, title=None):
+        """Method that prints the statistics of a graph
+
+        The statistics are read from every row of df, so they do not
+        depend on downsampling or on the chart being found in self.cache.
+
         Args:
-            x (matplotlib subplot):  axes subplot from seaborn graph
             df (DataFrame):  Stats DataFrame object
             cal (DataFrame):  attribute 'date' found in Stats DataFrame object
             feat (DataFrame):  attribute of either 'cases' or 'deaths' from
             Stats DataFrame object
-        
+            title (str):  optional title of the graph, naming the county
+            of county graphs
+
         Side effects:
-            information from Stats DataFrame object is printed to the 
+            information from Stats DataFrame object is printed to the
             console
-            graph is displayed to the console
-            self.getPoints() is called to obtain data points for graphing
 
         Returns:
-            None
+            allVal (numpy array 2D):  position and value of every row
+            points (tuple):  see self.getPoints()
         """
 
         checkMonthly = False
@@ -1234,21 +537,10 @@ class Graph:
             checkMonthly = True
 
         np.set_printoptions(suppress=True)
-        l1=x.lines[0]
-
-        xmaxp=max(l1.get_xydata()[:,0])
-        xminp=min(l1.get_xydata()[:,0])
-        xavgp=sum(l1.get_xydata()[:,0])/len(l1.get_xydata()[:,0])
-        ymaxp=max(l1.get_xydata()[:,1])
-        yminp=min(l1.get_xydata()[:,1])
-        yavgp=sum(l1.get_xydata()[:,1])/len(l1.get_xydata()[:,1])
-
-        x1 = l1.get_xydata()[:,0]
-        y1 = l1.get_xydata()[:,1]
-
+        allVal, points = self.dailyPoints(df, feat)
         (finalmax,finalmin,finalmid,
         maxDR,minDR,midDR,
-        allmaxs,allmins) = self.getPoints(l1.get_xydata(),yminp,ymaxp,x1,y1)
+        allmaxs,allmins) = points
 
         indexDeaths=df[feat].tolist().index(df[feat].max())
         maxMo=df[cal].iloc[indexDeaths]
@@ -1257,27 +549,6 @@ class Graph:
         minMo=df[cal].iloc[indexDeaths]
         minDeaths=df[feat].iloc[indexDeaths]
 
-        x.fill_between(x1,y1,color='blue',alpha=0.1)
-        avgline=x.axhline(yavgp,color='black',linewidth=2.5)
-
-        if len(finalmax) > 1:
-            for allthemaxs in finalmax:
-                maxP=x.fill_between(allthemaxs[0],allthemaxs[1],color='red')
-        else:
-            maxP=x.fill_between(finalmax[0][0],finalmax[0][1],color='red')
-
-        if len(finalmin) > 1:
-            for allthemins in finalmin:
-                minP=x.fill_between(allthemins[0],allthemins[1],color='green')
-        else:
-            minP=x.fill_between(finalmin[0][0],finalmin[0][1],color='green')
-
-        if len(finalmid) > 1:
-            for allthemids in finalmid:
-                midP=x.fill_between(allthemids[0],allthemids[1],color='purple')
-        else:
-            midP=x.fill_between(finalmid[0][0],finalmid[0][1],color='purple')
-
         checkMonths = ["January '20","February '20","March '20","April '20","May '20","June '20","July '20",
                        "August '20","September '20","October '20","November '20","December '20","January '21",
                        "February '21","March '21","April '21","May '21","June '21","July '21","August '21",
@@ -1300,11 +571,11 @@ class Graph:
                 seconddate = datetime.datetime.strptime(df[cal].iloc[-1],'%Y-%m-%d').strftime("%B '%y")
 
         if minMo in checkMonths:
-            findCounty = re.search(r"^.+County", x.title.get_text())
+            findCounty = re.search(r"^.+County", title or "")
             state = findCounty.group(0)
             print(state+" statistics from "+firstdate+" to "+seconddate+".")
         else:
-            print(self.data[0]+" statistics from "+firstdate+" to "+seconddate+".")
+            print(self.data.state+" statistics from "+firstdate+" to "+seconddate+".")
             if len(allmins) > 1:
                 for num in allmins:
                     minMo=df[cal].iloc[int(num[0])]
@@ -1364,46 +635,459 @@ class Graph:
         txt="Largest drop in "+feat+": {:,}"
         print(txt.format(midDR))
 
-        logo = img.imread(fname='watermarkMAR.png')
-        x.figure.figimage(logo,110,270,alpha=0.5)
-
-        plt.legend(labels=['smallest drop','largest drop','largest increase','average rate'],
-                       handles=[minP,midP,maxP,avgline], shadow=True, title=feat.capitalize(),
-                      title_fontsize='large', borderpad=0.3, fontsize='small')
-        plt.show()
-
-        return None
+        return allVal, points
 
-    def monthlyDF(self):
-        """Generates a DataFrame for Graph object visualization
+    def pretty_graph(self, x, df, cal, feat, text=True):
+        """Method that adds colors to the graph
+        
+        Args:
+            x (matplotlib subplot):  axes subplot from seaborn graph
+            df (DataFrame):  Stats DataFrame object
+            cal (DataFrame):  attribute 'date' found in Stats DataFrame object
+            feat (DataFrame):  attribute of either 'cases' or 'deaths' from
+            Stats DataFrame object
+            text (bool):  prints the statistics of the graph when True,
+            see self.statsText()
+        
+        Side effects:
+            information from Stats DataFrame object is printed to the 
+            console
+            graph is displayed to the console
+            the average and the highlighted increases and drops are
+            found from every row of df, so a downsampled line still
+            shows the real days
 
         Returns:
-            monthlyDF (DataFrame):  contains COVID-19 statistics ordered
-            by month; columns include deaths, cases, average deaths,
-            average cases        
+            None
         """
 
-        dates = []
-        deaths = []
-        cases = []
-        avgDeaths = []
-        avgCases = []
-        states = []
-        test = []
-        count = 0
+        if text:
+            allVal, points = self.statsText(df, cal, feat, x.title.get_text())
+        else:
+            allVal, points = self.dailyPoints(df, feat)
+        finalmax, finalmin, finalmid = points[:3]
 
-        for mo in self.data[5]:
-            dates.append(mo[0])
-            deaths.append(mo[1])
-            cases.append(mo[2])
-            avgDeaths.append(mo[3])
-            avgCases.append(mo[4])
+        l1=x.lines[0]
+        x1 = l1.get_xydata()[:,0]
+        y1 = l1.get_xydata()[:,1]
+        yavgp=allVal[:,1].mean()
 
-        monthlyDF = pd.DataFrame({'date':dates,'deaths':deaths,'cases':cases,'avg_deaths':avgDeaths,'avg_cases':avgCases})
+        x.fill_between(x1,y1,color='blue',alpha=0.1)
+        avgline=x.axhline(yavgp,color='black',linewidth=2.5)
 
-        return monthlyDF
+        if len(finalmax) > 1:
+            for allthemaxs in finalmax:
+                maxP=x.fill_between(allthemaxs[0],allthemaxs[1],color='red')
+        else:
+            maxP=x.fill_between(finalmax[0][0],finalmax[0][1],color='red')
 
-    def setGraphSize(self, df, stat):
+        if len(finalmin) > 1:
+            for allthemins in finalmin:
+                minP=x.fill_between(allthemins[0],allthemins[1],color='green')
+        else:
+            minP=x.fill_between(finalmin[0][0],finalmin[0][1],color='green')
+
+        if len(finalmid) > 1:
+            for allthemids in finalmid:
+                midP=x.fill_between(allthemids[0],allthemids[1],color='purple')
+        else:
+            midP=x.fill_between(finalmid[0][0],finalmid[0][1],color='purple')
+
+        logo = self.context.logo()
+        x.figure.figimage(logo,110,270,alpha=0.5)
+
+        plt.legend(labels=['smallest drop','largest drop','largest increase','average rate'],
+                       handles=[minP,midP,maxP,avgline], shadow=True, title=feat.capitalize(),
+                      title_fontsize='large', borderpad=0.3, fontsize='small')
+        self.toCache(x.figure)
+        plt.show()
+
+        return None
+
+    def fromCache(self, view, metric, state, df, extra=None):
+        """Method that shows a chart saved in self.cache
+
+        Args:
+            view (str):  Graph view, e.g. 'info' or 'averages'
+            metric (str):  column being graphed
+            state (str):  name of US state, None for charts of every state
+            df (DataFrame):  data being graphed
+            extra (tuple):  other options changing the chart
+
+        Side effects:
+            the saved chart is displayed and added to self.charts; when it
+            is missing, its key is stored in self.key for self.toCache(),
+            and the key of any earlier chart that was never saved is
+            dropped
+
+        Returns:
+            found (bool):  True if the chart was displayed from self.cache
+        """
+
+        self.key = None
+        self.label = None
+        if self.cache is None:
+            return False
+
+        key = self.cache.key(view, metric, state, self.data.period, df, extra, self.context.version)
+        path = self.cache.get(key)
+        if path is None:
+            self.key = key
+            self.label = (view, metric)
+            return False
+        self.charts.append((view, metric, path))
+
+        try:
+            from IPython.display import Image, SVG, display as show
+            show(SVG(filename=path) if path.endswith('.svg') else Image(filename=path))
+        except ImportError:
+            print(path)
+
+        return True
+
+    def toCache(self, fig):
+        """Method that saves the chart just rendered to self.cache
+
+        Args:
+            fig (matplotlib figure):  rendered chart
+
+        Side effects:
+            the chart is saved and added to self.charts when
+            self.fromCache() did not find it
+        """
+
+        if self.cache is not None and self.key is not None:
+            path = self.cache.put(self.key, fig)
+            self.charts.append(self.label+(path,))
+            self.key = None
+
+        return None
+
+    def lttb(self, y, points):
+        """Method that picks points using largest-triangle-three-buckets
+
+        Args:
+            y (numpy array):  values of 'cases' or 'deaths', one per day
+            points (int):  number of points to keep
+
+        Returns:
+            keep (numpy array):  positions of the kept points; the first
+            and last day are always kept
+        """
+
+        n = len(y)
+        edges = np.linspace(1, n-1, points-1).astype('int64')
+        keep = np.empty(points, dtype='int64')
+        keep[0] = 0
+        keep[-1] = n-1
+        a = 0
+
+        for i in range(points-2):
+            start, end = edges[i], edges[i+1]
+            if i+2 < len(edges):
+                nextx = np.arange(edges[i+1], edges[i+2])
+            else:
+                nextx = np.array([n-1])
+            avgx = nextx.mean()
+            avgy = y[nextx].mean()
+            xs = np.arange(start, end)
+            area = np.abs((a-avgx)*(y[start:end]-y[a]) - (a-xs)*(avgy-y[a]))
+            a = start + int(area.argmax())
+            keep[i+1] = a
+
+        return keep
+
+    def minMaxBuckets(self, y, points):
+        """Method that keeps the lowest and highest point of each bucket
+
+        Args:
+            y (numpy array):  values of 'cases' or 'deaths', one per day
+            points (int):  number of points to keep, two per bucket
+
+        Returns:
+            keep (numpy array):  positions of the kept points
+        """
+
+        edges = np.linspace(0, len(y), max(points//2, 1)+1).astype('int64')
+        keep = []
+
+        for start, end in zip(edges[:-1], edges[1:]):
+            if end <= start:
+                continue
+            keep.append(start+int(y[start:end].argmin()))
+            keep.append(start+int(y[start:end].argmax()))
+
+        return np.unique(keep)
+
+    def downsample(self, df, feat, points=500, method="lttb"):
+        """Method that reduces a daily Stats DataFrame to fewer points
+        for plotting
+
+        Every day holding the highest or lowest value of 'feat' is kept,
+        and so are the two days around its largest day-over-day increase
+        and drop, so the line passes through the days highlighted by
+        pretty_graph(), which reads them from every row of df.  With
+        'pyramid' the line holds daily averages of whole weeks, months or
+        quarters instead, see self.pyramidDF().
+
+        Args:
+            df (DataFrame):  Stats DataFrame object
+            feat (str):  either 'cases' or 'deaths'
+            points (int):  number of points to keep
+            method (str):  either 'lttb', 'minmax' or 'pyramid'
+
+        Side effects:
+            if the method is not valid, a message is printed to the
+            console and the method returns None
+
+        Returns:
+            sampled (DataFrame):  kept rows of df, with a 'pos' column
+            holding each row's position in df
+        """
+
+        if method == "pyramid":
+            return self.pyramidDF(df, feat, points)
+
+        y = df[feat].to_numpy(dtype='float64')
+
+        if len(y) <= points or points < 3:
+            keep = np.arange(len(y))
+        elif method == "lttb":
+            keep = self.lttb(y, points)
+        elif method == "minmax":
+            keep = self.minMaxBuckets(y, points)
+        else:
+            print("Downsampling method must be 'lttb', 'minmax' or 'pyramid'.")
+            return None
+
+        keep = np.union1d(keep, np.flatnonzero(y == y.max()))
+        keep = np.union1d(keep, np.flatnonzero(y == y.min()))
+        if len(y) > 1:
+            change = np.diff(y)
+            keep = np.union1d(keep, np.flatnonzero((change == change.max()) | (change == change.min()))
+                              + np.array([[0], [1]]))
+        sampled = df.iloc[keep].copy()
+        sampled.loc[:,'pos'] = keep
+
+        return sampled
+
+    def pyramidDF(self, df, feat, points=500):
+        """Method that reads the values of the chosen state at the
+        coarsest level of the TimePyramid still giving 'points' points
+
+        A level is only picked when it has at least 'points' buckets, so
+        with the default of 500 points every window shorter than about
+        ten years stays daily; the pyramid is meant for 'points' near the
+        number of points the chart has room for, e.g. 60 to 200.
+        pretty_graph() still reads its statistics from the daily values.
+
+        Args:
+            df (DataFrame):  Stats DataFrame object of the chosen state
+            feat (str):  either 'cases' or 'deaths'
+            points (int):  number of points the graph has room for
+
+        Returns:
+            sampled (DataFrame):  one row per day, ISO week, month or
+            quarter with the first date reported, the daily average of
+            'feat' and a 'pos' column holding the position of that date
+            in df
+        """
+
+        level, bucketDF = self.data.pyramid().query(self.data.state, points)
+        sampled = pd.DataFrame({'date':bucketDF['first'], feat:bucketDF['avg_'+feat]})
+        sampled.loc[:,'pos'] = np.searchsorted(df['date'].to_numpy().astype('datetime64[D]'),
+                                               bucketDF['first'].to_numpy().astype('datetime64[D]'))
+
+        return sampled
+
+    def lineGraph(self, df, feat, xlist, xlabel, downsample=None, points=500):
+        """Method that draws the line of an 'info' graph
+
+        Args:
+            df (DataFrame):  Stats DataFrame object
+            feat (str):  either 'cases' or 'deaths'
+            xlist (list):  list of dates
+            xlabel (list):  list of formatted dates, one per day
+            downsample (str):  optional downsampling method, see
+            self.downsample()
+            points (int):  number of points kept when downsampling
+
+        Returns:
+            x (matplotlib subplot):  axes subplot from seaborn graph; when
+            downsampling, x values are positions of days in df
+        """
+
+        if downsample is None:
+            x=sns.lineplot(data=df,y=feat,x='date',ci=None, linewidth=7, color='black')
+            x.set_xticks(xlist)
+            x.set_xticklabels(xlabel)
+            return x
+
+        sampled = self.downsample(df, feat, points, downsample)
+        if sampled is None:
+            return self.lineGraph(df, feat, xlist, xlabel)
+
+        x=sns.lineplot(x=sampled['pos'].to_numpy(),y=sampled[feat].to_numpy(),
+                       ci=None, linewidth=7, color='black')
+        ticks, labels = self.thinTicks(df, xlist, xlabel)
+        x.set_xticks(ticks)
+        x.set_xticklabels(labels)
+        x.set_xlim(0, len(df)-1)
+
+        return x
+
+    def thinTicks(self, df, xlist, xlabel, ticks=60):
+        """Method that keeps evenly spaced ticks of self.setGraphSize()
+
+        Every tick carries a rotated label, and laying out one label per
+        day is most of the time spent saving a long chart.
+
+        Args:
+            df (DataFrame):  Stats DataFrame object
+            xlist (list):  list of dates, see self.setGraphSize()
+            xlabel (list):  list of formatted dates matching xlist
+            ticks (int):  most ticks kept
+
+        Returns:
+            positions (numpy array):  positions of the kept dates in df
+            labels (list):  formatted dates of the kept ticks
+        """
+
+        keep = np.arange(0, len(xlist), max(-(-len(xlist)//ticks), 1))
+        days = df['date'].to_numpy().astype('datetime64[D]')
+        positions = np.searchsorted(days, np.asarray(xlist, dtype='datetime64[D]')[keep])
+
+        return positions, [xlabel[num] for num in keep]
+
+    def waveOverlay(self, x, df, feat):
+        """Method that shades the waves of the chosen state on an 'info'
+        graph and marks their peaks, see StatsResult.waves()
+
+        Args:
+            x (matplotlib subplot):  axes subplot from self.lineGraph()
+            df (DataFrame):  Stats DataFrame object
+            feat (str):  either 'cases' or 'deaths'
+
+        Side effects:
+            adds shaded spans and peak markers to x; no lines are added,
+            so self.pretty_graph() still reads the daily line
+
+        Returns:
+            waveDF (DataFrame):  waves of the chosen state overlapping df
+        """
+
+        waveDF = self.data.waves(feat).forState(self.data.state)
+        days = df['date'].to_numpy().astype('datetime64[D]')
+        peaks = waveDF['peak'].to_numpy().astype('datetime64[D]')
+        start = np.searchsorted(days, waveDF['start'].to_numpy().astype('datetime64[D]'))
+        peak = np.searchsorted(days, peaks)
+        end = np.minimum(np.searchsorted(days, waveDF['end'].to_numpy().astype('datetime64[D]')), len(days)-1)
+        shown = end > start
+        inside = shown & np.isin(peaks, days)
+
+        for num in np.flatnonzero(shown):
+            x.axvspan(start[num], end[num], color='orange' if waveDF['wave'].iloc[num] % 2 else 'gold',
+                      alpha=0.12, zorder=0)
+        x.scatter(peak[inside], waveDF['peak_value'].to_numpy()[inside], s=300, marker='v',
+                  color='darkorange', edgecolors='black', zorder=5)
+        for num in np.flatnonzero(inside):
+            x.annotate("Wave "+str(waveDF['wave'].iloc[num]), (peak[num], waveDF['peak_value'].iloc[num]),
+                       xytext=(0, 25), textcoords='offset points', ha='center', fontsize=20)
+
+        return waveDF[shown].reset_index(drop=True)
+
+    def rollingDF(self, feat='cases', windows=(7, 14, 28), center=False):
+        """Generates the daily values and moving averages of the chosen
+        state
+
+        Args:
+            feat (str):  either 'cases' or 'deaths'
+            windows (tuple):  lengths of the moving averages in days
+            center (bool):  centered instead of trailing averages, see
+            StatsResult.rolling()
+
+        Side effects:
+            the DataFrame is kept in self.frames and reused on later calls
+
+        Returns:
+            rollingDF (DataFrame):  one row per day with the date, the
+            daily value and one 'avg<window>' column per window
+        """
+
+        if ('rolling', feat, windows, center) in self.frames:
+            return self.frames[('rolling', feat, windows, center)]
+
+        datesDF = self.data.datesDF
+        row = np.flatnonzero(self.data.states == self.data.state)[0]
+        days = np.searchsorted(self.data.dates, datesDF['date'].to_numpy().astype('datetime64[D]'))
+        rollingDF = datesDF[['date', feat]].reset_index(drop=True)
+        for window in windows:
+            rollingDF['avg'+str(window)] = self.data.rolling(feat, window, center)[row, days]
+
+        self.frames[('rolling', feat, windows, center)] = rollingDF
+
+        return rollingDF
+
+    def rollingGraph(self, feat='cases', df=None):
+        """Method that draws the daily values of the chosen state under
+        their moving averages
+
+        Args:
+            feat (str):  either 'cases' or 'deaths'
+            df (DataFrame):  optional output of self.rollingDF()
+
+        Returns:
+            fig (matplotlib figure):  line graph with one line per average
+        """
+
+        if df is None:
+            df = self.rollingDF(feat)
+        xs = np.arange(len(df))
+        months = np.flatnonzero(df['date'].str[8:10].to_numpy() == '01')
+        if len(months) == 0 or months[0] != 0:
+            months = np.concatenate([[0], months])
+
+        self.context.apply()
+        fig, x = plt.subplots(figsize=(40, 20))
+        x.plot(xs, df[feat].to_numpy(), color='silver', linewidth=3, label="Daily")
+        for col, color in zip([col for col in df.columns if col.startswith('avg')], ['black', 'tab:red', 'tab:blue']):
+            x.plot(xs, df[col].to_numpy(), color=color, linewidth=7, label=col[3:]+"-Day Average")
+        x.set_xticks(months)
+        x.set_xticklabels([datetime.datetime.strptime(day, "%Y-%m-%d").strftime("%b '%y")
+                           for day in df['date'].iloc[months]], rotation=65)
+        x.set_xlim(0, len(df)-1)
+        x.legend(loc='upper left')
+
+        firstdate, seconddate = self.data.period
+        rate = "Case" if feat == 'cases' else "Death"
+        x.set_title(self.data.state+" COVID-19 "+rate+" Rate Moving Averages From "+firstdate+" To "+seconddate,
+                    fontsize=35)
+        x.set_xlabel("Dates")
+        x.set_ylabel(feat.capitalize())
+        fig.figimage(self.context.logo(), 110, 270, alpha=0.5)
+
+        return fig
+
+    def monthlyDF(self):
+        """Generates a DataFrame for Graph object visualization
+
+        Returns:
+            monthlyDF (DataFrame):  contains COVID-19 statistics ordered
+            by month; columns include deaths, cases, average deaths,
+            average cases, read from the month level of the TimePyramid
+            of the data; dates are the first day reported in each month
+        """
+
+        month = self.data.pyramid().table('month', self.data.state)
+        monthlyDF = pd.DataFrame({'date':month['first'],
+                                  'deaths':month['deaths'].astype('int64'),
+                                  'cases':month['cases'].astype('int64'),
+                                  'avg_deaths':month['avg_deaths'].round(2),
+                                  'avg_cases':month['avg_cases'].round(2)})
+
+        return monthlyDF
+
+    def setGraphSize(self, df, stat):
         """Method that sets the length of the graph
 
         Side effects:
@@ -1444,8 +1128,8 @@ class Graph:
 
         if stat == "info":
 
-            firstdate = self.data[7][0]
-            seconddate = self.data[7][1]
+            firstdate = self.data.period[0]
+            seconddate = self.data.period[1]
 
             xlabel = df['date'].apply(lambda x: datetime.datetime.strptime(x, "%Y-%m-%d").strftime("%B %d")).tolist()
             xlist = df['date'].tolist()
@@ -1568,12 +1252,314 @@ class Graph:
 
         return first, firstdate, seconddate, xlabel, xlist
 
-    def getGraph(self, col):
+    def statesDF(self, feat='cases', level='day'):
+        """Generates a DataFrame of daily values for every US state
+
+        Args:
+            feat (str):  either 'cases' or 'deaths'
+            level (str):  'day', or 'week', 'month' or 'quarter' for the
+            sums of every ISO week, month or quarter read from the
+            TimePyramid of the data
+
+        Side effects:
+            the DataFrame is kept in self.frames and reused on later calls
+
+        Returns:
+            statesDF (DataFrame):  one row per date, or per first day of
+            each week, month or quarter, and one column per state; dates
+            without reports are NaN
+        """
+
+        key = feat if level == 'day' else (level, feat)
+        if key in self.frames:
+            return self.frames[key]
+
+        if level == 'day':
+            values, dates = self.data.cases if feat == 'cases' else self.data.deaths, self.data.dates
+        else:
+            frame = self.data.pyramid().pyramid[level]
+            values, dates = frame[feat], frame['start']
+        statesDF = pd.DataFrame(values.T, index=pd.DatetimeIndex(dates, name='date'),
+                                columns=pd.Index(self.data.states, name='state')).sort_index(axis=1)
+        self.frames[key] = statesDF
+
+        return statesDF
+
+    def similarOrder(self, clusters=6):
+        """Method that orders the states so states whose case and death
+        curves moved together are next to each other, see Similarity
+
+        Args:
+            clusters (int):  number of clusters of states
+
+        Side effects:
+            the order is kept in self.frames and reused on later calls
+
+        Returns:
+            states (list):  every state, ordered by cluster
+        """
+
+        if ('similar', clusters) not in self.frames:
+            self.frames[('similar', clusters)] = self.data.similarity().order(clusters)
+
+        return self.frames[('similar', clusters)]
+
+    def weeklyMatrix(self, metric='ir'):
+        """Generates a state by week matrix of incidence per 100k or
+        case fatality ratio
+
+        Args:
+            metric (str):  either 'ir' for cases per 100k of the
+            population of that year or 'cfr' for the percent of cases
+            resulting in death
+
+        Side effects:
+            the matrix is kept in self.frames and reused on later calls,
+            including by other views
+
+        Returns:
+            weeklyDF (DataFrame):  one row per state and one column per
+            week, labeled by the Monday starting each week
+        """
+
+        if ('weekly', metric) in self.frames:
+            return self.frames[('weekly', metric)]
+
+        cases = self.statesDF('cases', 'week')
+        if metric == 'cfr':
+            deaths = self.statesDF('deaths', 'week')
+            weeklyDF = (deaths / cases.where(cases > 0) * 100).T
+        else:
+            weeklyDF = self.perCapita(cases).T
+
+        self.frames[('weekly', metric)] = weeklyDF
+
+        return weeklyDF
+
+    def heatmap(self, metric='ir', df=None):
+        """Method that draws a state by week matrix as one image
+
+        Args:
+            metric (str):  either 'ir' or 'cfr', see self.weeklyMatrix()
+            df (DataFrame):  optional output of self.weeklyMatrix()
+
+        Returns:
+            fig (matplotlib figure):  heatmap with one row per state
+        """
+
+        if df is None:
+            df = self.weeklyMatrix(metric)
+        abbr = self.data.allStatesDF.set_index('full_name')['abbr']
+        values = np.ma.masked_invalid(df.to_numpy(dtype='float64'))
+        vmax = np.nanpercentile(df.to_numpy(dtype='float64'), 99)
+        ticks = np.arange(0, df.shape[1], max(df.shape[1]//12, 1))
+
+        self.context.apply()
+        fig, x = plt.subplots(figsize=(40, 30))
+        image = x.imshow(values, aspect='auto', interpolation='nearest', cmap='magma_r',
+                         vmin=0, vmax=vmax)
+        x.grid(False)
+        x.set_yticks(np.arange(df.shape[0]))
+        x.set_yticklabels([abbr.get(sts, sts) for sts in df.index], fontsize=20)
+        x.set_xticks(ticks)
+        x.set_xticklabels([df.columns[tick].strftime("%b %d '%y") for tick in ticks], rotation=65)
+        bar = fig.colorbar(image, ax=x, pad=0.01)
+        bar.set_label("Percent" if metric == 'cfr' else "Cases Per 100K")
+
+        dates = self.data.period
+        title = "Weekly COVID-19 Case Fatality Ratio" if metric == 'cfr' else "Weekly COVID-19 Incidence Rate"
+        x.set_title(title+" from "+dates[0]+" to "+dates[1], fontsize=35)
+        x.set_xlabel("Weeks")
+        x.set_ylabel("States")
+        fig.figimage(self.context.logo(), 110, 270, alpha=0.5)
+
+        return fig
+
+    def bumpChart(self, metric='ir', level='month', df=None):
+        """Method that draws the rank of every state in every period,
+        with the chosen state highlighted
+
+        Args:
+            metric (str):  see StatsResult.rankTrajectory()
+            level (str):  'week', 'month' or 'quarter'
+            df (DataFrame):  optional ranks from
+            StatsResult.rankTrajectory()
+
+        Returns:
+            fig (matplotlib figure):  one line per state, rank 1 on top
+        """
+
+        if df is None:
+            df = self.data.rankTrajectory(metric, level)[1]
+        abbr = self.data.allStatesDF.set_index('full_name')['abbr']
+        xs = np.arange(df.shape[1])
+        labels = {'ir':"Incidence Rate", 'cfr':"Case Fatality Ratio", 'avg_cases':"Average Cases",
+                  'avg_deaths':"Average Deaths", 'total_cases':"Total Cases", 'total_deaths':"Total Deaths"}
+
+        self.context.apply()
+        fig, x = plt.subplots(figsize=(40, 30))
+        for state, ranks in df.iterrows():
+            ranks = ranks.to_numpy()
+            chosen = state == self.data.state
+            x.plot(xs, ranks, color='tab:red' if chosen else 'silver', linewidth=7 if chosen else 2,
+                   marker='o' if chosen else None, markersize=15, zorder=3 if chosen else 1)
+            valid = np.flatnonzero(~np.isnan(ranks))
+            if len(valid):
+                x.annotate(abbr.get(state, state), (xs[valid[-1]], ranks[valid[-1]]), xytext=(10, 0),
+                           textcoords='offset points', va='center', fontsize=20,
+                           color='tab:red' if chosen else 'dimgray')
+        x.invert_yaxis()
+        x.set_yticks(np.concatenate([[1], np.arange(5, df.shape[0]+1, 5)]))
+        x.set_xticks(xs)
+        fmt = "%b '%y" if level in ('month', 'quarter') else "%b %d '%y"
+        x.set_xticklabels([day.strftime(fmt) for day in df.columns], rotation=65)
+        x.set_xlim(-0.5, len(xs)-0.5)
+
+        firstdate, seconddate = self.data.period
+        x.set_title(self.data.state+" COVID-19 "+labels[metric]+" Rank by "+level.capitalize()
+                    +" From "+firstdate+" To "+seconddate, fontsize=35)
+        x.set_xlabel("Dates")
+        x.set_ylabel("Rank")
+        fig.figimage(self.context.logo(), 110, 270, alpha=0.5)
+
+        return fig
+
+    def perCapitaDF(self, feat='cases', monthly=False):
+        """Generates a DataFrame of cases or deaths per 100k of the
+        population of each year for every US state found in the Stats
+        object
+
+        Args:
+            feat (str):  either 'cases' or 'deaths'
+            monthly (bool):  sums each month when True
+
+        Returns:
+            perCapitaDF (DataFrame):  one row per date or month and one
+            column per state
+        """
+
+        return self.perCapita(self.statesDF(feat, 'month' if monthly else 'day'))
+
+    def perCapita(self, df):
+        """Divides the values of every state by its population in the
+        year of each row, see StatsResult.population()
+
+        Args:
+            df (DataFrame):  one row per date and one column per state,
+            see self.statesDF()
+
+        Returns:
+            perCapitaDF (DataFrame):  values per 100k, without the states
+            whose population is not known
+        """
+
+        pop = self.data.population(df.columns.to_numpy()[None, :], df.index.to_numpy()[:, None])
+        known = ~np.isnan(pop).all(axis=0)
+
+        return (df / pop * 100000).loc[:, known]
+
+    def smallMultiples(self, feat='cases', monthly=False, ncols=8, df=None):
+        """Method that draws every state's series into one grid figure
+
+        Args:
+            feat (str):  either 'cases' or 'deaths'
+            monthly (bool):  draws monthly sums instead of daily values
+            ncols (int):  number of columns in the grid
+            df (DataFrame):  optional output of self.perCapitaDF()
+
+        Returns:
+            fig (matplotlib figure):  grid with one shared-axis subplot
+            per state
+        """
+
+        if df is None:
+            df = self.perCapitaDF(feat, monthly)
+        abbr = self.data.allStatesDF.set_index('full_name')['abbr']
+        nrows = -(-len(df.columns) // ncols)
+        xs = np.arange(len(df))
+        values = df.to_numpy()
+        ymin = min(np.nanmin(values), 0)
+        ymax = np.nanmax(values)*1.05
+        ticks = np.linspace(0, len(df)-1, 4).astype('int64')
+        fmt = "%b '%y" if monthly or len(df) > 92 else "%b %d"
+        labels = [df.index[tick].strftime(fmt) for tick in ticks]
+
+        # axes are not shared through matplotlib; identical limits and
+        # ticks are set directly, which avoids sibling updates on every draw
+        self.context.apply()
+        fig, axes = plt.subplots(nrows, ncols, figsize=(5*ncols, 4*nrows), squeeze=False)
+        fig.subplots_adjust(left=0.05, right=0.99, bottom=0.08, top=0.93, wspace=0.08, hspace=0.3)
+        for num, ax in enumerate(axes.flat):
+            if num >= len(df.columns):
+                ax.set_visible(False)
+                continue
+            ax.plot(xs, values[:, num], color='black', linewidth=2)
+            ax.fill_between(xs, values[:, num], color='blue', alpha=0.1)
+            ax.set_title(abbr.get(df.columns[num], df.columns[num]), fontsize=28)
+            ax.set_xlim(0, len(df)-1)
+            ax.set_ylim(ymin, ymax)
+            ax.set_xticks(ticks)
+            if num // ncols == nrows-1 or num+ncols >= len(df.columns):
+                ax.set_xticklabels(labels, rotation=65, fontsize=18)
+            else:
+                ax.set_xticklabels([])
+            if num % ncols == 0:
+                ax.tick_params(axis='y', labelsize=18)
+            else:
+                ax.set_yticklabels([])
+
+        dates = self.data.period
+        period = "Monthly " if monthly else "Daily "
+        fig.suptitle(period+feat.capitalize()+" Per 100K from "+dates[0]+" to "+dates[1], fontsize=40)
+        fig.figimage(self.context.logo(), 110, 270, alpha=0.5)
+
+        return fig
+
+    def renderStates(self, feat='cases', states=None, directory='charts', fmt='png'):
+        """Method that saves the 'info' graph of many states, reusing one
+        figure through a TemplateRenderer
+
+        Args:
+            feat (str):  either 'cases' or 'deaths'
+            states (list):  names of US states, every state by default
+            directory (str):  folder where charts are saved
+            fmt (str):  image format, e.g. 'png' or 'svg'
+
+        Side effects:
+            saves one chart per state to directory
+
+        Returns:
+            paths (dict):  file saved for each state
+        """
+
+        wanted = set(self.data.states if states is None else states)
+        firstdate, seconddate = self.data.datesDF.iloc[0]['date'], self.data.datesDF.iloc[-1]['date']
+        os.makedirs(directory, exist_ok=True)
+
+        paths = {}
+        renderer = TemplateRenderer(self, feat)
+        for sts in self.data.states:
+            if sts not in wanted:
+                continue
+            dates, vals = self.data.series(sts, feat)
+            if len(vals) < 2:
+                continue
+            path = os.path.join(directory, sts.replace(" ", "_")+"_"+feat+"_"+firstdate+"_"+seconddate+"."+fmt)
+            paths[sts] = renderer.render(sts, dates, vals, path)
+        renderer.close()
+
+        return paths
+
+    def getGraph(self, col, downsample=None, points=500):
         """Method that graphs Stats DataFrame objects
-        
+
         Args:
             col (str):  attribute used to direct flow control
-        
+            downsample (str):  optional downsampling method for the 'info'
+            graphs, either 'lttb', 'minmax' or 'pyramid'; by default
+            every day is plotted
+            points (int):  number of points kept when downsampling
+
         Side effects:
             self.monthlyDF() is called to obtain a DataFrame for
             graphing
@@ -1585,56 +1571,77 @@ class Graph:
 
         Attributes:
             self.data is used to provide information for graphing
-            Stats object        
+            Stats object
+            self.profile, when set, is a folder receiving a profile of
+            the view named after the state, date range and view
+            self.key is cleared when the view ends, even when drawing
+            fails, so a failed chart is never saved under its key
         """
 
-        if len(self.data) < 1:
+        try:
+            if self.profile is None or self.data is None:
+                return self.renderGraph(col, downsample, points)
+
+            dates = self.data.datesDF['date']
+            name = "graph_%s_%s_%s_%s" % (self.data.state, dates.iloc[0], dates.iloc[-1], col)
+            with Profiler.wrap(self.profile, name):
+                self.renderGraph(col, downsample, points)
+        finally:
+            self.key = None
+            self.label = None
+
+        return None
+
+    def renderGraph(self, col, downsample=None, points=500):
+        """Method that draws the graphs of one view, see self.getGraph()"""
+
+        if self.data is None:
             print("No data found.")
             return None
 
-        name = self.data[0]
+        name = self.data.state
 
         if col == "info":
 
-            finalDF = self.data[4]
+            finalDF = self.data.datesDF
             first, firstdate, seconddate, xlabel, xlist = self.setGraphSize(finalDF,"info")
 
             figsize=(first,20)
-            sns.set(font_scale=3)
-            sns.set_style("whitegrid")
-            plt.figure(figsize=figsize)
-            x=sns.lineplot(data=finalDF,y='cases',x='date',ci=None, linewidth=7, color='black')
-            x.tick_params(axis='x', rotation=65)
-            if int(firstdate[-2:]) == int(seconddate[-2:]):
-                x.set_title(name+" COVID-19 Case Rate From "+firstdate[:-4]+" To "+seconddate,fontsize=35);
-            else:
-                x.set_title(name+" COVID-19 Case Rate From "+firstdate+" To "+seconddate,fontsize=35);
-            x.set_xlabel("Dates")
-            x.set_ylabel("Cases")
-            x.set_xticks(xlist)
-            x.set_xticklabels(xlabel)
-            self.pretty_graph(x, finalDF, finalDF.columns[0], finalDF.columns[1])
-            #plt.savefig(self.state+"_"+"incidence_rate"+"_"+str(self.morange[0])+str(self.yrrange[0])
-            #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
+            self.statsText(finalDF, finalDF.columns[0], finalDF.columns[1], name)
+            if not self.fromCache(col, 'cases', name, finalDF, (downsample, points, 'waves')):
+                self.context.apply()
+                plt.figure(figsize=figsize)
+                x=self.lineGraph(finalDF, 'cases', xlist, xlabel, downsample, points)
+                self.waveOverlay(x, finalDF, 'cases')
+                x.tick_params(axis='x', rotation=65)
+                if int(firstdate[-2:]) == int(seconddate[-2:]):
+                    x.set_title(name+" COVID-19 Case Rate From "+firstdate[:-4]+" To "+seconddate,fontsize=35);
+                else:
+                    x.set_title(name+" COVID-19 Case Rate From "+firstdate+" To "+seconddate,fontsize=35);
+                x.set_xlabel("Dates")
+                x.set_ylabel("Cases")
+                self.pretty_graph(x, finalDF, finalDF.columns[0], finalDF.columns[1], text=False)
+                #plt.savefig(self.state+"_"+"incidence_rate"+"_"+str(self.morange[0])+str(self.yrrange[0])
+                #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
 
             print()
 
-            sns.set(font_scale=3)
-            sns.set_style("whitegrid")
-            plt.figure(figsize=figsize)
-            x=sns.lineplot(data=finalDF,y='deaths',x='date',ci=None, linewidth=7, color='black')
-            x.tick_params(axis='x', rotation=65)
-            if int(firstdate[-2:]) == int(seconddate[-2:]):
-                x.set_title(name+" COVID-19 Death Rate From "+firstdate[:-4]+" To "+seconddate,fontsize=35);
-            else:
-                x.set_title(name+" COVID-19 Death Rate From "+firstdate+" To "+seconddate,fontsize=35);
-            x.set_xlabel("Dates")
-            x.set_ylabel("Deaths")
-            x.set_xticks(xlist)
-            x.set_xticklabels(xlabel)
-            self.pretty_graph(x, finalDF, finalDF.columns[0], finalDF.columns[2])
-            #plt.savefig(self.state+"_"+"death_rate"+"_"+str(self.morange[0])+str(self.yrrange[0])
-            #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
+            self.statsText(finalDF, finalDF.columns[0], finalDF.columns[2], name)
+            if not self.fromCache(col, 'deaths', name, finalDF, (downsample, points, 'waves')):
+                self.context.apply()
+                plt.figure(figsize=figsize)
+                x=self.lineGraph(finalDF, 'deaths', xlist, xlabel, downsample, points)
+                self.waveOverlay(x, finalDF, 'deaths')
+                x.tick_params(axis='x', rotation=65)
+                if int(firstdate[-2:]) == int(seconddate[-2:]):
+                    x.set_title(name+" COVID-19 Death Rate From "+firstdate[:-4]+" To "+seconddate,fontsize=35);
+                else:
+                    x.set_title(name+" COVID-19 Death Rate From "+firstdate+" To "+seconddate,fontsize=35);
+                x.set_xlabel("Dates")
+                x.set_ylabel("Deaths")
+                self.pretty_graph(x, finalDF, finalDF.columns[0], finalDF.columns[2], text=False)
+                #plt.savefig(self.state+"_"+"death_rate"+"_"+str(self.morange[0])+str(self.yrrange[0])
+                #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
 
         if col == "monthly":
 
@@ -1649,184 +1656,543 @@ class Graph:
             first, firstdate, seconddate, xlabel, xlist = self.setGraphSize(monthlyDF, "monthly")
 
             figsize=(first,20)
-            sns.set(font_scale=3)
-            sns.set_style("whitegrid")
-            plt.figure(figsize=figsize)
-            x=sns.lineplot(data=monthlyDF,y='cases',x='date',ci=None, linewidth=7, color='black')
-            x.tick_params(axis='x', rotation=65)
-            if int(firstdate[-2:]) == int(seconddate[-2:]):
-                x.set_title(name+" COVID-19 Case Rate From "+firstdate[:-4]+" To "+seconddate,fontsize=35);
-            else:
-                x.set_title(name+" COVID-19 Case Rate From "+firstdate+" To "+seconddate,fontsize=35);
-            x.set_xlabel("Dates")
-            x.set_ylabel("Cases")
-            x.set_xticks(xlist)
-            x.set_xticklabels(xlabel)
-            x.ticklabel_format(style='plain', axis='y')
-            self.pretty_graph(x, monthlyDF, monthlyDF.columns[0], monthlyDF.columns[2])
-            #plt.savefig(self.state+"_"+"incidence_rate"+"_"+str(self.morange[0])+str(self.yrrange[0])
-            #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
+            self.statsText(monthlyDF, monthlyDF.columns[0], monthlyDF.columns[2], name)
+            if not self.fromCache(col, 'cases', name, monthlyDF):
+                self.context.apply()
+                plt.figure(figsize=figsize)
+                x=sns.lineplot(data=monthlyDF,y='cases',x='date',ci=None, linewidth=7, color='black')
+                x.tick_params(axis='x', rotation=65)
+                if int(firstdate[-2:]) == int(seconddate[-2:]):
+                    x.set_title(name+" COVID-19 Case Rate From "+firstdate[:-4]+" To "+seconddate,fontsize=35);
+                else:
+                    x.set_title(name+" COVID-19 Case Rate From "+firstdate+" To "+seconddate,fontsize=35);
+                x.set_xlabel("Dates")
+                x.set_ylabel("Cases")
+                x.set_xticks(xlist)
+                x.set_xticklabels(xlabel)
+                x.ticklabel_format(style='plain', axis='y')
+                self.pretty_graph(x, monthlyDF, monthlyDF.columns[0], monthlyDF.columns[2], text=False)
+                #plt.savefig(self.state+"_"+"incidence_rate"+"_"+str(self.morange[0])+str(self.yrrange[0])
+                #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
 
             print()
 
-            sns.set(font_scale=3)
-            sns.set_style("whitegrid")
-            plt.figure(figsize=figsize)
-            x=sns.lineplot(data=monthlyDF,y='deaths',x='date',ci=None, linewidth=7, color='black')
-            x.tick_params(axis='x', rotation=65)
-            if int(firstdate[-2:]) == int(seconddate[-2:]):
-                x.set_title(name+" COVID-19 Death Rate From "+firstdate[:-4]+" To "+seconddate,fontsize=35);
-            else:
-                x.set_title(name+" COVID-19 Death Rate From "+firstdate+" To "+seconddate,fontsize=35);
-            x.set_xlabel("Dates")
-            x.set_ylabel("Deaths")
-            x.set_xticks(xlist)
-            x.set_xticklabels(xlabel)
-            self.pretty_graph(x, monthlyDF, monthlyDF.columns[0], monthlyDF.columns[1])
-            #plt.savefig(self.state+"_"+"death_rate"+"_"+str(self.morange[0])+str(self.yrrange[0])
-            #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
+            self.statsText(monthlyDF, monthlyDF.columns[0], monthlyDF.columns[1], name)
+            if not self.fromCache(col, 'deaths', name, monthlyDF):
+                self.context.apply()
+                plt.figure(figsize=figsize)
+                x=sns.lineplot(data=monthlyDF,y='deaths',x='date',ci=None, linewidth=7, color='black')
+                x.tick_params(axis='x', rotation=65)
+                if int(firstdate[-2:]) == int(seconddate[-2:]):
+                    x.set_title(name+" COVID-19 Death Rate From "+firstdate[:-4]+" To "+seconddate,fontsize=35);
+                else:
+                    x.set_title(name+" COVID-19 Death Rate From "+firstdate+" To "+seconddate,fontsize=35);
+                x.set_xlabel("Dates")
+                x.set_ylabel("Deaths")
+                x.set_xticks(xlist)
+                x.set_xticklabels(xlabel)
+                self.pretty_graph(x, monthlyDF, monthlyDF.columns[0], monthlyDF.columns[1], text=False)
+                #plt.savefig(self.state+"_"+"death_rate"+"_"+str(self.morange[0])+str(self.yrrange[0])
+                #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
 
         if col == "averages":
 
-            averageDF = self.data[2][['full_name','avg_cases','avg_deaths']]
-            dates = self.data[7]
+            averageDF = self.data.allStatesDF[['full_name','avg_cases','avg_deaths']]
+            dates = self.data.period
             currYear = int(dates[-1][-2:])
             lastYear = int(dates[0][-2:])
             firstdate=dates[0]
             seconddate=dates[1]
 
-            sns.set(font_scale=3)
-            sns.set_style("whitegrid")
-            plt.figure(figsize=(40,30))
-            x=sns.barplot(data=averageDF.sort_values(by='avg_cases',ascending=False),y='full_name',x='avg_cases',ci=None)
-            x.tick_params(axis='x', rotation=65)
-            if currYear == lastYear:
-                x.set_title("Average Number of Cases Per Day from "+firstdate[:-3]+" to "+seconddate,fontsize=35)
-            else:
-                x.set_title("Average Number of Cases Per Day from "+firstdate+" to "+seconddate,fontsize=35)
-            x.set_xlabel("Confirmed Cases")
-            x.set_ylabel("States")
-            #plt.savefig("US_"+col+"_"+str(self.morange[0])+str(self.yrrange[0])
-            #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
+            if not self.fromCache(col, 'avg_cases', None, averageDF):
+                self.context.apply()
+                plt.figure(figsize=(40,30))
+                x=sns.barplot(data=averageDF.sort_values(by='avg_cases',ascending=False),y='full_name',x='avg_cases',ci=None)
+                x.tick_params(axis='x', rotation=65)
+                if currYear == lastYear:
+                    x.set_title("Average Number of Cases Per Day from "+firstdate[:-3]+" to "+seconddate,fontsize=35)
+                else:
+                    x.set_title("Average Number of Cases Per Day from "+firstdate+" to "+seconddate,fontsize=35)
+                x.set_xlabel("Confirmed Cases")
+                x.set_ylabel("States")
+                self.toCache(x.figure)
+                #plt.savefig("US_"+col+"_"+str(self.morange[0])+str(self.yrrange[0])
+                #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
 
             print()
 
-            sns.set(font_scale=3)
-            sns.set_style("whitegrid")
-            plt.figure(figsize=(40,30))
-            x=sns.barplot(data=averageDF.sort_values(by='avg_deaths',ascending=False),y='full_name',x='avg_deaths',ci=None)
-            x.tick_params(axis='x', rotation=65)
-            if currYear == lastYear:
-                x.set_title("Average Number of Deaths Per Day from "+firstdate[:-3]+" to "+seconddate,fontsize=35)
-            else:
-                x.set_title("Average Number of Deaths Per Day from "+firstdate+" to "+seconddate,fontsize=35)
-            x.set_xlabel("Confirmed Deaths")
-            x.set_ylabel("States")
-            #plt.savefig("US_"+col+"_"+str(self.morange[0])+str(self.yrrange[0])
-            #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
+            if not self.fromCache(col, 'avg_deaths', None, averageDF):
+                self.context.apply()
+                plt.figure(figsize=(40,30))
+                x=sns.barplot(data=averageDF.sort_values(by='avg_deaths',ascending=False),y='full_name',x='avg_deaths',ci=None)
+                x.tick_params(axis='x', rotation=65)
+                if currYear == lastYear:
+                    x.set_title("Average Number of Deaths Per Day from "+firstdate[:-3]+" to "+seconddate,fontsize=35)
+                else:
+                    x.set_title("Average Number of Deaths Per Day from "+firstdate+" to "+seconddate,fontsize=35)
+                x.set_xlabel("Confirmed Deaths")
+                x.set_ylabel("States")
+                self.toCache(x.figure)
+                #plt.savefig("US_"+col+"_"+str(self.morange[0])+str(self.yrrange[0])
+                #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
 
         if col == "totals":
 
-            totalDF = self.data[2][['full_name','total_cases','total_deaths']]
-            dates = self.data[7]
+            totalDF = self.data.allStatesDF[['full_name','total_cases','total_deaths']]
+            dates = self.data.period
             currYear = int(dates[-1][-2:])
             lastYear = int(dates[0][-2:])
             firstdate=dates[0]
             seconddate=dates[1]
 
-            sns.set(font_scale=3)
-            sns.set_style("whitegrid")
-            plt.figure(figsize=(40,30))
-            x=sns.barplot(data=totalDF.sort_values(by='total_cases',ascending=False),y='full_name',x='total_cases',ci=None)
-            x.tick_params(axis='x', rotation=65)
-            if currYear == lastYear:
-                x.set_title("Total Number of Cases from "+firstdate[:-3]+" to "+seconddate,fontsize=35)
-            else:
-                x.set_title("Total Number of Cases from "+firstdate+" to "+seconddate,fontsize=35)            
-            x.set_xlabel("Confirmed Cases")
-            x.set_ylabel("States")
-            x.ticklabel_format(style='plain', axis='x')
-            #plt.savefig("US_"+col+"_"+str(self.morange[0])+str(self.yrrange[0])
-            #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
+            if not self.fromCache(col, 'total_cases', None, totalDF):
+                self.context.apply()
+                plt.figure(figsize=(40,30))
+                x=sns.barplot(data=totalDF.sort_values(by='total_cases',ascending=False),y='full_name',x='total_cases',ci=None)
+                x.tick_params(axis='x', rotation=65)
+                if currYear == lastYear:
+                    x.set_title("Total Number of Cases from "+firstdate[:-3]+" to "+seconddate,fontsize=35)
+                else:
+                    x.set_title("Total Number of Cases from "+firstdate+" to "+seconddate,fontsize=35)            
+                x.set_xlabel("Confirmed Cases")
+                x.set_ylabel("States")
+                x.ticklabel_format(style='plain', axis='x')
+                self.toCache(x.figure)
+                #plt.savefig("US_"+col+"_"+str(self.morange[0])+str(self.yrrange[0])
+                #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
 
             print()
 
-            sns.set(font_scale=3)
-            sns.set_style("whitegrid")
-            plt.figure(figsize=(40,30))
-            x=sns.barplot(data=totalDF.sort_values(by='total_deaths',ascending=False),y='full_name',x='total_deaths',ci=None)
-            x.tick_params(axis='x', rotation=65)
-            if currYear == lastYear:
-                x.set_title("Total Number of Deaths from "+firstdate[:-3]+" to "+seconddate,fontsize=35)
-            else:
-                x.set_title("Total Number of Deaths from "+firstdate+" to "+seconddate,fontsize=35)
-            x.set_xlabel("Confirmed Deaths")
-            x.set_ylabel("States")
-            #plt.savefig("US_"+col+"_"+str(self.morange[0])+str(self.yrrange[0])
-            #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
+            if not self.fromCache(col, 'total_deaths', None, totalDF):
+                self.context.apply()
+                plt.figure(figsize=(40,30))
+                x=sns.barplot(data=totalDF.sort_values(by='total_deaths',ascending=False),y='full_name',x='total_deaths',ci=None)
+                x.tick_params(axis='x', rotation=65)
+                if currYear == lastYear:
+                    x.set_title("Total Number of Deaths from "+firstdate[:-3]+" to "+seconddate,fontsize=35)
+                else:
+                    x.set_title("Total Number of Deaths from "+firstdate+" to "+seconddate,fontsize=35)
+                x.set_xlabel("Confirmed Deaths")
+                x.set_ylabel("States")
+                self.toCache(x.figure)
+                #plt.savefig("US_"+col+"_"+str(self.morange[0])+str(self.yrrange[0])
+                #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight');
 
         if col=="cfrir":
             
-            cfrirDF = self.data[2][['full_name','cfr','ir']]
-            dates = self.data[7]
+            cfrirDF = self.data.allStatesDF[['full_name','cfr','ir']]
+            dates = self.data.period
             currYear = int(dates[-1][-2:])
             lastYear = int(dates[0][-2:])
             firstdate=dates[0]
             seconddate=dates[1]
 
-            sns.set(font_scale=3)
-            sns.set_style("whitegrid")
-            plt.figure(figsize=(40,30))
-            x=sns.barplot(data=cfrirDF.sort_values(by='cfr',ascending=False),y='full_name',x='cfr',ci=None)
-            x.tick_params(axis='x', rotation=65)
-            if currYear == lastYear:
-                x.set_title("COVID-19 Case Fatality Ratio from "+firstdate[:-3]+" to " +
-                            seconddate,fontsize=35)
-            else:
-                x.set_title("COVID-19 Case Fatality Ratio from "+firstdate+
-                            " to "+seconddate,fontsize=35)
-            x.set_xlabel("Percent")
-            x.set_ylabel("States");
+            if not self.fromCache(col, 'cfr', None, cfrirDF):
+                self.context.apply()
+                plt.figure(figsize=(40,30))
+                x=sns.barplot(data=cfrirDF.sort_values(by='cfr',ascending=False),y='full_name',x='cfr',ci=None)
+                x.tick_params(axis='x', rotation=65)
+                if currYear == lastYear:
+                    x.set_title("COVID-19 Case Fatality Ratio from "+firstdate[:-3]+" to " +
+                                seconddate,fontsize=35)
+                else:
+                    x.set_title("COVID-19 Case Fatality Ratio from "+firstdate+
+                                " to "+seconddate,fontsize=35)
+                x.set_xlabel("Percent")
+                x.set_ylabel("States");
+                self.toCache(x.figure)
             
             print()
 
-            sns.set(font_scale=3)
-            sns.set_style("whitegrid")
-            plt.figure(figsize=(40,30))
-            x=sns.barplot(data=cfrirDF.sort_values(by='ir',ascending=False),y='full_name',x='ir',ci=None)
-            x.tick_params(axis='x', rotation=65)
-            if currYear == lastYear:
-                x.set_title("COVID-19 Incidence Rate from "+firstdate[:-3]+" to " +
-                            seconddate,fontsize=35)
-            else:
-                x.set_title("COVID-19 Incidence Rate from "+firstdate+ " to "
-                        +seconddate,fontsize=35)
-            x.set_xlabel("Cases Per 100K")
-            x.set_ylabel("States");
+            if not self.fromCache(col, 'ir', None, cfrirDF):
+                self.context.apply()
+                plt.figure(figsize=(40,30))
+                x=sns.barplot(data=cfrirDF.sort_values(by='ir',ascending=False),y='full_name',x='ir',ci=None)
+                x.tick_params(axis='x', rotation=65)
+                if currYear == lastYear:
+                    x.set_title("COVID-19 Incidence Rate from "+firstdate[:-3]+" to " +
+                                seconddate,fontsize=35)
+                else:
+                    x.set_title("COVID-19 Incidence Rate from "+firstdate+ " to "
+                            +seconddate,fontsize=35)
+                x.set_xlabel("Cases Per 100K")
+                x.set_ylabel("States");
+                self.toCache(x.figure)
+
+        if col == "grid" or col == "gridmonthly":
+
+            monthly = col == "gridmonthly"
+            for feat in ['cases', 'deaths']:
+                gridDF = self.perCapitaDF(feat, monthly)
+                gridDF = gridDF[[sts for sts in self.similarOrder() if sts in gridDF.columns]]
+                if not self.fromCache(col, feat, None, gridDF):
+                    fig = self.smallMultiples(feat, monthly, df=gridDF)
+                    self.toCache(fig)
+                    plt.show()
+                print()
+
+        if col == "rolling":
+
+            for feat in ['cases', 'deaths']:
+                rollingDF = self.rollingDF(feat)
+                if not self.fromCache(col, feat, name, rollingDF):
+                    fig = self.rollingGraph(feat, df=rollingDF)
+                    self.toCache(fig)
+                    plt.show()
+                print()
+
+        if col == "bump":
+
+            level = 'month' if len(self.data.pyramid().pyramid['month']['start']) >= 6 else 'week'
+            for metric in ['ir', 'cfr']:
+                rankDF = self.data.rankTrajectory(metric, level)[1]
+                if not self.fromCache(col, metric, name, rankDF):
+                    fig = self.bumpChart(metric, level, df=rankDF)
+                    self.toCache(fig)
+                    plt.show()
+                print()
+
+        if col == "heatmap":
+
+            for metric in ['ir', 'cfr']:
+                weeklyDF = self.weeklyMatrix(metric)
+                weeklyDF = weeklyDF.loc[[sts for sts in self.similarOrder() if sts in weeklyDF.index]]
+                if not self.fromCache(col, metric, None, weeklyDF):
+                    fig = self.heatmap(metric, df=weeklyDF)
+                    self.toCache(fig)
+                    plt.show()
+                print()
 
         if col == "vax":
 
-            vaxDF = self.data[2]
+            vaxDF = self.data.allStatesDF
             display(vaxDF)
-            totalVax = self.data[6]
-
-            sns.set(font_scale=3)
-            sns.set_style("whitegrid")
-            plt.figure(figsize=(50,30))
-            x=sns.barplot(data=vaxDF.sort_values(by='percent',ascending=False)
-                              ,x='percent',y='full_name',ci=None)
-            x.tick_params(axis='x', rotation=65)
-            x.set_title("United States COVID-19 Vaccination Rates as of Today",fontsize=40)
-            x.set_xlabel("Percent")
-            x.set_ylabel("States")
-            #plt.savefig("US_"+"vaccination_rates"+str(self.morange[0])+str(self.yrrange[0])
-            #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight')
+            totalVax = self.data.totalVax
+
+            if not self.fromCache(col, 'percent', None, vaxDF):
+                self.context.apply()
+                plt.figure(figsize=(50,30))
+                x=sns.barplot(data=vaxDF.sort_values(by='percent',ascending=False)
+                                  ,x='percent',y='full_name',ci=None)
+                x.tick_params(axis='x', rotation=65)
+                x.set_title("United States COVID-19 Vaccination Rates as of Today",fontsize=40)
+                x.set_xlabel("Percent")
+                x.set_ylabel("States")
+                #plt.savefig("US_"+"vaccination_rates"+str(self.morange[0])+str(self.yrrange[0])
+                #            +"_"+str(self.morange[1])+str(self.yrrange[1])+".png",bbox_inches='tight')
+                self.toCache(x.figure)
             print("The United States is %"+str(round(totalVax*100, 2))
                   +" fully vaccinated.");
 
-def main():
-    
-    print("AHH")
+class TemplateRenderer:
+    """ Renders the 'info' graph of many states with a single figure.
+
+        The figure, axes, styling, watermark and legend are built once;
+        each state only swaps the line data, filled areas, average line,
+        title and tick labels before the figure is saved.
+
+        Attributes:
+            graph (Graph):  Graph object whose Stats data is rendered
+            feat (str):  either 'cases' or 'deaths'
+            fig (matplotlib figure):  reused figure
+            x (matplotlib subplot):  reused axes
+            dates (list):  dates currently used as tick labels
+
+        """
+
+    def __init__(self, graph, feat='cases', figsize=None):
+        self.graph = graph
+        self.feat = feat
+        self.dates = None
+
+        if figsize is None:
+            first = graph.setGraphSize(graph.data.datesDF, "info")[0]
+            figsize = (first, 20)
+
+        graph.context.apply()
+        self.fig = plt.figure(figsize=figsize)
+        self.x = self.fig.add_subplot()
+        self.line, = self.x.plot([], [], linewidth=7, color='black')
+        self.area = self.x.fill_between([0, 1], [0, 0], color='blue', alpha=0.1)
+        self.maxP = self.x.fill_between([0, 1], [0, 0], color='red')
+        self.minP = self.x.fill_between([0, 1], [0, 0], color='green')
+        self.midP = self.x.fill_between([0, 1], [0, 0], color='purple')
+        self.avgline = self.x.axhline(0, color='black', linewidth=2.5)
+        self.title = self.x.set_title("", fontsize=35)
+        self.x.tick_params(axis='x', rotation=65)
+        self.x.set_xlabel("Dates")
+        self.x.set_ylabel(feat.capitalize())
+        self.fig.figimage(graph.context.logo(), 110, 270, alpha=0.5)
+        self.x.legend(labels=['smallest drop','largest drop','largest increase','average rate'],
+                      handles=[self.minP,self.midP,self.maxP,self.avgline], shadow=True,
+                      title=feat.capitalize(), title_fontsize='large', borderpad=0.3, fontsize='small')
+
+    def polygons(self, ranges):
+        """Method that turns ranges from Graph.getPoints() into polygons
+
+        Args:
+            ranges (list):  list of (x, y) numpy array pairs
+
+        Returns:
+            verts (list):  list of polygons filling each range down to zero
+        """
+
+        verts = []
+        for xs, ys in ranges:
+            xs = np.asarray(xs, dtype='float64')
+            ys = np.asarray(ys, dtype='float64')
+            verts.append(np.concatenate([np.column_stack([xs, ys]),
+                                         np.column_stack([xs[::-1], np.zeros(len(xs))])]))
+
+        return verts
+
+    def render(self, state, dates, values, path):
+        """Method that draws one state and saves the figure
+
+        Args:
+            state (str):  name of US state
+            dates (list):  dates as 'YYYY-MM-DD' strings
+            values (list):  daily cases or deaths matching dates
+            path (str):  file the chart is saved to
+
+        Side effects:
+            updates the reused figure and saves it to path
+
+        Returns:
+            path (str):  file the chart was saved to
+        """
+
+        y = np.asarray(values, dtype='float64')
+        xs = np.arange(len(y), dtype='float64')
+        allVal = np.column_stack([xs, y])
+
+        (finalmax,finalmin,finalmid,
+        maxDR,minDR,midDR,
+        allmaxs,allmins) = self.graph.getPoints(allVal, y.min(), y.max(), xs, y)
+
+        self.line.set_data(xs, y)
+        self.area.set_verts(self.polygons([(xs, y)]))
+        self.maxP.set_verts(self.polygons(finalmax))
+        self.minP.set_verts(self.polygons(finalmin))
+        self.midP.set_verts(self.polygons(finalmid))
+        self.avgline.set_ydata([y.mean(), y.mean()])
+
+        if dates != self.dates:
+            dateDF = pd.DataFrame({'date':dates})
+            xlabel = [datetime.datetime.strptime(day, "%Y-%m-%d").strftime("%B %d") for day in dates]
+            ticks, labels = self.graph.thinTicks(dateDF, dates, xlabel)
+            self.x.set_xticks(ticks)
+            self.x.set_xticklabels(labels)
+            self.dates = list(dates)
+
+        # the period of the state itself, which may start reporting
+        # after the chosen state
+        firstdate, seconddate = [datetime.datetime.strptime(day, "%Y-%m-%d").strftime("%B %d '%y")
+                                 for day in (dates[0], dates[-1])]
+        rate = "Case" if self.feat == "cases" else "Death"
+        if int(firstdate[-2:]) == int(seconddate[-2:]):
+            firstdate = firstdate[:-4]
+        self.title.set_text(state+" COVID-19 "+rate+" Rate From "+firstdate+" To "+seconddate)
+
+        self.x.relim()
+        self.x.autoscale_view()
+        self.fig.savefig(path, bbox_inches='tight')
+
+        return path
+
+    def close(self):
+        """Method that releases the reused figure"""
+
+        plt.close(self.fig)
+
+        return None
+
+VIEWS = ['info', 'monthly', 'rolling', 'bump', 'averages', 'totals', 'cfrir', 'vax', 'grid', 'gridmonthly', 'heatmap']
+STATEVIEWS = ['info', 'monthly', 'rolling', 'bump']
+
+def parseWindow(text):
+    """Turns 'LASTMO/LASTYEAR-CURRMO/CURRYEAR', e.g. '6/20-1/22', into the
+    currmo, lastmo, curryear and lastyear arguments of Stats"""
+
+    try:
+        first, last = text.split("-")
+        lastmo, lastyear = [int(num) for num in first.split("/")]
+        currmo, curryear = [int(num) for num in last.split("/")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected LASTMO/LASTYEAR-CURRMO/CURRYEAR, e.g. 6/20-1/22, got "+repr(text))
+
+    return currmo, lastmo, curryear, lastyear
+
+def windowName(window):
+    """Returns the folder name of a window from parseWindow(), e.g. '2020-06_2022-01'"""
+
+    currmo, lastmo, curryear, lastyear = window
+
+    return "20%02d-%02d_20%02d-%02d" % (lastyear, lastmo, curryear, currmo)
+
+def initWorker(cache, watermark):
+    """Prepares a process to run runTask(): draws with the Agg backend,
+    shares one RenderContext using 'watermark' and works in the 'cache'
+    folder, where Stats keeps its daily CSV files"""
+
+    plt.switch_backend('Agg')
+    RenderContext.default = RenderContext(watermark=watermark)
+    os.chdir(cache)
+
+def runTask(task):
+    """Builds the Stats object of one state and window and writes its
+    report and charts, see main()
+
+    Args:
+        task (tuple):  state abbreviation, window from parseWindow(),
+        views to draw and options shared by every task, with 'regions'
+        and 'summary' only set for the first state of each window
+
+    Returns:
+        result (dict):  state, window, files written and the error
+        message, None when every file was written
+    """
+
+    abbr, window, views, options = task
+    currmo, lastmo, curryear, lastyear = window
+    folder = os.path.join(options['out'], windowName(window))
+    os.makedirs(folder, exist_ok=True)
+    result = {'abbr':abbr, 'window':windowName(window), 'files':[], 'error':None}
+    text = io.StringIO()
+
+    try:
+        with contextlib.redirect_stdout(text):
+            stats = Stats(abbr, currmo, lastmo, curryear, lastyear, data=options['data'],
+                          offline=options['offline'], verbose=False, quality=options['quality'])
+        if stats.report is None:
+            lines = text.getvalue().strip().splitlines()
+            raise ValueError(lines[-1] if lines else "no data for "+abbr)
+
+        if 'txt' in options['formats']:
+            path = os.path.join(folder, abbr+".txt")
+            with open(path, 'w') as f:
+                f.write(stats.report.text())
+            result['files'].append(path)
+        if 'json' in options['formats']:
+            path = os.path.join(folder, abbr+".json")
+            with open(path, 'w') as f:
+                json.dump(stats.report.toDict(), f, indent=1)
+            result['files'].append(path)
+        if options['counties'] is not None:
+            store = CountyStore(options['counties'])
+            path = os.path.join(folder, abbr+"_counties.csv")
+            store.countyTable(store.window(*window), stats.state).to_csv(path, index=False)
+            result['files'].append(path)
+        if options['regions']:
+            rollup = stats.rollup()
+            span = rollup.window(*window)
+            path = os.path.join(folder, "regions.csv")
+            pd.concat([rollup.table(level, span) for level in ['division', 'region', 'nation']],
+                      ignore_index=True).to_csv(path, index=False)
+            result['files'].append(path)
+        if options['summary']:
+            path = os.path.join(folder, "quality.csv")
+            stats.dataQuality().summary().to_csv(path, index=False)
+            result['files'].append(path)
+
+        for fmt in [fmt for fmt in options['formats'] if fmt in ('png', 'svg')]:
+            cache = ChartCache(os.path.join(options['cache'], 'charts'), fmt=fmt)
+            with contextlib.redirect_stdout(io.StringIO()):
+                graph = Graph(stats.result, cache=cache)
+                for view in views:
+                    graph.getGraph(view)
+                    plt.close('all')
+            for view, metric, cached in graph.charts:
+                prefix = abbr if view in STATEVIEWS else "US"
+                path = os.path.join(folder, prefix+"_"+view+"_"+metric+"."+fmt)
+                shutil.copyfile(cached, path)
+                result['files'].append(path)
+    except Exception as e:
+        result['error'] = type(e).__name__+": "+str(e)
+
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Writes COVID-19 reports and charts for US states.")
+    parser.add_argument('states', nargs='*', default=['all'],
+                        help="state abbreviations, e.g. MD NY; every state by default")
+    parser.add_argument('-w', '--window', type=parseWindow, nargs='+', required=True,
+                        help="one or more LASTMO/LASTYEAR-CURRMO/CURRYEAR date ranges, e.g. 6/20-1/22")
+    parser.add_argument('-o', '--out', default='reports', help="output folder, one subfolder per window")
+    parser.add_argument('--data', nargs=5, metavar=('STATES', 'POP', 'SQMI', 'VAXURL', 'ABBR'),
+                        help="input files and vaccination URL, in the order of Stats.data")
+    parser.add_argument('--cache-dir', default='.',
+                        help="folder of the daily CSV files and the chart cache")
+    parser.add_argument('--offline', action='store_true',
+                        help="use the latest saved vaccination file instead of the CDC API")
+    parser.add_argument('--formats', nargs='+', choices=['txt', 'json', 'png', 'svg'], default=['txt', 'json', 'png'])
+    parser.add_argument('--views', nargs='*', choices=VIEWS, default=['info'],
+                        help="Graph views to draw; views of every state are drawn once per window")
+    parser.add_argument('--counties', metavar='CSV',
+                        help="us-counties.csv; adds a table of the counties of every state, see CountyStore")
+    parser.add_argument('--regions', action='store_true',
+                        help="adds a table of census divisions, regions and the country to every window, see Rollup")
+    parser.add_argument('--quality', choices=DataQuality.policies, default='leave',
+                        help="correction of negative daily counts and repeated dates, see DataQuality")
+    parser.add_argument('--quality-summary', action='store_true',
+                        help="adds a table of the data checks of every state to every window")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="worker processes")
+    args = parser.parse_args(argv)
+
+    data = list(Stats.defaultData if args.data is None else args.data)
+    data = [item if num == 3 else os.path.abspath(item) for num, item in enumerate(data)]
+    counties = None if args.counties is None else os.path.abspath(args.counties)
+    options = {'data':data, 'offline':args.offline, 'formats':args.formats,
+               'out':os.path.abspath(args.out), 'cache':os.path.abspath(args.cache_dir), 'counties':None,
+               'regions':False, 'quality':args.quality, 'summary':False}
+    watermark = os.path.join(os.path.dirname(os.path.abspath(__file__)), RenderContext().watermark)
+    os.makedirs(options['cache'], exist_ok=True)
+    if counties is not None:
+        options['counties'] = CountyStore.load(counties, os.path.join(options['cache'], 'county_store')).directory
+
+    states = args.states
+    if states == ['all']:
+        states = pd.read_csv(data[4])['abbr'].tolist()
+
+    tasks = []
+    for window in args.window:
+        for num, abbr in enumerate(states):
+            if num == 0:
+                tasks.append((abbr, window, args.views, dict(options, regions=args.regions, summary=args.quality_summary)))
+            else:
+                tasks.append((abbr, window, [view for view in args.views if view in STATEVIEWS], options))
+
+    def done(result):
+        results.append(result)
+        print(result['window'], result['abbr'], result['error'] or "ok")
+
+    # the first task writes the daily CSV files before workers are
+    # started, so they read them instead of building them again
+    results = []
+    cwd, backend, default = os.getcwd(), plt.get_backend(), RenderContext.default
+    initWorker(options['cache'], watermark)
+    try:
+        done(runTask(tasks[0]))
+        if args.jobs > 1 and len(tasks) > 2:
+            chunk = max(1, (len(tasks)-1)//(args.jobs*4))
+            with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs, initializer=initWorker,
+                                                        initargs=(options['cache'], watermark)) as pool:
+                for result in pool.map(runTask, tasks[1:], chunksize=chunk):
+                    done(result)
+        else:
+            for task in tasks[1:]:
+                done(runTask(task))
+    finally:
+        os.chdir(cwd)
+        plt.switch_backend(backend)
+        RenderContext.default = default
+
+    with open(os.path.join(options['out'], "index.json"), 'w') as f:
+        json.dump(results, f, indent=1)
+    failed = sum(1 for result in results if result['error'] is not None)
+    print(str(len(results)-failed)+" of "+str(len(results))+" reports written to "+options['out'])
+
+    return 1 if failed else 0
 
 if __name__ == '__main__':
-    sys.argv[0]
\ No newline at end of file
+    sys.exit(main())
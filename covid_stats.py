@@ -0,0 +1,3254 @@
+import numpy as np
+import pandas as pd
+import datetime
+import dataclasses
+import collections
+import importlib
+import json
+import hashlib
+import sys
+import os
+import time
+import tracemalloc
+import cProfile
+import pstats
+
+""" Stats, the COVID-19 compute core of covid_graphs.  Only numpy and
+pandas are imported up front; requests, IPython and the plotting
+libraries load on first use. """
+
+class LazyModule:
+    """ Module imported on first attribute access.
+
+        Attributes:
+            name (str):  dotted module name, e.g. 'matplotlib.pyplot'
+            module (module):  the imported module, None until first use
+
+        """
+
+    def __init__(self, name):
+        self.name = name
+        self.module = None
+
+    def __getattr__(self, attr):
+        if self.module is None:
+            self.module = importlib.import_module(self.name)
+
+        return getattr(self.module, attr)
+
+requests = LazyModule('requests')
+
+def display(obj):
+    """Shows obj with IPython when it is already loaded, e.g. in a
+    notebook, and prints it otherwise"""
+
+    if 'IPython' in sys.modules:
+        from IPython.display import display as show
+        return show(obj)
+
+    print(obj)
+
+    return None
+
+class NullSpan:
+    """ Stand-in for StageSpan when timings are turned off. """
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULLSPAN = NullSpan()
+
+class StageSpan:
+    """ Records the cost of one stage of a Stats object.
+
+        Attributes:
+            stats (Stats):  Stats object the record is added to
+            stage (str):  name of the stage
+            rows (int):  optional number of rows processed, set inside
+            the 'with' block
+
+        Side effects:
+            on exit, a dictionary with wall seconds, CPU seconds, rows and
+            tracemalloc peak in KiB is appended to stats.timings and, when
+            stats.timingLog is set, written to it as a JSON line
+
+        """
+
+    def __init__(self, stats, stage):
+        self.stats = stats
+        self.stage = stage
+        self.rows = None
+        self.childPeak = 0
+
+    def __enter__(self):
+        self.stats.spans.append(self)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter()-self.wall
+        cpu = time.process_time()-self.cpu
+        peak = None
+        if tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1], self.childPeak)
+
+        self.stats.spans.pop()
+        if self.stats.spans and peak is not None:
+            parent = self.stats.spans[-1]
+            parent.childPeak = max(parent.childPeak, peak)
+
+        record = {'state':self.stats.stateKey, 'stage':self.stage, 'depth':len(self.stats.spans),
+                  'wall':round(wall, 6), 'cpu':round(cpu, 6), 'rows':self.rows,
+                  'peak_kib':None if peak is None else round(peak/1024, 1)}
+        self.stats.timings.append(record)
+        if self.stats.timingLog is not None:
+            with open(self.stats.timingLog, 'a') as log:
+                log.write(json.dumps(record)+"\n")
+
+        return False
+
+class Profiler:
+    """ Function-level profile of one Stats build or Graph view.
+
+        Uses pyinstrument when 'engine' is 'pyinstrument' and it is
+        installed, cProfile otherwise.  cProfile writes a '.prof' file for
+        pstats or snakeviz and a '.collapsed' file of folded stacks for
+        flamegraph tools; pyinstrument writes '.html' and '.txt' reports.
+
+        Attributes:
+            directory (str):  folder the profile files are written to
+            name (str):  file name without extension
+            engine (str):  either 'cprofile' or 'pyinstrument'
+
+        """
+
+    def __init__(self, directory, name, engine=None):
+        self.directory = directory
+        self.name = "".join(char if char.isalnum() or char in "-_." else "_" for char in name)
+        self.engine = engine or os.environ.get("COVID_PROFILER", "cprofile")
+        self.profiler = None
+
+    @classmethod
+    def wrap(cls, directory, name):
+        """Method that returns a Profiler, or a shared no-op when profiling
+        is turned off
+
+        Args:
+            directory (str):  folder for profile files, profiling is
+            turned off when None
+            name (str):  file name without extension
+
+        Returns:
+            profiler (Profiler):  context manager profiling its block
+        """
+
+        if directory is None:
+            return NULLSPAN
+
+        return cls(directory, name)
+
+    def __enter__(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if self.engine == "pyinstrument":
+            try:
+                import pyinstrument
+                self.profiler = pyinstrument.Profiler()
+            except ImportError:
+                print("pyinstrument not installed, using cProfile.")
+                self.engine = "cprofile"
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+        if self.engine == "pyinstrument":
+            self.profiler.start()
+        else:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        path = os.path.join(self.directory, self.name)
+        if self.engine == "pyinstrument":
+            self.profiler.stop()
+            with open(path+".html", 'w') as f:
+                f.write(self.profiler.output_html())
+            with open(path+".txt", 'w') as f:
+                f.write(self.profiler.output_text())
+        else:
+            self.profiler.disable()
+            self.profiler.dump_stats(path+".prof")
+            with open(path+".collapsed", 'w') as f:
+                for stack, weight in sorted(self.collapsed().items()):
+                    f.write(stack+" "+str(weight)+"\n")
+
+        return False
+
+    def collapsed(self, limit=40, smallest=50):
+        """Method that folds cProfile results into flamegraph stacks
+
+        cProfile only keeps caller and callee pairs, so the time spent
+        inside each function is split between its callers by their share
+        of its cumulative time, walking up to the functions with no
+        caller.
+
+        Args:
+            limit (int):  deepest stack kept
+            smallest (int):  shares below this many microseconds are dropped
+
+        Returns:
+            stacks (dict):  microseconds keyed by 'outer;...;inner' stack
+        """
+
+        stats = pstats.Stats(self.profiler).stats
+        stacks = {}
+
+        def label(func):
+            filename, line, name = func
+            return os.path.basename(filename)+":"+name if line else name
+
+        def walk(path, weight):
+            callers = stats[path[-1]][4] if path[-1] in stats else {}
+            callers = {caller:info for caller, info in callers.items() if caller not in path}
+            total = sum(info[3] for info in callers.values())
+            if not callers or total <= 0 or len(path) >= limit:
+                stack = ";".join(label(func) for func in reversed(path))
+                stacks[stack] = stacks.get(stack, 0)+int(weight)
+                return
+            for caller, info in callers.items():
+                share = weight*info[3]/total
+                if share >= smallest:
+                    walk(path+[caller], share)
+
+        for func, info in stats.items():
+            if info[2] > 0:
+                walk([func], info[2]*1000000)
+
+        return stacks
+
+class Memo(collections.OrderedDict):
+    """ Results shared by every object of the process, keyed by the date
+        of the data, the window and the options they were built from.
+        Only the 'size' most recently used entries are kept.
+
+        Attributes:
+            size (int):  largest number of entries
+
+        """
+
+    def __init__(self, size=8):
+        super().__init__()
+        self.size = size
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.size:
+            self.popitem(last=False)
+
+    def fetch(self, key, build):
+        """Method that returns the entry of a key, building it on a miss
+
+        Args:
+            key (tuple):  date of the data, window and options, or None
+            when the data has no such key
+            build (function):  called without arguments on a miss
+
+        Returns:
+            value (object):  kept entry, or a new one never kept when
+            key is None
+        """
+
+        if key is None:
+            return build()
+        if key not in self:
+            self[key] = build()
+
+        return self[key]
+
+class Report:
+    """ Statistics of one state over the dates of a Stats object, with
+        its rank among every state.  Text is only built when asked for,
+        see lines() and text().
+
+        Attributes:
+            state (str):  name of US state
+            abbr (str):  abbreviation of US state
+            firstdate (str):  first date as printed, e.g. "June 01 '20"
+            seconddate (str):  last date as printed
+            dates (tuple):  first and last date, 'YYYY-MM-DD'
+            days (int):  number of days
+            values (dict):  value of every column in Report.columns
+            lag (float):  days deaths follow cases, NaN when no lag was
+            found, see DeathLag
+            ranks (dict):  rank of the state for every column in
+            Report.columns, 1 being the highest value
+            months (list):  monthly totals and averages, see
+            Stats.monthlyStats()
+            describe (DataFrame):  summary of the daily cases and deaths
+
+        """
+
+    columns = ['avg_cases', 'avg_deaths', 'cfr', 'lag_cfr', 'ir', 'total_cases', 'total_deaths', 'percent',
+               'curr_pop', 'ppsm', 'sq_mi', 'all_case', 'all_incidence']
+
+    def __init__(self, state, allStatesDF, datesDF, countedMonths, firstdate, seconddate):
+        row = allStatesDF[allStatesDF['full_name'] == state].iloc[0]
+        self.state = state
+        self.abbr = row['abbr']
+        self.firstdate = firstdate
+        self.seconddate = seconddate
+        self.dates = (datesDF.iloc[0]['date'], datesDF.iloc[-1]['date'])
+        self.days = len(datesDF['date'])
+        self.values = {col:row[col] for col in Report.columns}
+        self.lag = row['death_lag']
+        self.ranks = {}
+        for col in Report.columns:
+            order = allStatesDF.sort_values(by=col, ascending=False).reset_index(drop=True)
+            self.ranks[col] = int(order.index[order['full_name'] == state][0])+1
+        self.months = countedMonths
+        self.describe = round(datesDF[['cases','deaths']].describe().T,2)
+
+    def lines(self):
+        """Method that formats the statistics as sentences
+
+        Returns:
+            lines (list):  one sentence per statistic, the first naming
+            the state
+        """
+
+        values, ranks, days = self.values, self.ranks, str(self.days)
+        first, second = self.firstdate, self.seconddate
+
+        return ["State of "+self.state,
+                ("Average of {:,} cases per day in "+days+" days, currently ranked #"+str(ranks['avg_cases'])+" in the United States.").format(round(values['avg_cases'],2)),
+                ("Average of {:,} deaths per day in "+days+" days, currently ranked #"+str(ranks['avg_deaths'])+" in the United States.").format(round(values['avg_deaths'],2)),
+                "Case Fatality Ratio from "+first+" to "+second+": "+str(values['cfr'])+"%, currently ranked #"+str(ranks['cfr'])+" in the United States.",
+                ("Lag-Adjusted Case Fatality Ratio, deaths "+str(int(self.lag))+" days after cases: "+str(values['lag_cfr'])+"%, currently ranked #"+str(ranks['lag_cfr'])+" in the United States."
+                 if not np.isnan(self.lag) else "Lag-Adjusted Case Fatality Ratio: no lag found between cases and deaths."),
+                ("Incidence Rate from "+first+" to "+second+": {:,} per 100k, currently ranked #"+str(ranks['ir'])+" in the United States.").format(values['ir']),
+                ("There have been {:,} cases from "+first+" To "+second+", currently ranked #{} in the United States.").format(values['total_cases'],ranks['total_cases']),
+                ("There have been {:,} deaths from "+first+" To "+second+", currently ranked #{} in the United States.").format(values['total_deaths'],ranks['total_deaths']),
+                self.state+" is "+str(values['percent'])+"% fully vaccinated, currently ranked #"+str(ranks['percent'])+" in the United States.",
+                ("Total population: {:,}, ranked #"+str(ranks['curr_pop'])+" in the United States.").format(values['curr_pop']),
+                ("There are {:,} people per square mile, ranked #"+str(ranks['ppsm'])+" in the United States.").format(values['ppsm']),
+                (self.state+" has {:,} total square miles, ranking #"+str(ranks['sq_mi'])+" in the United States.").format(values['sq_mi']),
+                "All Time Case Fatality Ratio: "+str(values['all_case'])+"%, currently ranked #"+str(ranks['all_case'])+" in the United States.",
+                ("All Time Incidence Rate: {:,} per 100k, currently ranked #"+str(ranks['all_incidence'])+" in the United States.").format(values['all_incidence'])]
+
+    def text(self):
+        """Method that formats the whole report as plain text
+
+        Returns:
+            text (str):  the sentences of self.lines() followed by
+            self.describe
+        """
+
+        return "\n".join(self.lines()+[self.describe.to_string()])+"\n"
+
+    def toDict(self):
+        """Method that returns the report as plain Python values, e.g.
+        for JSON
+
+        Returns:
+            report (dict):  state, dates, every value with its rank and
+            the monthly totals
+        """
+
+        report = {'state':self.state, 'abbr':self.abbr, 'first_date':self.dates[0],
+                  'last_date':self.dates[1], 'days':self.days,
+                  'death_lag':None if np.isnan(self.lag) else int(self.lag)}
+        for col in Report.columns:
+            value = self.values[col]
+            report[col] = value.item() if hasattr(value, 'item') else value
+            report[col+'_rank'] = self.ranks[col]
+        report['monthly'] = [dict(zip(['date', 'deaths', 'cases', 'avg_deaths', 'avg_cases'],
+                                      [value.item() if hasattr(value, 'item') else value for value in month]))
+                             for month in self.months]
+
+        return report
+
+@dataclasses.dataclass(slots=True)
+class StatsResult:
+    """ Results of a Stats object, read by Graph objects in place of the
+        positional 'allstats' list.
+
+        The daily series of every state share one date axis, so they are
+        kept as two [state, day] arrays; days a state did not report are
+        NaN.  Stats objects over the same dates share these arrays.
+
+        Attributes:
+            state (str):  name of the chosen US state
+            states (numpy array):  name of every state, one per row
+            dates (numpy array):  datetime64[D] date axis, one per column
+            cases (numpy array):  [state, day] daily cases
+            deaths (numpy array):  [state, day] daily deaths
+            allStatesDF (DataFrame):  statistics of every state
+            stateDF (DataFrame):  row of allStatesDF for the chosen state
+            datesDF (DataFrame):  daily data of the chosen state
+            countedMonths (list):  see Stats.monthlyStats()
+            totalVax (float):  share of the US population fully vaccinated
+            period (tuple):  first and last date as printed, e.g.
+            "June 01 '20"
+            key (tuple):  date of the data and window the arrays were
+            built from, see Stats.windowKey(); None when unknown, and
+            then nothing built from them is shared
+            populations (Populations):  population of every state by
+            year, None when unknown, see self.population()
+
+        """
+
+    state: str
+    states: np.ndarray
+    dates: np.ndarray
+    cases: np.ndarray
+    deaths: np.ndarray
+    allStatesDF: pd.DataFrame
+    stateDF: pd.DataFrame
+    datesDF: pd.DataFrame
+    countedMonths: list
+    totalVax: float
+    period: tuple
+    key: tuple = None
+    populations: object = None
+
+    @staticmethod
+    def align(finalcases, finaldeaths, finaldates, finalstates):
+        """Method that lays the ragged per-state lists of Stats over one
+        date axis
+
+        Args:
+            finalcases (list):  daily cases of every state
+            finaldeaths (list):  daily deaths of every state
+            finaldates (list):  'YYYY-MM-DD' dates of every state
+            finalstates (list):  name of every state
+
+        Returns:
+            series (tuple):  states, dates, cases and deaths arrays, see
+            StatsResult
+        """
+
+        lengths = [len(dates) for dates in finaldates]
+        days, column = np.unique(np.concatenate(finaldates).astype('datetime64[D]'), return_inverse=True)
+        row = np.repeat(np.arange(len(finalstates)), lengths)
+
+        series = [np.array(finalstates, dtype=object), days]
+        for values in (finalcases, finaldeaths):
+            grid = np.full((len(finalstates), len(days)), np.nan)
+            grid[row, column] = np.concatenate(values)
+            series.append(grid)
+
+        return tuple(series)
+
+    @classmethod
+    def fromList(cls, allstats):
+        """Method that builds a StatsResult from a Stats 'allstats' list
+
+        Args:
+            allstats (list):  state, per-state lists, allStatesDF,
+            stateDF, datesDF, countedMonths, totalVax and dates, in that
+            order
+
+        Returns:
+            result (StatsResult):  the same data, None when allstats is
+            empty or incomplete; its key is the last date and a digest
+            of the arrays
+        """
+
+        if len(allstats) < 8:
+            return None
+
+        states, dates, cases, deaths = cls.align(*allstats[1])
+        digest = hashlib.sha1(cases.tobytes()+deaths.tobytes()+"|".join(states).encode()).hexdigest()
+
+        return cls(allstats[0], states, dates, cases, deaths, *allstats[2:8], (str(dates[-1]), digest))
+
+    def rolling(self, feat='cases', window=7, center=False):
+        """Method that computes the moving average of every state at once
+
+        Sums come from differences of one cumulative sum, so the cost
+        does not grow with the window.  Days a state did not report
+        count as zero, since the next report holds their cases.
+
+        Args:
+            feat (str):  either 'cases' or 'deaths'
+            window (int):  number of days averaged, e.g. 7, 14 or 28
+            center (bool):  when False, each day averages itself and the
+            days before it; when True, the window ends window//2 days
+            after the day
+
+        Returns:
+            averages (numpy array):  [state, day] moving averages, NaN
+            where the window is not full or holds no report
+        """
+
+        values = self.cases if feat == 'cases' else self.deaths
+        states, days = values.shape
+        averages = np.full((states, days), np.nan)
+        if window > days:
+            return averages
+
+        total = np.zeros((states, days+1))
+        np.cumsum(np.nan_to_num(values), axis=1, out=total[:, 1:])
+        reported = np.zeros((states, days+1))
+        np.cumsum(~np.isnan(values), axis=1, out=reported[:, 1:])
+
+        sums = (total[:, window:]-total[:, :-window])/window
+        sums[(reported[:, window:]-reported[:, :-window]) == 0] = np.nan
+        if center:
+            averages[:, window-1-window//2:days-window//2] = sums
+        else:
+            averages[:, window-1:] = sums
+
+        return averages
+
+    def population(self, states, dates):
+        """Method that finds the population of states in the year of each
+        date
+
+        Args:
+            states (array-like):  names of US states
+            dates (array-like):  datetime64 dates, broadcast against
+            states
+
+        Returns:
+            pop (numpy array):  population of every state and date, NaN
+            for states without an estimate; the 'curr_pop' of
+            allStatesDF for every year when self.populations is None
+        """
+
+        states = np.asarray(states, dtype=object)
+        years = np.asarray(dates).astype('datetime64[Y]').astype('int64')+1970
+        if self.populations is not None:
+            return self.populations.lookup(states, years)
+
+        pop = self.allStatesDF.set_index('full_name')['curr_pop'].astype('float64')
+        states, years = np.broadcast_arrays(states, years)
+
+        return pop.reindex(states.ravel()).to_numpy().reshape(states.shape)
+
+    def rollingRank(self, feat='cases', window=7, perCapita=True):
+        """Method that ranks every state by its latest moving average
+
+        Args:
+            feat (str):  either 'cases' or 'deaths'
+            window (int):  number of days averaged, see self.rolling()
+            perCapita (bool):  ranks by the average per 100k when True
+
+        Returns:
+            rankDF (DataFrame):  one row per state, highest first, with
+            the date and value of its latest trailing average, the value
+            per 100k of the population in the year of that date and the
+            rank
+        """
+
+        averages = self.rolling(feat, window)
+        valid = ~np.isnan(averages)
+        last = averages.shape[1]-1-np.argmax(valid[:, ::-1], axis=1)
+        latest = np.where(valid.any(axis=1), averages[np.arange(len(averages)), last], np.nan)
+
+        rankDF = pd.DataFrame({'full_name':self.states, 'date':self.dates[last].astype(str),
+                               'average':latest.round(2)})
+        rankDF['per_100k'] = (rankDF['average']/self.population(self.states, self.dates[last])*100000).round(3)
+        rankDF = rankDF.sort_values(by='per_100k' if perCapita else 'average', ascending=False,
+                                    na_position='last').reset_index(drop=True)
+        rankDF['rank'] = np.arange(1, len(rankDF)+1)
+
+        return rankDF
+
+    def rankTrajectory(self, metric='ir', level='week'):
+        """Method that ranks every state in every day, week, month or
+        quarter at once
+
+        Args:
+            metric (str):  'ir' (cases per 100k of the population in the
+            year each period starts), 'cfr', 'avg_cases', 'avg_deaths',
+            'total_cases' or 'total_deaths' of each period
+            level (str):  one of TimePyramid.levels
+
+        Returns:
+            valueDF (DataFrame):  one row per state and one column per
+            first day of each period, NaN when nothing was reported
+            rankDF (DataFrame):  rank of every state in every period, 1
+            being the highest value, NaN when nothing was reported
+        """
+
+        frame = self.pyramid().pyramid[level]
+        cases, deaths = frame['cases'], frame['deaths']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if metric == 'ir':
+                values = cases/self.population(self.states[:, None], frame['start'][None, :])*100000
+            elif metric == 'cfr':
+                values = deaths/np.where(cases > 0, cases, np.nan)*100
+            elif metric in ('avg_cases', 'avg_deaths'):
+                values = (cases if metric == 'avg_cases' else deaths)/np.where(frame['days'] > 0, frame['days'], np.nan)
+            else:
+                values = cases if metric == 'total_cases' else deaths
+
+        # descending order with NaN last, then the position of every state
+        order = np.argsort(np.where(np.isnan(values), np.inf, -values), axis=0, kind='stable')
+        ranks = np.argsort(order, axis=0, kind='stable')+1.0
+        ranks[np.isnan(values)] = np.nan
+        index = pd.Index(self.states, name='state')
+        columns = pd.DatetimeIndex(frame['start'], name='date')
+
+        return pd.DataFrame(values, index=index, columns=columns), pd.DataFrame(ranks, index=index, columns=columns)
+
+    def waves(self, feat='cases', window=7, span=21, minHeight=0.02, minRise=0.5):
+        """Method that returns the waves of every state, see Waves
+
+        Returns:
+            waves (Waves):  found on first use and shared with every
+            StatsResult over the same arrays and options
+        """
+
+        return Waves.of(self, feat, window, span, minHeight, minRise)
+
+    def similarity(self, feat='both', window=7, lag=0, block=512):
+        """Method that correlates the curves of every pair of states, see
+        Similarity
+
+        Returns:
+            similarity (Similarity):  computed on first use and shared
+            with every StatsResult over the same arrays and options
+        """
+
+        return Similarity.of(self, feat, window, lag, block)
+
+    def deathLag(self, maxLag=42, window=7, minDays=120, fallback=18):
+        """Method that returns the lag between the cases and deaths of
+        every state, see DeathLag
+
+        Returns:
+            lag (DeathLag):  found on first use and shared with every
+            StatsResult over the same arrays and options
+        """
+
+        return DeathLag.of((self.states, self.dates, self.cases, self.deaths), maxLag, window, minDays, fallback,
+                           self.key)
+
+    def pyramid(self):
+        """Method that returns the day, week, month and quarter sums of
+        every state, see TimePyramid
+
+        Returns:
+            pyramid (TimePyramid):  built on first use and shared with
+            every StatsResult over the same arrays
+        """
+
+        return TimePyramid.of(self)
+
+    def series(self, state, feat='cases'):
+        """Method that returns the reported days of one state
+
+        Args:
+            state (str):  name of US state
+            feat (str):  either 'cases' or 'deaths'
+
+        Returns:
+            dates (list):  'YYYY-MM-DD' dates
+            values (numpy array):  daily values matching dates
+        """
+
+        row = (self.cases if feat == 'cases' else self.deaths)[np.flatnonzero(self.states == state)[0]]
+        reported = ~np.isnan(row)
+
+        return self.dates[reported].astype(str).tolist(), row[reported]
+
+class TimePyramid:
+    """ Daily cases and deaths of every state summed by day, ISO week
+        (starting on Monday), month and quarter, built once per set of
+        [state, day] arrays and shared by every Graph reading them.
+
+        Attributes:
+            states (numpy array):  name of every state, one per row
+            dates (numpy array):  datetime64[D] daily date axis
+            pyramid (dict):  one dictionary per level, keyed by level,
+            with the 'start' date of every bucket, the position of the
+            'first' reported day of every bucket on the daily axis (-1
+            when none), and [state, bucket] 'cases', 'deaths' (NaN when
+            nothing was reported) and 'days' (days reported) arrays
+
+        """
+
+    levels = ['day', 'week', 'month', 'quarter']
+
+    built = Memo()
+
+    def __init__(self, states, dates, cases, deaths):
+        self.states = states
+        self.dates = dates
+        self.pyramid = {}
+
+        reported = ~np.isnan(cases)
+        position = np.where(reported, np.arange(len(dates)), len(dates))
+        for level in TimePyramid.levels:
+            start = TimePyramid.bucket(dates, level)
+            edges = np.flatnonzero(np.concatenate([[True], start[1:] != start[:-1]]))
+            days = np.add.reduceat(reported.astype('int64'), edges, axis=1)
+            sums = {}
+            for feat, values in [('cases', cases), ('deaths', deaths)]:
+                sums[feat] = np.add.reduceat(np.nan_to_num(values), edges, axis=1)
+                sums[feat][days == 0] = np.nan
+            first = np.minimum.reduceat(position, edges, axis=1)
+            self.pyramid[level] = {'start':start[edges], 'first':np.where(first < len(dates), first, -1),
+                                   'cases':sums['cases'], 'deaths':sums['deaths'], 'days':days}
+
+    @classmethod
+    def of(cls, result):
+        """Method that returns the pyramid of a StatsResult, building it
+        on first use
+
+        Args:
+            result (StatsResult):  results of a Stats object
+
+        Returns:
+            pyramid (TimePyramid):  pyramid of its arrays; Stats objects
+            over the same dates share one
+        """
+
+        return cls.built.fetch(result.key, lambda: cls(result.states, result.dates, result.cases, result.deaths))
+
+    @staticmethod
+    def bucket(dates, level):
+        """Method that finds the first day of the bucket of every day
+
+        Args:
+            dates (numpy array):  datetime64[D] dates
+            level (str):  one of TimePyramid.levels
+
+        Returns:
+            start (numpy array):  datetime64[D] first day of the day, ISO
+            week, month or quarter holding every date
+        """
+
+        if level == 'week':
+            # 1970-01-01 was a Thursday
+            return dates-(dates.astype('int64')+3) % 7
+        if level == 'month':
+            return dates.astype('datetime64[M]').astype('datetime64[D]')
+        if level == 'quarter':
+            months = dates.astype('datetime64[M]').astype('int64')
+            return (months-months % 3).astype('datetime64[M]').astype('datetime64[D]')
+
+        return dates
+
+    def table(self, level, state, start=None, end=None):
+        """Generates the buckets of one state at one level
+
+        Args:
+            level (str):  one of TimePyramid.levels
+            state (str):  name of US state
+            start (str):  optional first date, 'YYYY-MM-DD'; buckets
+            starting before it are left out
+            end (str):  optional last date, 'YYYY-MM-DD'; buckets
+            starting after it are left out
+
+        Returns:
+            pyramidDF (DataFrame):  one row per bucket with a report, with
+            the first day of the bucket, the first day reported, the
+            cases and deaths, the days reported and the daily averages
+        """
+
+        frame = self.pyramid[level]
+        row = np.flatnonzero(self.states == state)[0]
+        keep = frame['days'][row] > 0
+        if start is not None:
+            keep &= frame['start'] >= np.datetime64(start, 'D')
+        if end is not None:
+            keep &= frame['start'] <= np.datetime64(end, 'D')
+
+        days = frame['days'][row, keep]
+        pyramidDF = pd.DataFrame({'date':frame['start'][keep].astype(str),
+                                  'first':self.dates[frame['first'][row, keep]].astype(str),
+                                  'cases':frame['cases'][row, keep], 'deaths':frame['deaths'][row, keep],
+                                  'days':days})
+        pyramidDF['avg_cases'] = pyramidDF['cases']/days
+        pyramidDF['avg_deaths'] = pyramidDF['deaths']/days
+
+        return pyramidDF
+
+    def pick(self, width, start=None, end=None):
+        """Method that picks the coarsest level with at least 'width'
+        buckets, or daily values when none has that many
+
+        Args:
+            width (int):  number of points the chart has room for
+            start, end (str):  optional date range, see self.table()
+
+        Returns:
+            level (str):  one of TimePyramid.levels
+        """
+
+        chosen = 'day'
+        for level in TimePyramid.levels:
+            starts = self.pyramid[level]['start']
+            count = len(starts)
+            if start is not None or end is not None:
+                lo = np.datetime64(start if start is not None else starts[0], 'D')
+                hi = np.datetime64(end if end is not None else starts[-1], 'D')
+                count = int(((starts >= lo) & (starts <= hi)).sum())
+            if count >= width:
+                chosen = level
+
+        return chosen
+
+    def query(self, state, width, start=None, end=None):
+        """Method that returns the buckets of one state at the coarsest
+        level still filling a chart, see self.pick()
+
+        Args:
+            state (str):  name of US state
+            width (int):  number of points the chart has room for
+            start, end (str):  optional date range, see self.table()
+
+        Returns:
+            level (str):  level picked
+            pyramidDF (DataFrame):  buckets of the state, see self.table()
+        """
+
+        level = self.pick(width, start, end)
+
+        return level, self.table(level, state, start, end)
+
+class Waves:
+    """ Waves of every state found in one batched pass over the smoothed
+        daily series.
+
+        A peak is the highest smoothed day within 'span' days on either
+        side and reaches 'minHeight' of the state's highest day.  The
+        lowest day between two peaks is the trough ending one wave and
+        starting the next.  Peaks rising less than 'minRise' of their own
+        value above their higher trough are dropped one at a time and the
+        troughs found again, until every wave stands out; small early
+        waves are kept next to large later ones.
+
+        Attributes:
+            states (numpy array):  name of every state, one per row
+            dates (numpy array):  datetime64[D] date axis
+            smooth (numpy array):  [state, day] centered moving average,
+            0 where it is not defined
+            waveDF (DataFrame):  one row per wave with the state, its
+            number, the start, peak and end dates, the smoothed value at
+            the start, peak and end, and the total reported from start
+            to end
+
+        """
+
+    built = Memo()
+
+    def __init__(self, states, dates, daily, smooth, span=21, minHeight=0.02, minRise=0.5):
+        self.states = states
+        self.dates = dates
+        self.smooth = smooth
+
+        n, days = smooth.shape
+        width = 2*span+1
+        padded = np.pad(smooth, ((0, 0), (span, span)), constant_values=-np.inf)
+        highest = np.lib.stride_tricks.sliding_window_view(padded, width, axis=1).max(axis=2)
+        rising = np.concatenate([np.ones((n, 1), dtype=bool), smooth[:, 1:] > smooth[:, :-1]], axis=1)
+        floor = minHeight*smooth.max(axis=1, keepdims=True)
+        peaks = (smooth == highest) & rising & (smooth > 0) & (smooth >= floor)
+
+        # drops the weakest low peak of every state at a time, since
+        # dropping a peak can deepen the troughs of its neighbours
+        while True:
+            row, peak, start, end = Waves.troughs(smooth, peaks)
+            rise = (smooth[row, peak]-np.maximum(smooth[row, start], smooth[row, end]))/smooth[row, peak]
+            low = np.flatnonzero(rise < minRise)
+            if len(low) == 0:
+                break
+            low = low[np.lexsort((rise[low], row[low]))]
+            low = low[np.concatenate([[True], row[low][1:] != row[low][:-1]])]
+            peaks[row[low], peak[low]] = False
+
+        total = np.concatenate([np.zeros((n, 1)), np.cumsum(np.nan_to_num(daily), axis=1)], axis=1)
+        number = np.arange(len(row))-np.searchsorted(row, row)+1
+        self.waveDF = pd.DataFrame({'state':states[row], 'wave':number,
+                                    'start':dates[start].astype(str), 'peak':dates[peak].astype(str),
+                                    'end':dates[end].astype(str),
+                                    'start_value':smooth[row, start].round(2),
+                                    'peak_value':smooth[row, peak].round(2),
+                                    'end_value':smooth[row, end].round(2),
+                                    'total':total[row, end+1]-total[row, start]})
+
+    @staticmethod
+    def troughs(smooth, peaks):
+        """Method that finds the lowest day before and after every peak
+
+        Every row is cut at its peaks; the lowest day of each piece is a
+        trough, found for all pieces at once by sorting on (piece, value).
+
+        Args:
+            smooth (numpy array):  [state, day] smoothed values
+            peaks (numpy array):  [state, day] True on peaks
+
+        Returns:
+            row (numpy array):  state of every peak, in order
+            peak (numpy array):  day of every peak
+            start (numpy array):  day of the trough before every peak
+            end (numpy array):  day of the trough after every peak
+        """
+
+        n, days = smooth.shape
+        row, peak = np.nonzero(peaks)
+        cuts = peaks.copy()
+        cuts[:, 0] = True
+        piece = np.cumsum(cuts.ravel())-1
+        order = np.lexsort((smooth.ravel(), piece))
+        lowest = order[np.concatenate([[True], piece[order][1:] != piece[order][:-1]])] % days
+
+        # pieces of a row: before its first peak, then one per peak
+        first = np.cumsum(cuts.sum(axis=1))-cuts.sum(axis=1)
+        after = first[row]+np.arange(len(row))-np.searchsorted(row, row)+(~peaks[row, 0])
+        start = lowest[after-1]
+        start = np.where(peaks[row, 0] & (after == first[row]), 0, start)
+
+        return row, peak, np.minimum(start, peak), np.maximum(lowest[after], peak)
+
+    @classmethod
+    def of(cls, result, feat='cases', window=7, span=21, minHeight=0.02, minRise=0.5):
+        """Method that returns the waves of a StatsResult, finding them
+        on first use
+
+        Args:
+            result (StatsResult):  results of a Stats object
+            feat (str):  either 'cases' or 'deaths'
+            window (int):  days in the centered moving average
+            span (int):  days on either side a peak must be highest in
+            minHeight (float):  smallest peak, as a share of the state's
+            highest day
+            minRise (float):  smallest rise of a peak above its higher
+            trough, as a share of the peak
+
+        Returns:
+            waves (Waves):  waves of every state; Stats objects over the
+            same dates share them
+        """
+
+        def build():
+            smooth = np.nan_to_num(result.rolling(feat, window, center=True))
+            daily = result.cases if feat == 'cases' else result.deaths
+            return cls(result.states, result.dates, daily, smooth, span, minHeight, minRise)
+
+        key = None if result.key is None else result.key+(feat, window, span, minHeight, minRise)
+
+        return cls.built.fetch(key, build)
+
+    def forState(self, state):
+        """Method that returns the waves of one state
+
+        Args:
+            state (str):  name of US state
+
+        Returns:
+            waveDF (DataFrame):  rows of self.waveDF for the state
+        """
+
+        return self.waveDF[self.waveDF['state'] == state].reset_index(drop=True)
+
+class Similarity:
+    """ Pairwise similarity of the daily curves of many states or
+        counties, with clusters of similar curves and an order putting
+        them next to each other.
+
+        Every series is the moving average of the daily cases, deaths or
+        both, z-scored over the window; scaling a series does not change
+        its correlation, so per-capita and raw counts give the same
+        matrix and counties without populations are compared the same
+        way.  With 'lag', each pair is also compared shifted by up to
+        'lag' days and the best correlation is kept.  The matrix is
+        computed in square blocks of 'block' series, one matrix product
+        per block and shift, so thousands of series fit in memory.
+
+        Attributes:
+            names (numpy array):  name of every series, one per row
+            matrix (numpy array):  [series, series] Pearson correlation,
+            averaged over cases and deaths when both are compared; 0
+            where a series never changes
+            lags (numpy array):  [series, series] shift of the best
+            correlation; lags[i, j] > 0 when series i follows series j
+            by that many days
+            clusters (dict):  labels, medoids and order of every number
+            of clusters asked for, see self.cluster()
+
+        """
+
+    built = Memo()
+
+    def __init__(self, names, parts, lag=0, block=512):
+        self.names = names
+        self.clusters = {}
+
+        n = len(names)
+        parts = [self.normalize(part) for part in parts]
+        # zero first, then growing shifts, so ties keep the smallest lag
+        shifts = np.arange(-lag, lag+1)[np.argsort(np.abs(np.arange(-lag, lag+1)), kind='stable')]
+        self.matrix = np.zeros((n, n))
+        self.lags = np.zeros((n, n), dtype='int64')
+        for lo in range(0, n, block):
+            rows = slice(lo, min(lo+block, n))
+            for hi in range(lo, n, block):
+                cols = slice(hi, min(hi+block, n))
+                best = np.full((rows.stop-rows.start, cols.stop-cols.start), -np.inf)
+                bestLag = np.zeros(best.shape, dtype='int64')
+                for shift in shifts:
+                    corr = sum(self.correlate(part[rows], part[cols], shift) for part in parts)/len(parts)
+                    better = corr > best
+                    best[better] = corr[better]
+                    bestLag[better] = shift
+                best[~np.isfinite(best)] = 0
+                self.matrix[rows, cols] = best
+                self.matrix[cols, rows] = best.T
+                self.lags[rows, cols] = bestLag
+                self.lags[cols, rows] = -bestLag.T
+        np.fill_diagonal(self.matrix, 1)
+        np.fill_diagonal(self.lags, 0)
+
+    @staticmethod
+    def normalize(values):
+        """Method that z-scores every row
+
+        Args:
+            values (numpy array):  [series, day] values, NaN counted as 0
+
+        Returns:
+            values (numpy array):  rows with mean 0 and standard deviation
+            1; rows that never change are 0
+        """
+
+        values = np.nan_to_num(np.asarray(values, dtype='float64'))
+        spread = values.std(axis=1, keepdims=True)
+
+        return (values-values.mean(axis=1, keepdims=True))/np.where(spread > 0, spread, 1)
+
+    @staticmethod
+    def correlate(x, y, shift):
+        """Method that correlates every row of x with every row of y over
+        the days they share once x is shifted
+
+        Args:
+            x (numpy array):  [series, day] values
+            y (numpy array):  [series, day] values over the same days
+            shift (int):  day t+shift of x is compared with day t of y
+
+        Returns:
+            corr (numpy array):  [x series, y series] Pearson correlation,
+            NaN where a series does not change over the shared days
+        """
+
+        days = x.shape[1]
+        if shift >= 0:
+            x, y = x[:, shift:], y[:, :days-shift]
+        else:
+            x, y = x[:, :days+shift], y[:, -shift:]
+        n = x.shape[1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (((x @ y.T)/n-np.outer(x.mean(axis=1), y.mean(axis=1)))
+                    /np.outer(x.std(axis=1), y.std(axis=1)))
+
+    @classmethod
+    def of(cls, result, feat='both', window=7, lag=0, block=512):
+        """Method that returns the similarity of every state of a
+        StatsResult, computing it on first use
+
+        Args:
+            result (StatsResult):  results of a Stats object
+            feat (str):  'cases', 'deaths' or 'both'
+            window (int):  days in the trailing moving average
+            lag (int):  largest shift in days, 0 compares the same days
+            block (int):  series per block
+
+        Returns:
+            similarity (Similarity):  every state over the dates of the
+            result; Stats objects over the same dates share it
+        """
+
+        def build():
+            feats = ['cases', 'deaths'] if feat == 'both' else [feat]
+            return cls(result.states, [result.rolling(name, window) for name in feats], lag, block)
+
+        key = None if result.key is None else result.key+(feat, window, lag, block)
+
+        return cls.built.fetch(key, build)
+
+    def cluster(self, clusters=6, iterations=20):
+        """Method that groups the series around medoids, the series
+        closest to the rest of their group, with 1 - correlation as the
+        distance
+
+        The first medoid is the series most correlated with all others
+        and each next one the series farthest from those picked, so the
+        result does not depend on a random start.  Members and medoids
+        are then updated until they settle.  Clusters are numbered along
+        a chain going from the largest cluster to the nearest medoid not
+        yet visited.
+
+        Args:
+            clusters (int):  number of clusters
+            iterations (int):  most rounds of updates
+
+        Returns:
+            labels (numpy array):  cluster of every series, from 0
+            medoids (numpy array):  row of the medoid of every cluster
+            order (numpy array):  rows by cluster, each cluster starting
+            at its medoid, then by distance to it
+        """
+
+        clusters = min(clusters, len(self.names))
+        if clusters in self.clusters:
+            return self.clusters[clusters]
+
+        dist = 1-self.matrix
+        medoids = [int(np.argmax(self.matrix.sum(axis=1)))]
+        nearest = dist[:, medoids[0]].copy()
+        while len(medoids) < clusters:
+            medoids.append(int(np.argmax(nearest)))
+            np.minimum(nearest, dist[:, medoids[-1]], out=nearest)
+        medoids = np.array(medoids)
+
+        for num in range(iterations):
+            labels = np.argmin(dist[:, medoids], axis=1)
+            labels[medoids] = np.arange(clusters)
+            update = medoids.copy()
+            for label in range(clusters):
+                members = np.flatnonzero(labels == label)
+                if len(members):
+                    update[label] = members[np.argmin(dist[np.ix_(members, members)].sum(axis=1))]
+            if np.array_equal(update, medoids):
+                break
+            medoids = update
+        labels = np.argmin(dist[:, medoids], axis=1)
+        labels[medoids] = np.arange(clusters)
+
+        chain = [int(np.argmax(np.bincount(labels, minlength=clusters)))]
+        between = dist[np.ix_(medoids, medoids)].copy()
+        between[:, chain[0]] = np.inf
+        while len(chain) < clusters:
+            chain.append(int(np.argmin(between[chain[-1]])))
+            between[:, chain[-1]] = np.inf
+        rank = np.argsort(chain)
+        labels, medoids = rank[labels], medoids[chain]
+        order = np.lexsort((dist[np.arange(len(labels)), medoids[labels]], labels))
+        self.clusters[clusters] = (labels, medoids, order)
+
+        return self.clusters[clusters]
+
+    def order(self, clusters=6):
+        """Method that returns the names with similar series next to
+        each other, see self.cluster()
+
+        Returns:
+            names (list):  every name, ordered by cluster
+        """
+
+        return self.names[self.cluster(clusters)[2]].tolist()
+
+    def table(self, clusters=6):
+        """Generates the cluster of every series
+
+        Args:
+            clusters (int):  number of clusters, see self.cluster()
+
+        Returns:
+            clusterDF (DataFrame):  one row per series in the order of
+            self.order(), with its cluster (from 1), the medoid of the
+            cluster, the correlation with the medoid and the lag behind
+            it
+        """
+
+        labels, medoids, order = self.cluster(clusters)
+        medoid = medoids[labels[order]]
+
+        return pd.DataFrame({'name':self.names[order], 'cluster':labels[order]+1,
+                             'medoid':self.names[medoid],
+                             'similarity':self.matrix[order, medoid].round(3),
+                             'lag':self.lags[order, medoid]})
+
+class DeathLag:
+    """ Lag between the daily cases and deaths of every state, found by
+        cross-correlating the two series of all states at once with FFTs.
+
+        Both series are smoothed by a trailing moving average, which
+        removes the weekday reporting pattern.  At every shift of deaths
+        after cases, from 0 to 'maxLag' days, the two series are
+        correlated over the days they overlap only, with the means and
+        spreads of those days, so the trend of a wave cut by the window
+        does not favor short lags.  The lag of a state is the shift with
+        the highest correlation.  Windows under 'minDays' days are too
+        short to find a lag, so every state gets the 'fallback' lag.  The
+        lag-adjusted case fatality ratio divides the deaths from 'lag'
+        days after the first day by the cases up to 'lag' days before the
+        last day, so deaths are matched with the cases they followed.
+
+        Attributes:
+            states (numpy array):  name of every state, one per row
+            lags (numpy array):  lag of every state in days, NaN when
+            cases and deaths are not positively correlated at any lag
+            corr (numpy array):  correlation at the lag of every state,
+            NaN when the fallback lag is used
+            fixed (bool):  True when the window was too short and every
+            state has the fallback lag
+            lagCFR (numpy array):  lag-adjusted case fatality ratio of
+            every state in percent, NaN without a lag
+            lagDF (DataFrame):  'full_name', 'death_lag', 'lag_corr',
+            'lag_cfr' and 'lag_fixed' of every state
+
+        """
+
+    built = Memo()
+
+    def __init__(self, states, cases, deaths, maxLag=42, window=7, minDays=120, fallback=18):
+        self.states = states
+
+        cases, deaths = np.nan_to_num(cases), np.nan_to_num(deaths)
+        n, days = cases.shape
+        self.fixed = days < minDays
+        if self.fixed:
+            lag = np.full(n, min(fallback, days))
+            self.corr = np.full(n, np.nan)
+            found = np.ones(n, dtype=bool)
+        else:
+            lag, self.corr = self.correlate(cases, deaths, max(min(maxLag, days//2), 0), window)
+            found = self.corr > 0
+        self.lags = np.where(found, lag, np.nan)
+
+        casesTotal = np.concatenate([np.zeros((n, 1)), np.cumsum(cases, axis=1)], axis=1)
+        deathsTotal = np.concatenate([np.zeros((n, 1)), np.cumsum(deaths, axis=1)], axis=1)
+        rows = np.arange(n)
+        before = casesTotal[rows, days-lag]
+        after = deathsTotal[:, days]-deathsTotal[rows, lag]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.lagCFR = np.where(found & (before > 0), after/before*100, np.nan)
+
+        self.lagDF = pd.DataFrame({'full_name':states, 'death_lag':self.lags,
+                                   'lag_corr':self.corr.round(3), 'lag_cfr':self.lagCFR.round(3),
+                                   'lag_fixed':self.fixed})
+
+    @staticmethod
+    def correlate(cases, deaths, maxLag, window):
+        """Method that finds the shift of deaths after cases with the
+        highest correlation, for every state at once
+
+        The sums of products at every shift come from one FFT per series.
+        The sums and sums of squares of the overlapping days come from
+        running totals, so each shift is a Pearson correlation over its
+        own days.
+
+        Args:
+            cases (numpy array):  [state, day] daily cases
+            deaths (numpy array):  [state, day] daily deaths
+            maxLag (int):  longest shift in days
+            window (int):  days in the trailing moving average
+
+        Returns:
+            lag (numpy array):  shift with the highest correlation
+            corr (numpy array):  correlation at that shift
+        """
+
+        n, days = cases.shape
+        smooth = []
+        for values in (cases, deaths):
+            total = np.concatenate([np.zeros((n, 1)), np.cumsum(values, axis=1)], axis=1)
+            smooth.append(Similarity.normalize((total[:, window:]-total[:, :-window])/window
+                                               if days > window else values))
+        length = smooth[0].shape[1]
+        shifts = np.arange(maxLag+1)
+        count = length-shifts
+        size = 1 << int(2*length-1).bit_length()
+        spectrum = np.conj(np.fft.rfft(smooth[0], size, axis=1))*np.fft.rfft(smooth[1], size, axis=1)
+        # day t of cases against day t+lag of deaths, over the days both have
+        product = np.fft.irfft(spectrum, size, axis=1)[:, :maxLag+1]
+
+        totals = [np.concatenate([np.zeros((n, 1)), np.cumsum(values, axis=1)], axis=1)
+                  for values in (smooth[0], smooth[0]**2, smooth[1], smooth[1]**2)]
+        caseSum, caseSquares = totals[0][:, length-shifts], totals[1][:, length-shifts]
+        deathSum = totals[2][:, length:]-totals[2][:, shifts]
+        deathSquares = totals[3][:, length:]-totals[3][:, shifts]
+        spread = (caseSquares-caseSum**2/count)*(deathSquares-deathSum**2/count)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = np.where(spread > 0, (product-caseSum*deathSum/count)/np.sqrt(spread), 0)
+
+        lag = np.argmax(corr, axis=1)
+
+        return lag, corr[np.arange(n), lag]
+
+    @classmethod
+    def of(cls, series, maxLag=42, window=7, minDays=120, fallback=18, key=None):
+        """Method that returns the lags of the arrays of StatsResult.align(),
+        finding them on first use
+
+        Args:
+            series (tuple):  states, dates, cases and deaths arrays
+            maxLag (int):  longest lag in days
+            window (int):  days in the trailing moving average
+            minDays (int):  shortest window in days a lag is found for
+            fallback (int):  lag in days used for shorter windows
+            key (tuple):  date of the data and window of the arrays, see
+            Stats.windowKey(); the lags are not kept when None
+
+        Returns:
+            lag (DeathLag):  lags of every state; Stats objects over the
+            same data and dates share them
+        """
+
+        states, dates, cases, deaths = series
+        if key is not None:
+            key = key+(maxLag, window, minDays, fallback)
+
+        return cls.built.fetch(key, lambda: cls(states, cases, deaths, maxLag, window, minDays, fallback))
+
+class DataQuality:
+    """ Checks of the cumulative counts of every state, found in one
+        vectorized pass over the rows of Stats.getDF(), with corrections.
+
+        Rows are sorted by state and date.  A row is flagged when it
+        repeats the date of the row before it, when days are missing
+        before it, when its cases or deaths are below the row before it
+        (a negative daily count), or when they are below any earlier row
+        of the state (a cumulative count that is not monotonic).
+
+        The correction policies are:
+            'leave':  rows are used as reported
+            'clip':  every cumulative count is raised to the highest
+            count reported before it, so negative days become 0 and the
+            correction is absorbed by the days after it, then capped at
+            the last count reported, so the latest total is kept
+            'redistribute':  at every drop, the counts before it are
+            scaled down to the count after the drop, so the correction
+            is taken out of the earlier daily counts in proportion to
+            their size and the drop becomes a day of 0
+        Both corrections keep the last row of a repeated date and the
+        last count of every state, and take negative counts as 0.
+
+        Attributes:
+            df (DataFrame):  rows as reported
+            order (numpy array):  positions of the rows of df sorted by
+            state and date, repeated dates in file order
+            names (numpy array):  name of every state
+            code (numpy array):  position in self.names of every sorted
+            row
+            first (numpy array):  True on the first sorted row of every
+            state
+            values (dict):  sorted cumulative 'cases' and 'deaths'
+            flagDF (DataFrame):  one row per row of df in that order,
+            with its position in df, date, state, days since the previous
+            row and one column per check
+            corrected (dict):  DataFrame of every policy used, see
+            self.correct()
+
+        """
+
+    policies = ['leave', 'clip', 'redistribute']
+    checks = ['duplicate', 'gap', 'negative_cases', 'negative_deaths', 'nonmonotonic_cases',
+              'nonmonotonic_deaths']
+
+    built = Memo(4)
+
+    def __init__(self, df):
+        self.df = df
+        self.corrected = {}
+
+        names, code = np.unique(df['state'].to_numpy(dtype=object), return_inverse=True)
+        day = df['date'].to_numpy(dtype='datetime64[D]')
+        self.order = np.lexsort((np.arange(len(df)), day, code))
+        self.names = names
+        self.code = code[self.order]
+        day = day[self.order]
+        self.first = np.concatenate([[True], self.code[1:] != self.code[:-1]])
+        step = np.where(self.first, 0, np.diff(day, prepend=day[:1]).astype('int64'))
+
+        columns = {'row':self.order, 'date':day.astype(str), 'state':names[self.code], 'step':step,
+                   'duplicate':~self.first & (step == 0), 'gap':step > 1}
+        self.values = {}
+        for feat in ['cases', 'deaths']:
+            values = df[feat].to_numpy(dtype='float64')[self.order]
+            self.values[feat] = values
+            delta = np.where(self.first, 0, np.diff(values, prepend=values[:1]))
+            columns['negative_'+feat] = delta < 0
+            columns['nonmonotonic_'+feat] = values < self.accumulate(values, self.code)
+            columns['removed_'+feat] = np.where(delta < 0, -delta, 0)
+        self.flagDF = pd.DataFrame(columns)
+
+    @staticmethod
+    def accumulate(values, code):
+        """Method that runs np.maximum.accumulate within every state at
+        once
+
+        Rows of a state are lifted above every row of the states before
+        it, so the running highest value never carries from one state
+        into the next.
+
+        Args:
+            values (numpy array):  values sorted by state
+            code (numpy array):  state of every value, ascending
+
+        Returns:
+            running (numpy array):  highest value so far within every
+            state
+        """
+
+        if len(values) == 0:
+            return values
+        low = values.min()
+        offset = code*(values.max()-low+1)
+
+        return np.maximum.accumulate(values-low+offset)-offset+low
+
+    @staticmethod
+    def clip(values, code, last):
+        """Method that raises every count to the highest count before it
+        and caps it at the last count of its state
+
+        Args:
+            values (numpy array):  cumulative counts sorted by state and
+            date
+            code (numpy array):  state of every count, ascending
+            last (numpy array):  True on the last row of every state
+
+        Returns:
+            values (numpy array):  counts that never fall, ending at the
+            last reported count; negative counts are taken as 0
+        """
+
+        values = np.maximum(values, 0)
+        final = values[last][np.cumsum(last)-last]
+
+        return np.minimum(DataQuality.accumulate(values, code), final)
+
+    @staticmethod
+    def spread(values, code, first):
+        """Method that takes every drop out of the counts before it
+
+        A drop from c[k-1] to c[k] scales every earlier count of the
+        state by c[k]/c[k-1], so each earlier daily count gives up the
+        same share and c[k-1] becomes c[k].  A count is scaled by the
+        product of the drops after it, summed as logarithms within every
+        state from the last row backwards; a drop to 0 sets every count
+        before it to 0.  Negative counts are taken as 0, so every drop
+        starts from a positive count.
+
+        Args:
+            values (numpy array):  cumulative counts sorted by state and
+            date
+            code (numpy array):  state of every count, ascending
+            first (numpy array):  True on the first row of every state
+
+        Returns:
+            values (numpy array):  counts that never fall, ending at the
+            last reported count
+        """
+
+        values = np.maximum(values, 0)
+        before = np.concatenate([[0], values[:-1]])
+        drop = ~first & (values < before)
+        ratio = np.ones(len(values))
+        ratio[drop] = values[drop]/before[drop]
+        zero = ratio == 0
+        logs = np.log(np.where(zero, 1, ratio))
+
+        # sums of the rows after every row, within its state
+        ends = np.flatnonzero(np.concatenate([first[1:], [True]]))
+        def after(value):
+            total = np.cumsum(value[::-1])[::-1]
+            return total-value-(total[ends]-value[ends])[code]
+
+        return np.where(after(zero.astype('float64')) > 0, 0, values*np.exp(after(logs)))
+
+    @classmethod
+    def of(cls, df, key=None):
+        """Method that returns the checks of a DataFrame, running them on
+        first use
+
+        Args:
+            df (DataFrame):  see Stats.getDF()
+            key (tuple):  date of the data, see Stats.dataKey(); the
+            checks are not kept when None
+
+        Returns:
+            quality (DataQuality):  the same object for the same data
+        """
+
+        return cls.built.fetch(key, lambda: cls(df))
+
+    def correct(self, policy='clip'):
+        """Method that applies a correction policy
+
+        Args:
+            policy (str):  one of DataQuality.policies
+
+        Raises:
+            ValueError when the policy is unknown
+
+        Returns:
+            df (DataFrame):  df itself for 'leave', otherwise a corrected
+            copy in the order of df without repeated dates; the same
+            object is returned on later calls
+        """
+
+        if policy not in DataQuality.policies:
+            raise ValueError("policy must be one of "+", ".join(DataQuality.policies))
+        if policy == 'leave':
+            return self.df
+        if policy in self.corrected:
+            return self.corrected[policy]
+
+        keep = np.concatenate([~self.flagDF['duplicate'].to_numpy()[1:], [True]])
+        rows = self.order[keep]
+        back = np.argsort(rows, kind='stable')
+        df = self.df.iloc[rows[back]].reset_index(drop=True)
+        code, first = self.code[keep], self.first[keep]
+        last = np.concatenate([first[1:], [True]])
+        for feat in ['cases', 'deaths']:
+            if policy == 'clip':
+                values = self.clip(self.values[feat][keep], code, last)
+            else:
+                values = self.spread(self.values[feat][keep], code, first)
+            df[feat] = np.round(values)[back].astype(self.df[feat].dtype)
+        self.corrected[policy] = df
+
+        return df
+
+    def summary(self):
+        """Generates the number of flagged rows of every state
+
+        Returns:
+            summaryDF (DataFrame):  one row per state with its rows, first
+            and last date, the number of rows failing every check, the
+            days missing between rows and the cases and deaths taken
+            back by negative daily counts
+        """
+
+        count = lambda values: np.bincount(self.code, weights=values, minlength=len(self.names))
+        flagDF = self.flagDF
+        summaryDF = pd.DataFrame({'state':self.names, 'rows':count(None).astype('int64'),
+                                  'first_date':flagDF['date'][self.first].to_numpy(),
+                                  'last_date':flagDF['date'][np.concatenate([self.first[1:], [True]])].to_numpy()})
+        for check in DataQuality.checks:
+            summaryDF[check] = count(flagDF[check].to_numpy()).astype('int64')
+        summaryDF['missing_days'] = count(np.maximum(flagDF['step'].to_numpy()-1, 0)).astype('int64')
+        summaryDF['removed_cases'] = count(flagDF['removed_cases'].to_numpy())
+        summaryDF['removed_deaths'] = count(flagDF['removed_deaths'].to_numpy())
+
+        return summaryDF
+
+class Populations:
+    """ Population estimates of every state by year, read once from the
+        Census 'nst-est' files and looked up for many states and years at
+        once.
+
+        Attributes:
+            states (pandas Index):  name of every state
+            years (numpy array):  every year with an estimate, in order
+            table (numpy array):  [state, year] population
+
+        """
+
+    def __init__(self, states, years, table):
+        self.states = states
+        self.years = years
+        self.table = table
+
+    @classmethod
+    def fromFiles(cls, files):
+        """Method that reads the POPESTIMATE<year> columns of the state
+        rows of every file
+
+        Args:
+            files (list):  'nst-est2020.csv', 'nst-est2021.csv', ...;
+            for a year found in several files the first file is kept,
+            so adding a file never changes the years already known
+
+        Returns:
+            populations (Populations):  every state and year found
+        """
+
+        estimates = {}
+        for path in files:
+            pop = pd.read_csv(path, dtype={'SUMLEV':str})
+            pop = pop[pop['SUMLEV'] == '040'].set_index('NAME')
+            for col in pop.columns:
+                year = col[len('POPESTIMATE'):]
+                if col.startswith('POPESTIMATE') and len(year) == 4 and int(year) not in estimates:
+                    estimates[int(year)] = pop[col].astype('float64')
+
+        years = np.array(sorted(estimates))
+        table = pd.DataFrame({year:estimates[year] for year in years})
+
+        return cls(table.index, years, table.to_numpy())
+
+    def lookup(self, states, years):
+        """Method that finds the population of every state and year
+
+        Years without an estimate use the latest estimate before them,
+        and years before the first estimate use the first.
+
+        Args:
+            states (array-like):  names of US states
+            years (array-like):  four-digit years, broadcast against
+            states
+
+        Returns:
+            pop (numpy array):  population of every state and year, NaN
+            for states without an estimate
+        """
+
+        states = np.asarray(states, dtype=object)
+        row = self.states.get_indexer(states.ravel()).reshape(states.shape)
+        column = np.clip(np.searchsorted(self.years, years, side='right')-1, 0, len(self.years)-1)
+        row, column = np.broadcast_arrays(row, column)
+
+        return np.where(row >= 0, self.table[row, column], np.nan)
+
+class Rollup:
+    """ Cumulative daily cases and deaths of every state rolled up to
+        census divisions, census regions and the whole country, with
+        counties below the states when a CountyStore is given.
+
+        Every level keeps [group, day] cumulative counts carried forward
+        over days without a report, so the totals of any group over any
+        date range are two lookups, see table().  Cases per person are
+        accumulated the same way, each day divided by the population of
+        its year, so incidence rates over a range spanning several years
+        use the right population for each year.
+
+        Attributes:
+            dates (numpy array):  datetime64[D] date axis, every day from
+            the first to the last report
+            years (numpy array):  every year of the date axis
+            yearOf (numpy array):  position in self.years of every day
+            groups (dict):  one dictionary per level, keyed by level, with
+            'names', 'parents' (division and region of every group),
+            'pop' ([group, year] population) and the cumulative 'cases',
+            'deaths', 'incidence' (cases per person) and 'reported' (days
+            with a report) arrays
+
+        """
+
+    levels = ['county', 'state', 'division', 'region', 'nation']
+    regions = {'1':'Northeast', '2':'Midwest', '3':'South', '4':'West'}
+    divisions = {'1':'New England', '2':'Middle Atlantic', '3':'East North Central',
+                 '4':'West North Central', '5':'South Atlantic', '6':'East South Central',
+                 '7':'West South Central', '8':'Mountain', '9':'Pacific'}
+
+    def __init__(self, dates, groups):
+        self.dates = dates
+        self.groups = groups
+        years = dates.astype('datetime64[Y]').astype('int64')+1970
+        self.years = np.unique(years)
+        self.yearOf = years-self.years[0]
+
+    @staticmethod
+    def carry(values, reported):
+        """Method that carries the last report forward over missing days
+
+        Args:
+            values (numpy array):  [group, day] cumulative counts
+            reported (numpy array):  [group, day] True on days with a
+            report
+
+        Returns:
+            values (numpy array):  counts of the last report on or before
+            every day, 0 before the first report
+        """
+
+        days = values.shape[1]
+        last = np.where(reported, np.arange(days), 0)
+        np.maximum.accumulate(last, axis=1, out=last)
+        values = np.take_along_axis(values, last, axis=1)
+
+        return np.where(np.cumsum(reported, axis=1) > 0, values, 0)
+
+    @staticmethod
+    def incidence(cases, pop, yearOf):
+        """Method that accumulates daily cases per person
+
+        Args:
+            cases (numpy array):  [group, day] cumulative cases
+            pop (numpy array):  [group, year] population
+            yearOf (numpy array):  year position of every day
+
+        Returns:
+            incidence (numpy array):  [group, day] cumulative cases per
+            person
+        """
+
+        return np.cumsum(np.diff(cases, axis=1, prepend=0)/pop[:, yearOf], axis=1)
+
+    @classmethod
+    def fromFrame(cls, df, popFile, populations, store=None):
+        """Method that builds the rollup of a Stats.getDF() DataFrame
+
+        Args:
+            df (DataFrame):  'date', 'state', 'cases' and 'deaths' of
+            every state, see Stats.getDF()
+            popFile (str):  'nst-est2020.csv', read for the REGION and
+            DIVISION codes of every state
+            populations (Populations):  population of every state by year
+            store (CountyStore):  optional county store adding the county
+            level
+
+        Returns:
+            rollup (Rollup):  every level over the dates of df
+        """
+
+        geo = pd.read_csv(popFile, dtype=str)
+        geo = geo[geo['SUMLEV'] == '040'].set_index('NAME')
+        names, row = np.unique(df['state'].to_numpy(dtype=object), return_inverse=True)
+        day = df['date'].to_numpy(dtype='datetime64[D]')
+        dates = np.arange(day.min(), day.max()+1)
+        column = (day-dates[0]).astype('int64')
+
+        reported = np.zeros((len(names), len(dates)), dtype=bool)
+        reported[row, column] = True
+        counts = {}
+        for feat in ['cases', 'deaths']:
+            grid = np.zeros((len(names), len(dates)))
+            grid[row, column] = df[feat].to_numpy(dtype='float64')
+            counts[feat] = cls.carry(grid, reported)
+        rollup = cls(dates, {})
+        pop = populations.lookup(names[:, None], rollup.years[None, :])
+
+        # Puerto Rico (REGION 'X') is in no census region, so it is only
+        # kept at the state level and left out of the rolled up levels
+        division = geo['DIVISION'].reindex(names).map(cls.divisions).to_numpy(dtype=object)
+        region = geo['REGION'].reindex(names).map(cls.regions).to_numpy(dtype=object)
+        inside = pd.notna(division) & pd.notna(region)
+        groups = rollup.groups
+        groups['state'] = {'names':names, 'parents':{'division':division, 'region':region},
+                           'pop':pop, 'cases':counts['cases'], 'deaths':counts['deaths'],
+                           'incidence':cls.incidence(counts['cases'], pop, rollup.yearOf),
+                           'reported':np.cumsum(reported, axis=1)}
+
+        for level, keys in [('division', division), ('region', region),
+                            ('nation', np.full(len(names), 'United States', dtype=object))]:
+            labels, member = np.unique(keys[inside], return_inverse=True)
+            onehot = np.zeros((len(labels), len(names)))
+            onehot[member, np.flatnonzero(inside)] = 1
+            parents = {parent:pd.Series(values[inside]).groupby(member).first().to_numpy(dtype=object)
+                       for parent, values in [('division', division), ('region', region)]
+                       if Rollup.levels.index(parent) > Rollup.levels.index(level)}
+            cases = onehot @ counts['cases']
+            groups[level] = {'names':labels, 'parents':parents, 'pop':onehot @ pop,
+                             'cases':cases, 'deaths':onehot @ counts['deaths'],
+                             'incidence':cls.incidence(cases, onehot @ pop, rollup.yearOf),
+                             'reported':np.cumsum((onehot @ reported) > 0, axis=1)}
+
+        if store is not None:
+            groups['county'] = cls.countyLevel(store, dates, groups['state'])
+
+        return rollup
+
+    @staticmethod
+    def countyLevel(store, dates, states):
+        """Method that lays the counties of a CountyStore over the date
+        axis of the rollup
+
+        Args:
+            store (CountyStore):  store of 'us-counties.csv'
+            dates (numpy array):  date axis of the rollup
+            states (dict):  state level of the rollup, for the division
+            and region of every county
+
+        Returns:
+            counties (dict):  county level, see Rollup.groups; county
+            populations are not known and are NaN, and there is no
+            'incidence' array
+        """
+
+        shift = (dates[0]-store.start).astype('int64')
+        index = np.clip(np.arange(len(dates))+shift, -1, store.days-1)
+        before = index < 0
+        level = {'names':[], 'state':[], 'cases':[], 'deaths':[], 'reported':[]}
+        for code in store.manifest['partitions']:
+            part = store.partition(code)
+            level['names'].append(np.asarray(part['fips']))
+            level['state'].append(np.array([name[1] for name in part['names']], dtype=object))
+            for feat in ['cases', 'deaths', 'reported']:
+                values = np.asarray(part[feat])[:, np.maximum(index, 0)]
+                values[:, before] = 0
+                level[feat].append(values)
+
+        level = {key:np.concatenate(values) for key, values in level.items()}
+        parents = {'state':level.pop('state')}
+        for parent in ['division', 'region']:
+            lookup = pd.Series(states['parents'][parent], index=states['names'])
+            parents[parent] = lookup.reindex(parents['state']).to_numpy(dtype=object)
+        level['parents'] = parents
+        level['pop'] = np.full((len(level['names']), len(np.unique(dates.astype('datetime64[Y]')))), np.nan)
+
+        return level
+
+    def window(self, currmo, lastmo, curryear=22, lastyear=22):
+        """Method that turns a Stats date range into positions on the
+        date axis, see CountyStore.window()
+
+        Returns:
+            first (int):  position of the first day of the range
+            last (int):  position of the last day of the range
+        """
+
+        begin = np.datetime64(datetime.date(2000+lastyear, lastmo, 1), 'D')
+        end = (np.datetime64(datetime.date(2000+curryear, currmo, 1), 'M')+1).astype('datetime64[D]')
+        first = int(max((begin-self.dates[0]).astype('int64'), 0))
+        last = int(min((end-self.dates[0]).astype('int64')-1, len(self.dates)-1))
+
+        return first, last
+
+    def span(self, level, feat, window):
+        """Method that sums a cumulative array over a date range
+
+        Args:
+            level (str):  one of Rollup.levels
+            feat (str):  'cases', 'deaths', 'incidence' or 'reported'
+            window (tuple):  first and last position, see self.window()
+
+        Returns:
+            totals (numpy array):  total of every group of the level
+        """
+
+        first, last = window
+        values = self.groups[level][feat]
+        if first == 0:
+            return values[:, last].astype('float64')
+
+        return (values[:, last]-values[:, first-1]).astype('float64')
+
+    def table(self, level, window):
+        """Generates the statistics of every group of one level over a
+        date range
+
+        Args:
+            level (str):  one of Rollup.levels
+            window (tuple):  first and last position, see self.window()
+
+        Raises:
+            KeyError when the level was not built, e.g. 'county' without
+            a CountyStore
+
+        Returns:
+            levelDF (DataFrame):  one row per group with its population
+            in the last year of the range, totals, daily averages, case
+            fatality ratio and incidence rate, like the columns of Stats
+            'allStatesDF'
+        """
+
+        group = self.groups[level]
+        cases, deaths, days = [self.span(level, feat, window) for feat in ['cases', 'deaths', 'reported']]
+        if 'incidence' in group:
+            incidence = self.span(level, 'incidence', window)
+        else:
+            incidence = np.full(len(cases), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            levelDF = pd.DataFrame({'level':level, 'name':group['names'], **group['parents'],
+                                    'pop':group['pop'][:, self.yearOf[window[1]]],
+                                    'total_cases':cases, 'total_deaths':deaths,
+                                    'days':days.astype('int64'),
+                                    'avg_cases':np.round(cases/days, 2), 'avg_deaths':np.round(deaths/days, 2),
+                                    'cfr':np.round(deaths/np.where(cases > 0, cases, np.nan)*100, 3),
+                                    'ir':np.round(incidence*100000, 3)})
+
+        return levelDF
+
+    def daily(self, level, name, window):
+        """Generates the daily cases and deaths of one group
+
+        Args:
+            level (str):  one of Rollup.levels
+            name (str):  name of the group, e.g. 'South Atlantic', or
+            county FIPS code
+            window (tuple):  first and last position, see self.window()
+
+        Returns:
+            datesDF (DataFrame):  one row per day with a report, like the
+            'datesDF' of a Stats object
+        """
+
+        group = self.groups[level]
+        row = np.flatnonzero(group['names'] == name)[0]
+        first, last = window
+        lo = max(first-1, 0)
+        columns = {}
+        for feat in ['cases', 'deaths', 'reported']:
+            values = group[feat][row, lo:last+1]
+            columns[feat] = np.diff(values) if first > 0 else np.diff(values, prepend=0)
+        reported = columns['reported'] > 0
+
+        return pd.DataFrame({'date':self.dates[first:last+1][reported].astype(str),
+                             'cases':columns['cases'][reported], 'deaths':columns['deaths'][reported]})
+
+    def sweep(self, level='state'):
+        """Method that computes the statistics of every group for every
+        pair of first and last month at once, see WindowSweep
+
+        Args:
+            level (str):  one of Rollup.levels
+
+        Returns:
+            sweep (WindowSweep):  every month pair of the date axis
+        """
+
+        group = self.groups[level]
+        months = self.dates.astype('datetime64[M]')
+        ends = np.flatnonzero(np.concatenate([months[1:] != months[:-1], [True]]))
+        snapshots = {feat:group[feat][:, ends].astype('float64')
+                     for feat in ['cases', 'deaths', 'reported', 'incidence'] if feat in group}
+
+        return WindowSweep(level, group['names'], months[ends], snapshots)
+
+    def similarity(self, level='state', window=None, feat='both', smooth=7, lag=0, block=512):
+        """Method that correlates the curves of every group of one level
+        over a date range, see Similarity
+
+        Args:
+            level (str):  one of Rollup.levels, e.g. 'county'
+            window (tuple):  first and last position, see self.window();
+            every day by default
+            feat (str):  'cases', 'deaths' or 'both'
+            smooth (int):  days in the trailing moving average
+            lag (int):  largest shift in days
+            block (int):  series per block
+
+        Returns:
+            similarity (Similarity):  every group of the level
+        """
+
+        group = self.groups[level]
+        first, last = (0, len(self.dates)-1) if window is None else window
+        lo = first-smooth
+        parts = []
+        for name in (['cases', 'deaths'] if feat == 'both' else [feat]):
+            values = group[name][:, max(lo, 0):last+1].astype('float64')
+            if lo < 0:
+                values = np.pad(values, ((0, 0), (-lo, 0)))
+            parts.append((values[:, smooth:]-values[:, :-smooth])/smooth)
+
+        return Similarity(group['names'], parts, lag, block)
+
+class WindowSweep:
+    """ Statistics of every group over every date range running from
+        the first day of one month to the last day of another.
+
+        Totals over a range are differences of two month-end cumulative
+        snapshots, so every range is computed in one pass of array
+        arithmetic instead of one Stats object per range.
+
+        Attributes:
+            level (str):  level of the groups, see Rollup.levels
+            names (numpy array):  name of every group
+            months (numpy array):  datetime64[M] month of every snapshot
+            values (numpy array):  [start, end, group, metric] statistics
+            over the months start to end, NaN when start is after end;
+            metrics are in the order of WindowSweep.metrics
+            ranks (numpy array):  [start, end, group, metric] rank of
+            every group among all groups, 1 being the highest value, 0
+            when the value is NaN
+
+        """
+
+    metrics = ['total_cases', 'total_deaths', 'avg_cases', 'avg_deaths', 'cfr', 'ir']
+
+    def __init__(self, level, names, months, snapshots):
+        self.level = level
+        self.names = names
+        self.months = months
+
+        # totals[start, end] = snapshot[end] - snapshot[start-1]
+        totals = {}
+        for feat, values in snapshots.items():
+            before = np.concatenate([np.zeros((len(names), 1)), values[:, :-1]], axis=1)
+            totals[feat] = values.T[None, :, :]-before.T[:, None, :]
+        if 'incidence' not in totals:
+            totals['incidence'] = np.full(totals['cases'].shape, np.nan)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            days = np.where(totals['reported'] > 0, totals['reported'], np.nan)
+            cases = totals['cases']
+            self.values = np.stack([cases, totals['deaths'], np.round(cases/days, 2),
+                                    np.round(totals['deaths']/days, 2),
+                                    np.round(totals['deaths']/np.where(cases > 0, cases, np.nan)*100, 3),
+                                    np.round(totals['incidence']*100000, 3)], axis=-1)
+        later = np.arange(len(months))[:, None] > np.arange(len(months))[None, :]
+        self.values[later] = np.nan
+
+        # descending order with NaN last, then the position of every group
+        order = np.argsort(np.where(np.isnan(self.values), np.inf, -self.values), axis=2, kind='stable')
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, len(names)+1)[None, None, :, None], axis=2)
+        self.ranks = np.where(np.isnan(self.values), 0, ranks)
+
+    def window(self, currmo, lastmo, curryear=22, lastyear=22):
+        """Method that turns a Stats date range into snapshot positions
+
+        Args:
+            currmo, lastmo, curryear, lastyear (int):  see Stats
+
+        Raises:
+            KeyError when a month is outside the date axis
+
+        Returns:
+            start (int):  position of 'lastmo'
+            end (int):  position of 'currmo'
+        """
+
+        positions = []
+        for month, year in [(lastmo, lastyear), (currmo, curryear)]:
+            found = np.flatnonzero(self.months == np.datetime64("%d-%02d" % (2000+year, month), 'M'))
+            if len(found) == 0:
+                raise KeyError("%02d/%02d is not in the data" % (month, year))
+            positions.append(int(found[0]))
+
+        return tuple(positions)
+
+    def table(self, window):
+        """Generates the statistics of every group over one date range
+
+        Args:
+            window (tuple):  start and end position, see self.window()
+
+        Returns:
+            sweepDF (DataFrame):  one row per group with every metric and
+            its '<metric>_rank'
+        """
+
+        start, end = window
+        sweepDF = pd.DataFrame({'name':self.names})
+        for num, metric in enumerate(WindowSweep.metrics):
+            sweepDF[metric] = self.values[start, end, :, num]
+            sweepDF[metric+'_rank'] = self.ranks[start, end, :, num]
+
+        return sweepDF
+
+    def matrix(self, name, metric='ir', rank=False):
+        """Generates one statistic of one group over every date range
+
+        Args:
+            name (str):  name of the group
+            metric (str):  one of WindowSweep.metrics
+            rank (bool):  returns the rank instead of the value when True
+
+        Returns:
+            matrixDF (DataFrame):  one row per first month and one column
+            per last month, 'YYYY-MM'
+        """
+
+        row = np.flatnonzero(self.names == name)[0]
+        source = self.ranks if rank else self.values
+        labels = pd.Index(self.months.astype(str))
+
+        return pd.DataFrame(source[:, :, row, WindowSweep.metrics.index(metric)],
+                            index=labels.rename('start'), columns=labels.rename('end'))
+
+class Stats:
+
+    defaultData = ["../../../Documents/GitHub/covid-19-data/us-states.csv","nst-est2020.csv","states-sqmi20.csv","https://data.cdc.gov/resource/unsk-b7fc.json","abbr.csv"]
+
+    frames = Memo(4)
+    windows = Memo(16)
+    rollups = Memo(4)
+    populations = Memo(4)
+
+    def __init__(self, state, currmo, lastmo, curryear=22, lastyear=22, data=None,
+                 timings=False, timingLog=None, profile=None, offline=False, verbose=True,
+                 quality='leave'):
+        """Calculating and displaying COVID-19 statistics per state.
+
+        Args:
+            data (list): optional list replacing the default CSV files and
+            URL links, in the same order
+            offline (bool): when True, vax() reads the latest saved
+            vaccination file instead of calling the CDC API
+            verbose (bool): prints the report of the state when True
+            timings (bool): records wall time, CPU time, rows and memory
+            peak of every stage in self.timings when True
+            timingLog (str): optional file every stage record is appended
+            to as a JSON line, turns timings on; the COVID_TIMING_LOG
+            environment variable is used when not given
+            profile (str): optional folder receiving a profile of the
+            build, see Profiler; the COVID_PROFILE environment variable
+            is used when not given
+            quality (str): correction of negative daily counts, repeated
+            dates and other revisions of the cumulative counts, either
+            'leave', 'clip' or 'redistribute', see DataQuality
+
+        Attributes:
+            data (list): list of CSV files and URL links
+            firstdate (str): date generated from 'currmo' and 'curryear'
+            seconddate (str): date generated from 'lastmo' and 'lastyear'
+            datesDF (DataFrame): DataFrame storing COVID-19 data for one chosen state
+            allstats (list): list containing COVID-19 data that will be used for
+            Graph objects, read from 'result' when asked for
+            finalcases (list): list containing case rates for each US state
+            finaldeaths (list): list containing death rates for each US state
+            finaldates (list): list containing dates for each US state
+            finalstates (list): list containing each US state; the four
+            lists are read from 'series' when asked for, see seriesLists()
+            stateKey (str): abbreviation the object was created with,
+            kept as 'state' in every timing record while self.state
+            changes to the full name
+            timings (list): one dictionary per stage, see StageSpan
+            report (Report): statistics of the state, None until loaded
+            series (tuple): states, dates, cases and deaths arrays of
+            every state, see StatsResult.align()
+            result (StatsResult): everything Graph objects need, None
+            until loaded
+            loadData() (method): method where the script begins
+
+        Side effects:
+            after initialization, loadData() method is called to begin script
+        """
+
+        self.data = list(Stats.defaultData if data is None else data)
+        self.state = state
+        self.stateKey = state
+        self.currmo = currmo
+        self.lastmo = lastmo
+        self.curryear = curryear
+        self.lastyear = lastyear
+
+        self.firstdate = None
+        self.seconddate = None
+        self.datesDF = pd.DataFrame()
+
+        self.timingLog = timingLog if timingLog is not None else os.environ.get("COVID_TIMING_LOG")
+        self.timed = timings or self.timingLog is not None
+        self.timings = []
+        self.spans = []
+        self.profile = profile if profile is not None else os.environ.get("COVID_PROFILE")
+        self.offline = offline
+        self.verbose = verbose
+        self.quality = quality
+        self.report = None
+        self.result = None
+        self.series = None
+        started = self.timed and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            name = "stats_%s_%02d-%02d_%02d-%02d" % (state, lastmo, lastyear, currmo, curryear)
+            with Profiler.wrap(self.profile, name):
+                self.loadData()
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    @property
+    def allstats(self):
+        """Positional list of 'result' Graph objects were first built
+        from, empty until the Stats object is loaded"""
+
+        if self.result is None:
+            return []
+        result = self.result
+
+        return [result.state, self.seriesLists(), result.allStatesDF, result.stateDF, result.datesDF,
+                result.countedMonths, result.totalVax, result.period]
+
+    @property
+    def finalcases(self):
+        """Daily cases of every state, see seriesLists()"""
+
+        return self.seriesLists()[0]
+
+    @property
+    def finaldeaths(self):
+        """Daily deaths of every state, see seriesLists()"""
+
+        return self.seriesLists()[1]
+
+    @property
+    def finaldates(self):
+        """Reported dates of every state, see seriesLists()"""
+
+        return self.seriesLists()[2]
+
+    @property
+    def finalstates(self):
+        """Name of every state, see seriesLists()"""
+
+        return self.seriesLists()[3]
+
+    def seriesLists(self):
+        """Method that lays self.series out as one list per state, the
+        way Stats objects used to keep it
+
+        Returns:
+            lists (tuple):  daily cases and deaths as floats and
+            'YYYY-MM-DD' dates of the days every state reported, and the
+            name of every state, see StatsResult.align(); empty lists
+            until self.startProgram() has run
+        """
+
+        if self.series is None:
+            return [], [], [], []
+        states, dates, cases, deaths = self.series
+        reported = ~np.isnan(cases)
+
+        return ([row[keep].tolist() for row, keep in zip(cases, reported)],
+                [row[keep].tolist() for row, keep in zip(deaths, reported)],
+                [dates[keep].astype(str).tolist() for keep in reported],
+                states.tolist())
+
+    def span(self, stage):
+        """Method that opens a timed stage
+
+        Args:
+            stage (str):  name of the stage
+
+        Returns:
+            span (StageSpan):  context manager recording the stage, or a
+            shared no-op when timings are turned off
+        """
+
+        if not self.timed:
+            return NULLSPAN
+
+        return StageSpan(self, stage)
+
+    def timingReport(self):
+        """Generates a DataFrame of every recorded stage
+
+        Returns:
+            timingDF (DataFrame):  one row per stage in the order they
+            finished; nested stages have a larger 'depth'
+        """
+
+        return pd.DataFrame(self.timings, columns=['state','stage','depth','wall','cpu','rows','peak_kib'])
+
+    def vax(self):
+        """Generates a DataFrame object displaying vaccinations rates per state.
+
+        Side effects:
+            makes a request to an API and creates a DataFrame object, 
+            loads DataFrame from local computer, saves DataFrame to local computer;
+            when self.offline is True, the latest saved file is loaded instead,
+            see self.latestVax()
+
+        Raises:
+            general exception which checks if a file exists and if it can be read,
+            exception prints a message to the console and allows the method to continue 
+            and generate a new DataFrame
+            FileNotFoundError when self.offline is True and no file was saved
+
+        Returns:
+            popvaxxed (DataFrame):  contains the name and abbreviations of 
+            each state, fully vaccinated numbers and percentages of vaccination 
+            rates, current population per rate
+            totalvaxx (float):  percent of fully vaccinated per state, the sum 
+            of fully_vaccinated divided by the sum of curr_pop
+        """
+
+        today = datetime.date.today().isoformat()
+
+        try:
+            popvaxxed = pd.read_csv(today+"_"+"popvaxxed.csv")
+            totalvaxx=popvaxxed['fully_vaccinated'].astype('int64').sum()/popvaxxed['curr_pop'].sum()
+            return popvaxxed, totalvaxx
+        except:
+            if self.offline:
+                popvaxxed = pd.read_csv(self.latestVax())
+                totalvaxx=popvaxxed['fully_vaccinated'].astype('int64').sum()/popvaxxed['curr_pop'].sum()
+                return popvaxxed, totalvaxx
+            print("Grabbing latest vaccination data...")
+
+        pop2=pd.read_csv(self.data[1])
+        vaxxURL=self.data[3]
+        CDCdata=requests.get(vaxxURL)
+        statesvaxx=pd.DataFrame.from_records(data=CDCdata.json())
+        statesvaxx=statesvaxx[['date','location','series_complete_yes']]
+        statesvaxx.columns=['date','location','fully_vaccinated']
+        statesvaxx.loc[:,'date']=statesvaxx['date'].apply(lambda x: 
+                                                          datetime.datetime.strptime(
+                                                              x,'%Y-%m-%dT%H:%M:%S.000'
+                                                          ).strftime('%Y-%m-%d'))
+        statesvaxx.loc[:,'day']=statesvaxx['date'].apply(lambda x: 
+                                                         datetime.datetime.strptime(
+                                                             x,'%Y-%m-%d').strftime('%d'))
+        statesvaxx=statesvaxx.groupby('location')['fully_vaccinated'].agg('last').reset_index()
+        statesvaxx=statesvaxx[(statesvaxx['location']!='AS') 
+                              & (statesvaxx['location']!='BP2') 
+                              & (statesvaxx['location']!='DD2') 
+                              & (statesvaxx['location']!='FM') 
+                              & (statesvaxx['location']!='GU') 
+                              & (statesvaxx['location']!='IH2') 
+                              & (statesvaxx['location']!='LTC') 
+                              & (statesvaxx['location']!='MP')
+                              & (statesvaxx['location']!='PW')
+                              & (statesvaxx['location']!='RP') 
+                              & (statesvaxx['location']!='US') 
+                              & (statesvaxx['location']!='VA2') 
+                              & (statesvaxx['location']!='VI')].reset_index(drop=True)
+        pop2.columns=['SUMLEV', 'REGION', 'DIVISION', 'state', 'name', 'CENSUS2010POP',
+               'ESTIMATESBASE2010', 'POPESTIMATE2010', 'POPESTIMATE2011',
+               'POPESTIMATE2012', 'POPESTIMATE2013', 'POPESTIMATE2014',
+               'POPESTIMATE2015', 'POPESTIMATE2016', 'POPESTIMATE2017',
+               'POPESTIMATE2018', 'POPESTIMATE2019', 'POPESTIMATE042020',
+               'pop2020']
+        pop2=pop2[['name','pop2020']].iloc[[5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21
+                                            ,22,23,24,25,26,27,28,29,30,31,32,33,34,35,36
+                                            ,37,38,39,40,41,42,43,56,44,45,46,47,48,49,50
+                                            ,51,52,53,54,55]].reset_index(drop=True)
+        pop2=pop2.iloc[[1,0,3,2,4,5,6,8,7,9,10,11,15,12,13,14,16,17,18,21,20,19,22,23,25
+                        ,24,26,33,34,27,29,30,31,28,32,35,36,37,38,39,40,41,42,43,44,45
+                        ,47,46,48,50,49,51]].reset_index(drop=True)
+        statesvaxx=statesvaxx.drop([22]).reset_index(drop=True)
+        popvaxxed=pd.concat([statesvaxx,pop2],axis=1)
+        popvaxxed.columns=['abbr','fully_vaccinated','full_name','curr_pop']
+        popvaxxed.loc[:,'percent']=round((popvaxxed['fully_vaccinated']
+                                          .astype('int64')/popvaxxed['curr_pop'])*100,2)
+        totalvaxx=popvaxxed['fully_vaccinated'].astype('int64').sum()/popvaxxed['curr_pop'].sum()
+        popvaxxed.to_csv(today+"_"+"popvaxxed.csv",index=False)
+
+        return popvaxxed, totalvaxx
+
+    def latestVax(self):
+        """Method that finds the most recent vaccination file saved by
+        self.vax(), used when working offline
+
+        Dated files in the working directory or next to the population
+        file are preferred, then the 'popvaxxed.csv' bundled with the
+        population file.
+
+        Raises:
+            FileNotFoundError when no vaccination file was found
+
+        Returns:
+            path (str):  location of the vaccination file
+        """
+
+        folders = ['.', os.path.dirname(self.data[1]) or '.']
+        dated = []
+        for folder in folders:
+            for name in os.listdir(folder):
+                if name.endswith("_popvaxxed.csv") and name[:4].isdigit():
+                    dated.append((name, os.path.join(folder, name)))
+        if dated:
+            return max(dated)[1]
+
+        for folder in folders:
+            path = os.path.join(folder, "popvaxxed.csv")
+            if os.path.isfile(path):
+                return path
+
+        raise FileNotFoundError("no saved vaccination data found for offline use")
+
+    def all_time(self):
+        """Generates a DataFrame object that contains the latest 
+        aggregated COVID-19 data
+
+        Side effects:
+            loads DataFrame from local computer, saves DataFrame to local computer,
+        
+        Raises:
+            general exception which checks if a file exists and if it can be read, 
+            exception prints a message to the console and allows the method to continue 
+            and generate a new DataFrame
+
+        Returns:
+            bothDF (DataFrame):  contains aggregated data which includes 
+            recorded cases, deaths, population in the latest year, people
+            per square mile, total square miles, case fatality, and incidence
+            rates per state, organized by latest date available; the
+            incidence rate divides the cases of every year by the
+            population of that year, see self.populationTable(); the
+            counts are corrected by the 'quality' policy, see
+            DataQuality, and saved to one file per policy
+        """
+
+        today = datetime.date.today().isoformat()
+        file = today+"_"+("bothDF.csv" if self.quality == 'leave' else "bothDF_"+self.quality+".csv")
+
+        try:
+            bothDF = pd.read_csv(file)
+            return bothDF
+        except:
+            print("Grabbing all state COVID-19 data...")
+
+        df=pd.read_csv(self.data[0])
+        df=DataQuality(df).correct(self.quality)
+        df.loc[:,'day']=df['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%d'))
+        df.loc[:,'month']=df['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%m'))
+        df.loc[:,'year']=df['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%y'))
+        df=df[['date','state','cases','deaths','day','month','year']]
+        df['day']=df['day'].astype('int64')
+        df['month']=df['month'].astype('int64')
+        df['year']=df['year'].astype('int64')
+        populations=self.populationTable()
+        bothDF=df.groupby('state')[['cases','deaths','day','month','year']].agg('last').reset_index()
+        bothDF.loc[:,'population']=populations.lookup(bothDF['state'],2000+bothDF['year'])
+        states_sqmi=pd.read_csv(self.data[2])
+        bothDF=bothDF[bothDF['population'].notna()].merge(states_sqmi,left_on='state',right_on='states')
+        bothDF=bothDF[['state','cases','deaths','day','month','year','population','ppsm','sq_mi']]
+        # cases of every year divided by the population of that year
+        yearly=df.groupby(['state','year'])['cases'].agg('last').unstack().ffill(axis=1).fillna(0)
+        yearly=yearly.diff(axis=1).fillna(yearly)
+        perPerson=(yearly/populations.lookup(yearly.index.to_numpy()[:,None],
+                                             2000+yearly.columns.to_numpy()[None,:])).sum(axis=1)
+        bothDF.loc[:,'case_fatality']=round((bothDF['deaths']/bothDF['cases'])*100,3)
+        bothDF.loc[:,'incidence_rate']=round(bothDF['state'].map(perPerson)*100000,3)
+        bothDF.to_csv(file,index=False)
+
+        return bothDF
+
+    def dataKey(self):
+        """Method that names the data read by self.getDF()
+
+        Returns:
+            key (tuple):  date of the data, its daily CSV file and the
+            files of self.data, see Memo
+        """
+
+        today = datetime.date.today().isoformat()
+
+        return (today, os.path.abspath(today+"_"+"df.csv"), tuple(self.data))
+
+    def windowKey(self):
+        """Method that names the arrays built by self.startProgram()
+
+        Returns:
+            key (tuple):  self.dataKey() followed by the quality policy
+            and the window, see Memo
+        """
+
+        return self.dataKey()+(self.quality, self.lastmo, self.lastyear, self.currmo, self.curryear)
+
+    def getDF(self):
+        """Generates a DataFrame object used when beginning the script
+
+        Side effects:
+            loads DataFrame from local computer, saves DataFrame to local computer,
+            deletes DataFrame from local computer, prints messages to console
+
+        Raises:
+            general exception which checks if a file exists and if it can be read,
+            exception prints a message to the console and allows the method to continue 
+            and generate a new DataFrame
+
+        Returns:
+            df (DataFrame):  contains COVID-19 data for each US state which 
+            includes recorded cases, deaths, and total population per state, 
+            organized by first recorded date to most recent; the same
+            object is returned to every Stats object of the process for the
+            day, see Stats.frames
+        """
+
+        today = datetime.date.today().isoformat()
+        key = self.dataKey()
+        if key in Stats.frames:
+            return Stats.frames[key]
+
+        try:
+            df = pd.read_csv(today+"_"+"df.csv")
+            Stats.frames[key] = df
+            return df
+        except:
+            #file = today+"_"+"df.csv"
+            #if(os.path.exists(file) and os.path.isfile(file)):
+            #    os.remove(file)
+            #    print(today+"_"+"df.csv"+" deleted.")
+            #    print("Grabbing latest COVID-19 information.")
+            #else:
+            #    print("Remember to pull latest updates from GitHub, grabbing + "
+            #          "latest COVID-19 information.")
+            print("Remember to pull latest updates from GitHub, grabbing latest COVID-19 information.")
+
+        df=pd.read_csv(self.data[0])
+        pop=pd.read_csv(self.data[1])
+        pop.columns=['SUMLEV', 'REGION', 'DIVISION', 'STATE', 'NAME', 'CENSUS2010POP',
+               'ESTIMATESBASE2010', '2010', '2011',
+               '2012', '2013', '2014',
+               '2015', '2016', '2017',
+               '2018', '2019', '042020',
+               'POP2020']
+        pop=pop[pop['SUMLEV'].astype('int64') == 40][['NAME','POP2020']].reset_index(drop=True)
+        pop.columns=['state','POP2020']
+        sqmi=pd.read_csv(self.data[2])
+        df.loc[:,'day']=df['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%d'))
+        df.loc[:,'month']=df['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%m'))
+        df.loc[:,'year']=df['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%y'))
+        df=df[['date','state','cases','deaths','day','month','year']]
+        df['day']=df['day'].astype('int64')
+        df['month']=df['month'].astype('int64')
+        df['year']=df['year'].astype('int64')
+        df=df.merge(pop)
+        abbr=pd.read_csv(self.data[4])
+        df=df.merge(abbr, left_on='state',right_on='full_name')
+
+        df.to_csv(today+"_"+"df.csv",index=False)
+        Stats.frames[key] = df
+
+        return df
+
+    def calculateDF(self, df, state):
+        """Generates DataFrame objects using information provided by
+        the user
+
+        Args:
+            df (DataFrame):  DataFrame object with information needed to 
+            generate a new DataFrame
+            state (str):  name of US state used as a filter to gather
+            relevant information
+
+        Side effects:
+            if date validation fails, a message is printed to the console
+            and the method returns None
+
+        Attributes:
+            self.lastyear, self.curryear, self.lastmo, and self.currmo 
+            are referenced to obtain new DataFrame objects
+
+        Returns:
+            firstdf (DataFrame):  DataFrame is constructed and organized 
+            by name for each US state and the dates provided by the user
+        """
+
+        yearCount = []
+        yearNum = self.lastyear
+        moNum = self.lastmo
+        countNum = 0
+
+        if self.curryear == self.lastyear:
+            if self.currmo == self.lastmo:
+                firstdf = df[(df['state'] == state) & (df['month'] == self.currmo) & (df['year'] == self.curryear)]
+
+            elif self.currmo > self.lastmo:
+                
+                firstdf = df[(df['state'] == state) & (df['month'] <= self.currmo) & (df['month'] >=self.lastmo) & (df['year'] == self.lastyear)]
+
+            else:
+                print("'lastmo' cannot be greater than 'currmo'.")
+                return None
+
+        elif self.curryear > self.lastyear:
+            if self.currmo == self.lastmo:
+                while yearNum < self.curryear+1:
+                    if countNum == 0:
+                        if self.lastmo == 12:
+                            yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum) & (df['month'] == self.lastmo)])
+                        else:
+                            yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum) & (df['month'] >= self.lastmo)])
+                    else:
+                        yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum)])
+                    yearNum += 1
+                    countNum += 1
+
+                yearCount[-1] = df[(df['state'] == state) & (df['year'] == self.curryear) & (df['month'] <= self.currmo)]
+
+                countNum = 1
+                firstdf = yearCount[0]
+
+                for dfs in yearCount:
+                    if countNum >= len(yearCount):
+                        break
+                    firstdf = firstdf.append(yearCount[countNum])
+                    countNum += 1
+
+            elif self.currmo < self.lastmo:
+                while yearNum < self.curryear+1:
+                    if countNum == 0:
+                        if self.lastmo == 12:
+                            yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum) & (df['month'] == self.lastmo)])
+                        else:
+                            yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum) & (df['month'] >= self.lastmo)])
+                    else:
+                        yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum)])
+                    yearNum += 1
+                    countNum += 1
+
+                yearCount[-1] = df[(df['state'] == state) & (df['year'] == self.curryear) & (df['month'] <= self.currmo)]
+
+                countNum = 1
+                firstdf = yearCount[0]
+
+                for dfs in yearCount:
+                    if countNum >= len(yearCount):
+                        break
+                    firstdf = firstdf.append(yearCount[countNum])
+                    countNum += 1
+
+            else:
+                while yearNum < self.curryear+1:
+                    if countNum == 0:
+                        yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum) & (df['month'] >= self.lastmo)])
+                    else:
+                        yearCount.append(df[(df['state'] == state) & (df['year'] == yearNum)])
+
+                    yearNum += 1
+                    countNum += 1
+                    
+                countNum = 1
+                yearCount[-1] = df[(df['state'] == state) & (df['year'] == self.curryear) & (df['month'] <= self.currmo)]
+                
+                countNum = 1
+                firstdf = yearCount[0]
+
+                for dfs in yearCount:
+                    if countNum >= len(yearCount):
+                        break
+                    firstdf = firstdf.append(yearCount[countNum])
+                    countNum += 1
+
+        else:
+            print("'lastyear' cannot be greater than 'curryear'.")
+            return None
+
+        return firstdf
+    
+    def calculateMonths(self):
+        """Generates a list object containing values which represent
+        each month found in current DataFrame object
+
+        Side effects:
+            if date validation fails, a message is printed to the console
+            and the method returns None
+            
+        Attributes:
+            self.lastyear, self.curryear, self.lastmo, and self.currmo 
+            are referenced to obtain new DataFrame objects
+
+        Returns:
+            getMonths (list):  contains integer values representing 
+            each month to be used for visualization for Graph objects
+        """
+
+        yearCount = []
+        getMonths = []
+        yearNum = self.lastyear
+        moNum = self.lastmo
+        countNum = 0
+        findDF = pd.DataFrame()
+        
+        if self.curryear == self.lastyear:
+            if self.currmo == self.lastmo:
+                getMonths.append(moNum)
+
+            elif self.currmo > self.lastmo:
+                if self.currmo == 12:
+                    findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] >= moNum)]
+                else:
+                    findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] >= moNum) & (self.datesDF['month'] <= self.currmo)]
+                for num in findDF['month'].unique().tolist():
+                    getMonths.append(num)
+
+            else:
+                print("'lastmo' cannot be greater than 'currmo'.")
+                return None
+
+        elif self.curryear > self.lastyear:
+            if self.currmo == self.lastmo:
+                while yearNum < self.curryear+1:
+                    if countNum == 0:
+                        if self.lastmo == 12:
+                            findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] == self.lastmo)]
+                            for num in findDF['month'].unique().tolist():
+                                getMonths.append(num)
+
+                        else:
+                            findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] >= self.lastmo)]
+                            for num in findDF['month'].unique().tolist():
+                                getMonths.append(num)
+
+                    else:
+                        findDF = self.datesDF[self.datesDF['year'] == yearNum]
+                        for num in findDF['month'].unique().tolist():
+                            getMonths.append(num)
+
+                    getMonths.append(yearNum)
+                    yearNum += 1
+                    countNum += 1
+
+            elif self.currmo < self.lastmo:
+                while yearNum < self.curryear+1:
+                    if countNum == 0:
+                        if self.lastmo == 12:
+                            findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] == self.lastmo)]
+                            for num in findDF['month'].unique().tolist():
+                                getMonths.append(num)
+
+                        else:
+                            findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] >= self.lastmo)]
+                            for num in findDF['month'].unique().tolist():
+                                getMonths.append(num)
+
+                    else:
+                        findDF = self.datesDF[self.datesDF['year'] == yearNum]
+                        for num in findDF['month'].unique().tolist():
+                            getMonths.append(num)
+
+                    getMonths.append(yearNum)
+                    yearNum += 1
+                    countNum += 1
+
+            else:
+                while yearNum < self.curryear+1:
+                    if countNum == 0:
+                        findDF = self.datesDF[(self.datesDF['year'] == yearNum) & (self.datesDF['month'] >= self.lastmo)]
+                        for num in findDF['month'].unique().tolist():
+                            getMonths.append(num)
+
+                    else:
+                        findDF = self.datesDF[self.datesDF['year'] == yearNum]
+                        for num in findDF['month'].unique().tolist():
+                            getMonths.append(num)
+
+                    getMonths.append(yearNum)
+                    yearNum += 1
+                    countNum += 1
+
+        else:
+            print("'lastyear' cannot be greater than 'curryear'.")
+            return None
+
+        return getMonths
+
+    def startProgram(self):
+        """Method that organizes DataFrames for each US state and calculates
+        death and case rates
+
+        Side effects:
+            if date validation fails, a message is printed to the console
+            and the method returns None
+            self.getDF() is called to obtain a DataFrame object,
+            corrected by self.cleanDF()
+            self.calculateDF() is called to construct DataFrame objects
+            to be used for graphing
+
+        Attributes:
+            self.series is set to the daily cases and deaths of every
+            state, used for visualization with Graph objects
+            self.allstates and self.state are referenced to obtain values
+            the arrays of every state only depend on the data and the
+            dates, so they are kept in Stats.windows and reused by later
+            Stats objects with the same data and dates
+        """
+
+        finalcases = []
+        finaldeaths = []
+        finaldates = []
+        finalstates = []
+        with self.span('getDF') as span:
+            newDF = self.getDF()
+            span.rows = len(newDF)
+        with self.span('quality') as span:
+            newDF = self.cleanDF()
+            span.rows = len(newDF)
+        self.allstates = newDF['state'].unique().tolist()
+        self.state = newDF[newDF['abbr'] == self.state].iloc[0]['state']
+        getfirstDF = pd.DataFrame()
+
+        window = self.windowKey()
+        if window in Stats.windows:
+            self.series = Stats.windows[window]
+            return None
+
+        for sts in self.allstates:
+            while True:
+                try:
+                    if self.lastyear > 20:
+                        if self.lastmo == 1:
+                            getfirstDF = newDF[(newDF['state']==sts) & (newDF['month'] == 12) & (newDF['year'] == self.lastyear-1)].iloc[-1]
+                        else:
+                            getfirstDF = newDF[(newDF['state']==sts) & (newDF['month'] == self.lastmo-1) & (newDF['year'] == self.lastyear)].iloc[-1]
+                    else:
+                        if self.lastmo != 1:
+                            getfirstDF = newDF[(newDF['state']==sts) & (newDF['month'] == self.lastmo-1) & (newDF['year'] == self.lastyear)].iloc[-1]
+
+                except Exception as e:
+                    print("error: ",e)
+                    break
+                break
+
+            if self.curryear == self.lastyear:
+                if self.currmo == self.lastmo:
+                    if len(getfirstDF) < 1:
+                        statsDF = self.calculateDF(newDF,sts)
+                        statsDF = statsDF.reset_index(drop=True)
+                    else:
+                        statsDF = self.calculateDF(newDF,sts)
+                        statsDF = statsDF.append(getfirstDF).reset_index(drop=True)
+
+                elif self.currmo > self.lastmo:
+                    if len(getfirstDF) < 1:
+                        statsDF = self.calculateDF(newDF,sts)
+                        statsDF = statsDF.reset_index(drop=True)
+                    else:
+                        statsDF = self.calculateDF(newDF,sts)
+                        statsDF = statsDF.append(getfirstDF).reset_index(drop=True)
+                else:
+                    print("'lastmo' cannot be greater than 'currmo'.")
+                    return None
+
+            elif self.curryear > self.lastyear:
+                if self.currmo == self.lastmo:
+                    if len(getfirstDF) < 1:
+                        statsDF = self.calculateDF(newDF,sts)
+                        statsDF = statsDF.reset_index(drop=True)
+                    else:
+                        statsDF = self.calculateDF(newDF,sts)
+                        statsDF = statsDF.append(getfirstDF).reset_index(drop=True)
+
+                elif self.currmo < self.lastmo:
+                    if len(getfirstDF) < 1:
+                        statsDF = self.calculateDF(newDF,sts)
+                        statsDF = statsDF.reset_index(drop=True)
+                    else:
+                        statsDF = self.calculateDF(newDF, sts)
+                        statsDF = statsDF.append(getfirstDF).reset_index(drop=True)
+                else:
+                    if len(getfirstDF) < 1:
+                        statsDF = self.calculateDF(newDF,sts)
+                        statsDF = statsDF.reset_index(drop=True)
+                    else:
+                        statsDF = self.calculateDF(newDF,sts)
+                        statsDF = statsDF.append(getfirstDF).reset_index(drop=True)
+
+            else:
+                print("'lastyear' cannot be greater than 'curryear'.")
+                return None
+
+            if len(statsDF) == 0:
+                statsDF = newDF.copy(deep=False)
+                continue
+
+            counts = statsDF[['cases','deaths']].to_numpy()
+            dates = statsDF['date'].to_numpy()
+            if len(getfirstDF) >= 1:
+                # the last row is the day before the window, appended above
+                daily = np.diff(counts, axis=0)
+                daily = np.concatenate([counts[:1]-counts[-1], daily[:-1]])
+                dates = dates[:-1]
+            else:
+                daily = np.diff(counts, axis=0, prepend=np.zeros((1, 2), dtype=counts.dtype))
+
+            finalcases.append(daily[:,0])
+            finaldeaths.append(daily[:,1])
+            finaldates.append(dates)
+            finalstates.append(sts)
+            statsDF = newDF.copy(deep=False)
+
+        self.series = StatsResult.align(finalcases, finaldeaths, finaldates, finalstates)
+        Stats.windows[window] = self.series
+
+        return None
+
+    def dataQuality(self):
+        """Method that checks the cumulative counts of every state for
+        repeated dates, missing days, negative daily counts and counts
+        that are not monotonic, see DataQuality
+
+        Returns:
+            quality (DataQuality):  checks of self.getDF(), run once per
+            DataFrame; summary() gives the counts of every state
+        """
+
+        return DataQuality.of(self.getDF(), self.dataKey())
+
+    def cleanDF(self):
+        """Method that returns self.getDF() corrected by the 'quality'
+        policy, see DataQuality.correct()
+
+        Returns:
+            df (DataFrame):  self.getDF() itself for 'leave', otherwise
+            the same corrected copy for every Stats object with the same
+            policy
+        """
+
+        if self.quality == 'leave':
+            return self.getDF()
+
+        return self.dataQuality().correct(self.quality)
+
+    def rollup(self, store=None):
+        """Method that rolls the daily data of every state up to census
+        divisions, regions and the country, see Rollup
+
+        Args:
+            store (CountyStore):  optional county store adding the county
+            level
+
+        Returns:
+            rollup (Rollup):  every level over every date; the same object
+            is returned to every Stats object using the same DataFrame,
+            see Stats.rollups
+        """
+
+        key = self.dataKey()+(self.quality, os.path.abspath(self.data[1]),
+                              None if store is None else os.path.abspath(store.directory))
+
+        return Stats.rollups.fetch(key, lambda: Rollup.fromFrame(self.cleanDF(), self.data[1],
+                                                                 self.populationTable(), store))
+
+    def sweep(self, level='state'):
+        """Method that computes the statistics of every state for every
+        pair of first and last month, see Rollup.sweep()
+
+        Returns:
+            sweep (WindowSweep):  every month pair of the data
+        """
+
+        return self.rollup().sweep(level)
+
+    def populationTable(self):
+        """Method that reads the population of every state by year
+
+        The population file of self.data is read together with
+        'nst-est2021.csv' when it sits in the same folder.
+
+        Returns:
+            populations (Populations):  population of every state by
+            year; the same object is returned to every Stats object
+            using the same files, see Stats.populations
+        """
+
+        files = [os.path.abspath(self.data[1])]
+        later = os.path.join(os.path.dirname(files[0]), "nst-est2021.csv")
+        if os.path.isfile(later) and later != files[0]:
+            files.append(later)
+        key = tuple(files)
+        if key not in Stats.populations:
+            Stats.populations[key] = Populations.fromFiles(files)
+
+        return Stats.populations[key]
+
+    def rollingRank(self, feat='cases', window=7, perCapita=True):
+        """Method that ranks every state by its latest moving average,
+        see StatsResult.rollingRank()
+
+        Returns:
+            rankDF (DataFrame):  one row per state, highest first, None
+            before the data is loaded
+        """
+
+        if self.result is None:
+            return None
+
+        return self.result.rollingRank(feat, window, perCapita)
+
+    def checkParameters(self):
+        """Method that validates user entry of Stats object parameters
+
+        Side effects:
+            if date validation fails, a message is printed to the console
+            and the method returns None
+
+        Attributes:
+            self.currmo, self.lastmo, self.curryear, self.lastyear are 
+            referenced for date validation
+
+        Returns:
+            check (bool):  a default value of True is returned if date validation
+            passes each conditional, otherwise a value of None is returned
+        """
+
+        check = True
+        if self.quality not in DataQuality.policies:
+            print("'quality' must be 'leave', 'clip' or 'redistribute'.")
+            return None
+
+        latestMonth = datetime.date.today().isoformat()
+        latestMonth = int(latestMonth[5:7])
+        latestYear = datetime.date.today().isoformat()
+        latestYear = int(latestYear[2:4])
+
+        if self.lastmo < 1 or self.currmo < 1:
+            print("Enter a valid month.")
+            return None
+        
+        if self.lastmo > 12 or self.currmo > 12:
+            print("Enter a valid month.")
+            return None
+        
+        if self.lastyear < 20 or self.curryear < 20:
+            print("Enter valid year.")
+            return None
+
+        if self.lastyear > latestYear or self.curryear > latestYear:
+            print("Enter valid year.")
+            return None
+        
+        if self.curryear == 22 and self.currmo > latestMonth:
+            print("Enter valid month for current year.")
+            return None
+
+        if self.curryear == self.lastyear:
+            if self.currmo == self.lastmo:
+                return check
+            elif self.currmo > self.lastmo:
+                return check
+            else:
+                print("'lastmo' cannot be greater than 'currmo'.")
+                return None
+
+        elif self.curryear > self.lastyear:
+            if self.currmo == self.lastmo:
+                return check
+            elif self.currmo < self.lastmo:
+                return check
+            else:
+                return check
+
+        else:
+            print("'lastyear' cannot be greater than 'curryear'.")
+            return None
+
+        return check
+    
+    def monthlyStats(self):
+        """Method that collects DataFrame information organized by month
+
+        Side effects:
+            if date validation fails, a message is printed to the console
+            and the method returns None
+            self.CalculateMonths() is called to obtain a list of values
+
+        Attributes:
+            self.datesDF is referenced to obtain values
+
+        Returns:
+            countedMonths (list):  contains four values; first is the 
+            current month being evaluated, second is the sum of COVID-19 
+            deaths for that month, third is the sum of COVID-19 cases, 
+            fourth is the average number of deaths, fifth is the average 
+            number of cases
+        """
+
+        countedMonths = []
+        checkYear = self.lastyear
+        getMonths = self.calculateMonths()
+        count = 0
+
+        if self.curryear == self.lastyear:
+            if self.currmo == self.lastmo:
+
+                newStatsDF = self.datesDF[(self.datesDF['month'] == getMonths[0]) & (self.datesDF['year'] == self.lastyear)]
+                firstdate = self.datesDF[['date','month','year']]
+                firstdate = firstdate[(firstdate['month'] == getMonths[0]) & (firstdate['year'] == self.lastyear)].iloc[0]['date']
+
+                countedMonths.append((firstdate,round(newStatsDF['deaths'].sum(),2),
+                                      round(newStatsDF['cases'].sum(),2),
+                                      round(newStatsDF['deaths'].sum()/len(newStatsDF['deaths']),2),
+                                      round(newStatsDF['cases'].sum()/len(newStatsDF['cases']),2)))
+
+            elif self.currmo > self.lastmo:
+
+                while count < len(getMonths):
+                    newStatsDF = self.datesDF[(self.datesDF['month'] == getMonths[count]) & (self.datesDF['year'] == checkYear)]
+                    firstdate = self.datesDF[['date','month','year']]
+                    firstdate = firstdate[(firstdate['month'] == getMonths[count]) & (firstdate['year'] == checkYear)].iloc[0]['date']
+
+                    countedMonths.append((firstdate,round(newStatsDF['deaths'].sum(),2),
+                                          round(newStatsDF['cases'].sum(),2),
+                                          round(newStatsDF['deaths'].sum()/len(newStatsDF['deaths']),2),
+                                          round(newStatsDF['cases'].sum()/len(newStatsDF['cases']),2)))
+                    count += 1
+
+            else:
+                print("'lastmo' cannot be greater than 'currmo'.")
+                return None
+
+        elif self.curryear > self.lastyear:
+
+            if self.currmo == self.lastmo:
+
+                while count < len(getMonths):
+                    if getMonths[count] == checkYear:
+                        checkYear += 1
+                        count += 1
+                        continue
+                    else:
+                        newStatsDF = self.datesDF[(self.datesDF['month'] == getMonths[count]) & (self.datesDF['year'] == checkYear)]
+                        firstdate = self.datesDF[['date','month','year']]
+                        firstdate = firstdate[(firstdate['month'] == getMonths[count]) & (firstdate['year'] == checkYear)].iloc[0]['date']
+
+                        countedMonths.append((firstdate,round(newStatsDF['deaths'].sum(),2),
+                                              round(newStatsDF['cases'].sum(),2),
+                                              round(newStatsDF['deaths'].sum()/len(newStatsDF['deaths']),2),
+                                              round(newStatsDF['cases'].sum()/len(newStatsDF['cases']),2)))
+                    count += 1
+
+            elif self.currmo < self.lastmo:
+
+                while count < len(getMonths):
+                    if getMonths[count] == checkYear:
+                        checkYear += 1
+                        count += 1
+                        continue
+                    else:
+                        newStatsDF = self.datesDF[(self.datesDF['month'] == getMonths[count]) & (self.datesDF['year'] == checkYear)]
+                        firstdate = self.datesDF[['date','month','year']]
+                        firstdate = firstdate[(firstdate['month'] == getMonths[count]) & (firstdate['year'] == checkYear)].iloc[0]['date']
+
+                        countedMonths.append((firstdate,round(newStatsDF['deaths'].sum(),2),
+                                              round(newStatsDF['cases'].sum(),2),
+                                              round(newStatsDF['deaths'].sum()/len(newStatsDF['deaths']),2),
+                                              round(newStatsDF['cases'].sum()/len(newStatsDF['cases']),2)))
+                    count += 1
+
+            else:
+                while count < len(getMonths):
+                    if getMonths[count] == checkYear:
+                        checkYear += 1
+                        count += 1
+                        continue
+                    else:
+                        newStatsDF = self.datesDF[(self.datesDF['month'] == getMonths[count]) & (self.datesDF['year'] == checkYear)]
+                        firstdate = self.datesDF[['date','month','year']]
+                        firstdate = firstdate[(firstdate['month'] == getMonths[count]) & (firstdate['year'] == checkYear)].iloc[0]['date']
+
+                        countedMonths.append((firstdate,round(newStatsDF['deaths'].sum(),2),
+                                              round(newStatsDF['cases'].sum(),2),
+                                              round(newStatsDF['deaths'].sum()/len(newStatsDF['deaths']),2),
+                                              round(newStatsDF['cases'].sum()/len(newStatsDF['cases']),2)))
+                    count += 1
+
+        else:
+            print("'lastyear' cannot be greater than 'curryear'.")
+            return None
+
+        return countedMonths
+
+    def loadData(self):
+        """Method that collects data obtained from other methods and loads
+        them into lists to be used for visualization with Graph objects
+
+        Side effects:
+            self.checkParameters() is called for validation measures
+            self.startProgram() is called to begin obtaining information
+            for visualization using Graph objects
+            self.getDF() is called to obtain a new Stats class DataFrame 
+            object
+            self.vax() is called to obtain a DataFrame and float value 
+            containing vaccination information and US vaccination rate, 
+            respectively
+            self.all_time() is called to obtain a DataFrame which contains 
+            aggregated COVID-19 information
+            self.monthlyStats() is called to obtain COVID-19
+            information by month
+            statistics regarding the state chosen by user are stored in
+            self.report and, when self.verbose is True, printed at the
+            end of the method call
+
+        Attributes:
+            self.datesDF is referenced to store state information chosen 
+            by user
+            self.firstdate and self.seconddate are referenced to store 
+            dates
+            self.result is set to the objects used for visualization
+            with Graph objects
+
+        Returns:
+            None
+        """
+
+        if self.checkParameters() == None:
+            return None
+        else:
+            with self.span('startProgram') as span:
+                self.startProgram()
+                span.rows = 0 if self.series is None else np.count_nonzero(~np.isnan(self.series[2]))
+
+        if self.series is None:
+            print(f"{self.state} not found.")
+            return None
+
+        with self.span('rates') as span:
+            newDF = self.cleanDF()
+            # cases of every day divided by the population of its year
+            states, dates, cases, deaths = self.series
+            years = dates.astype('datetime64[Y]').astype('int64')+1970
+            perPerson = np.nansum(cases/self.populationTable().lookup(states[:,None], years[None,:]), axis=1)
+            reported = ~np.isnan(cases)
+            days = reported.sum(axis=1)
+            # sums of whole counts are kept whole, as in the data
+            caseSums = np.nansum(cases, axis=1).astype(newDF['cases'].dtype)
+            deathSums = np.nansum(deaths, axis=1).astype(newDF['deaths'].dtype)
+
+            row = np.flatnonzero(states == self.state)
+            if len(row) > 0:
+                keep = reported[row[0]]
+                self.datesDF = pd.DataFrame({'date':dates[keep].astype(str),
+                                             'cases':cases[row[0], keep].astype(newDF['cases'].dtype),
+                                             'deaths':deaths[row[0], keep].astype(newDF['deaths'].dtype)})
+
+            IRlst = [round(value, 3) for value in (perPerson*100000).tolist()] # IR stats
+            CFRlst = [round(value, 3) for value in (deathSums/caseSums*100).tolist()] # CFR stats
+            avgCases = [round(value, 2) for value in (caseSums/days).tolist()]
+            avgDeaths = [round(value, 2) for value in (deathSums/days).tolist()]
+            totalCases = caseSums.tolist()
+            totalDeaths = deathSums.tolist()
+            foundstates = states.tolist()
+            span.rows = len(newDF)
+
+        if len(self.datesDF) < 1:
+            print(f"{self.state} not found.")
+            return None
+
+        if int(self.datesDF.iloc[0]['date'][5:7]) != self.lastmo:
+            print("'self.lastmo' starting at "+str(int(self.datesDF.iloc[0]['date'][5:7]))+".")
+
+        with self.span('deathLag') as span:
+            deathLag = DeathLag.of(self.series, key=self.windowKey())
+            span.rows = len(deathLag.states)
+
+        allStatesDF = pd.DataFrame({'full_name':foundstates,
+                                    'total_cases':totalCases,'total_deaths':totalDeaths,
+                                    'avg_cases':avgCases,'avg_deaths':avgDeaths,
+                                    'cfr':CFRlst,'lag_cfr':deathLag.lagDF['lag_cfr'].to_numpy(),
+                                    'death_lag':deathLag.lags,'ir':IRlst})
+
+        self.datesDF.loc[:,'day']=self.datesDF['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%d'))
+        self.datesDF.loc[:,'month']=self.datesDF['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%m'))
+        self.datesDF.loc[:,'year']=self.datesDF['date'].apply(lambda x: datetime.datetime.strptime(x,'%Y-%m-%d').strftime('%y'))
+        self.datesDF=self.datesDF[['date','cases','deaths','day','month','year']]
+        self.datesDF['day']=self.datesDF['day'].astype('int64')
+        self.datesDF['month']=self.datesDF['month'].astype('int64')
+        self.datesDF['year']=self.datesDF['year'].astype('int64')
+
+        with self.span('vax') as span:
+            popvaxxed, totalVax = self.vax()
+            span.rows = len(popvaxxed)
+        allStatesDF = allStatesDF.merge(popvaxxed[['full_name','abbr','curr_pop','percent']],on='full_name')
+        self.firstdate=datetime.datetime.strptime(self.datesDF.iloc[0]['date'],'%Y-%m-%d').strftime("%B %d '%y")
+        self.seconddate=datetime.datetime.strptime(self.datesDF.iloc[-1]['date'],'%Y-%m-%d').strftime("%B %d '%y")
+
+        with self.span('all_time') as span:
+            allTime = self.all_time()
+            span.rows = len(allTime)
+        with self.span('monthlyStats') as span:
+            countedMonths = self.monthlyStats()
+            span.rows = len(self.datesDF)
+        allTime.columns = ['state', 'all_cases', 'all_deaths', 'day', 'month', 'year', 'population', 'ppsm',
+       'sq_mi', 'all_case', 'all_incidence']
+        allStatesDF = allStatesDF.merge(allTime[['state','all_cases','all_deaths',
+                                                 'ppsm','sq_mi','all_case','all_incidence']],
+                                                 left_on='full_name',right_on='state')
+        stateDF = allStatesDF[allStatesDF['full_name'] == self.state]
+
+        self.result = StatsResult(self.state, *self.series, allStatesDF, stateDF, self.datesDF,
+                                  countedMonths, totalVax, (self.firstdate,self.seconddate), self.windowKey(),
+                                  self.populationTable())
+
+        currYear = int(self.seconddate[-2:])
+        lastYear = int(self.firstdate[-2:])
+        if currYear == lastYear:
+            self.firstdate = self.firstdate[:-4]
+
+        with self.span('report'):
+            self.report = Report(self.state, allStatesDF, self.datesDF, countedMonths,
+                                 self.firstdate, self.seconddate)
+            if self.verbose:
+                for line in self.report.lines():
+                    display(line)
+                display(self.report.describe)
+
+        return None
@@ -0,0 +1,288 @@
+import numpy as np
+import pandas as pd
+import argparse
+import datetime
+import os
+
+""" Synthetic COVID-19 data in the New York Times format, for scale
+testing.  Writes 'us-states.csv' and, when counties are requested,
+'us-counties.csv' shaped like https://github.com/nytimes/covid-19-data,
+together with the population ('nst-est2020.csv'), area
+('states-sqmi20.csv') and abbreviation ('abbr.csv') tables Stats reads.
+Daily counts follow waves shared across the country, with weekday
+reporting dips, late starts, missing days and downward revisions, and are
+stored as cumulative totals.  The bundled states keep their names, codes
+and order, so the files can replace the real ones.  Larger inputs add
+copies of every state, e.g. 'Maryland 2', and counties inside each state,
+e.g.
+
+    python synthetic.py synthetic_data --copies 10 --counties 60 """
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+TERRITORIES = [('American Samoa', 'AS', 60, 49437, 77), ('Guam', 'GU', 66, 168801, 210),
+               ('Northern Mariana Islands', 'MP', 69, 57910, 182), ('Virgin Islands', 'VI', 78, 106290, 134)]
+
+# center (days after 2020-01-21), width (days) and height (daily cases
+# per 100k) of the national waves
+WAVES = [(80, 25, 10), (180, 30, 20), (340, 40, 60), (580, 35, 45),
+         (720, 25, 250), (900, 60, 35), (1050, 50, 25)]
+
+def baseStates(territories=True):
+    """Generates the table of real states and territories
+
+    Args:
+        territories (bool):  adds American Samoa, Guam, Northern Mariana
+        Islands and Virgin Islands when True
+
+    Returns:
+        states (DataFrame):  one row per state with name, abbreviation,
+        fips, region, division, population and square miles, in the
+        order of the bundled 'nst-est2020.csv'
+    """
+
+    pop = pd.read_csv(os.path.join(HERE, 'nst-est2020.csv'), dtype={'SUMLEV':str, 'REGION':str,
+                                                                     'DIVISION':str, 'STATE':str})
+    pop = pop[pop['SUMLEV'] == '040']
+    abbr = pd.read_csv(os.path.join(HERE, 'abbr.csv'))
+    sqmi = pd.read_csv(os.path.join(HERE, 'states-sqmi20.csv'))
+
+    states = pd.DataFrame({'name':pop['NAME'], 'fips':pop['STATE'].astype('int64'),
+                           'region':pop['REGION'], 'division':pop['DIVISION'],
+                           'pop':pop['POPESTIMATE2020'].astype('int64')})
+    states = states.merge(abbr, left_on='name', right_on='full_name').drop(columns='full_name')
+    states = states.merge(sqmi[['states','sq_mi']], left_on='name', right_on='states').drop(columns='states')
+
+    if territories:
+        extra = pd.DataFrame([{'name':name, 'abbr':ab, 'fips':fips, 'region':'X', 'division':'X',
+                               'pop':people, 'sq_mi':area} for name, ab, fips, people, area in TERRITORIES])
+        states = pd.concat([states, extra], ignore_index=True)
+
+    return states[['name','abbr','fips','region','division','pop','sq_mi']]
+
+def stateTable(copies=1, territories=True):
+    """Generates the table of every synthetic state
+
+    Args:
+        copies (int):  number of copies of every state, the first copy
+        keeps the real name
+        territories (bool):  see baseStates()
+
+    Returns:
+        states (DataFrame):  one row per state, see baseStates()
+    """
+
+    base = baseStates(territories)
+    frames = [base]
+    for copy in range(2, copies+1):
+        frames.append(base.assign(name=base['name']+" "+str(copy), abbr=base['abbr']+str(copy),
+                                  fips=base['fips']+100*(copy-1)))
+
+    return pd.concat(frames, ignore_index=True)
+
+def dailyCurves(pop, days, rng):
+    """Generates daily cases and deaths for many places at once
+
+    Args:
+        pop (numpy array):  population of every place
+        days (int):  number of days
+        rng (numpy Generator):  random numbers
+
+    Returns:
+        cases (numpy array):  [place, day] daily cases
+        deaths (numpy array):  [place, day] daily deaths
+    """
+
+    n = len(pop)
+    t = np.arange(days, dtype='float64')
+    rate = np.zeros((n, days))
+    for center, width, height in WAVES:
+        shift = rng.normal(0, width/3, size=(n, 1))
+        scale = rng.lognormal(0, 0.4, size=(n, 1))
+        rate += height*scale*np.exp(-0.5*((t-center-shift)/width)**2)
+
+    weekday = np.array([1.25, 1.1, 1.0, 1.0, 1.05, 0.6, 0.5])
+    rate *= weekday[(t.astype('int64')+1) % 7]
+    cases = rng.poisson(rate*pop[:, None]/100000).astype('int64')
+
+    lag = rng.integers(14, 24, size=n)
+    cfr = np.linspace(0.03, 0.004, days)*rng.lognormal(0, 0.25, size=(n, 1))
+    lagged = np.zeros_like(cases)
+    for num in range(n):
+        lagged[num, lag[num]:] = cases[num, :days-lag[num]]
+    deaths = rng.binomial(lagged, np.clip(cfr, 0, 1))
+
+    return cases, deaths
+
+def revise(cases, deaths, rate, rng):
+    """Adds downward revisions, the negative daily counts found in the
+    real data when earlier reports are corrected
+
+    Args:
+        cases (numpy array):  [place, day] daily cases
+        deaths (numpy array):  [place, day] daily deaths
+        rate (float):  chance of a revision on any day
+        rng (numpy Generator):  random numbers
+
+    Side effects:
+        cases and deaths are changed in place
+    """
+
+    for daily in (cases, deaths):
+        hits = rng.random(daily.shape) < rate
+        recent = np.maximum(np.cumsum(daily, axis=1)//50, 1)
+        daily[hits] = -rng.integers(1, recent[hits]+1)
+
+    return None
+
+def longFormat(names, fips, start, cases, deaths, gapRate, rng, county=None):
+    """Turns [place, day] daily counts into NYT rows of cumulative totals
+
+    Places start reporting once their first case is recorded, and some
+    days are missing.
+
+    Args:
+        names (numpy array):  state of every place
+        fips (numpy array):  fips code of every place
+        start (date):  first day
+        cases (numpy array):  [place, day] daily cases
+        deaths (numpy array):  [place, day] daily deaths
+        gapRate (float):  chance of a missing day
+        rng (numpy Generator):  random numbers
+        county (numpy array):  optional county of every place
+
+    Returns:
+        df (DataFrame):  rows sorted by date, then place
+    """
+
+    totalCases = np.cumsum(cases, axis=1)
+    totalDeaths = np.cumsum(deaths, axis=1)
+    keep = (totalCases > 0) & (rng.random(cases.shape) >= gapRate)
+    keep[:, -1] = totalCases[:, -1] > 0
+    day, place = np.nonzero(keep.T)
+
+    dates = pd.date_range(start, periods=cases.shape[1]).strftime('%Y-%m-%d').to_numpy()
+    columns = {'date':dates[day]}
+    if county is not None:
+        columns['county'] = county[place]
+    columns.update({'state':names[place], 'fips':fips[place],
+                    'cases':totalCases[place, day], 'deaths':totalDeaths[place, day]})
+
+    return pd.DataFrame(columns)
+
+def generate(directory, copies=1, counties=0, start='2020-01-21', end=None,
+             territories=True, gapRate=0.002, revisionRate=0.002, seed=0):
+    """Writes a full set of synthetic input files
+
+    Args:
+        directory (str):  folder the files are written to
+        copies (int):  number of copies of every state
+        counties (int):  counties per state, no county file when 0
+        start (str):  first date, 'YYYY-MM-DD'
+        end (str):  last date, yesterday by default
+        territories (bool):  see baseStates()
+        gapRate (float):  chance of a missing day per place
+        revisionRate (float):  chance of a downward revision per day
+        seed (int):  seed for the random numbers
+
+    Raises:
+        ValueError when 'counties' does not fit the three county digits
+        of a FIPS code
+
+    Side effects:
+        the files are written to directory, replacing any already there
+
+    Returns:
+        paths (dict):  path of every file written, keyed by file name
+    """
+
+    if counties > 999:
+        raise ValueError("at most 999 counties per state fit a FIPS code")
+
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    start = datetime.date.fromisoformat(start)
+    end = datetime.date.today()-datetime.timedelta(days=1) if end is None else datetime.date.fromisoformat(end)
+    days = (end-start).days+1
+
+    states = stateTable(copies, territories)
+    pop = states['pop'].to_numpy(dtype='float64')
+    paths = {}
+
+    if counties > 0:
+        share = rng.dirichlet(np.full(counties, 0.7), size=len(states))
+        countyPop = (share*pop[:, None]).ravel()
+        cases, deaths = dailyCurves(countyPop, days, rng)
+        stateCases = cases.reshape(len(states), counties, days).sum(axis=1)
+        stateDeaths = deaths.reshape(len(states), counties, days).sum(axis=1)
+        revise(cases, deaths, revisionRate, rng)
+
+        countyNames = np.array(["County %d" % (num+1) for num in range(counties)]*len(states), dtype=object)
+        countyFips = (states['fips'].to_numpy()[:, None]*1000+np.arange(counties)+1).ravel()
+        countyDF = longFormat(np.repeat(states['name'].to_numpy(), counties), countyFips, start,
+                              cases, deaths, gapRate, rng, county=countyNames)
+        paths['us-counties.csv'] = os.path.join(directory, 'us-counties.csv')
+        countyDF.to_csv(paths['us-counties.csv'], index=False)
+        del cases, deaths, countyDF
+
+        cases, deaths = stateCases, stateDeaths
+    else:
+        cases, deaths = dailyCurves(pop, days, rng)
+
+    revise(cases, deaths, revisionRate, rng)
+    statesDF = longFormat(states['name'].to_numpy(), states['fips'].to_numpy(), start,
+                          cases, deaths, gapRate, rng)
+    paths['us-states.csv'] = os.path.join(directory, 'us-states.csv')
+    statesDF.to_csv(paths['us-states.csv'], index=False)
+
+    real = pd.read_csv(os.path.join(HERE, 'nst-est2020.csv'), dtype=str)
+    header = real[real['SUMLEV'] != '040']
+    rows = pd.DataFrame({col:'' for col in real.columns}, index=states.index)
+    rows['SUMLEV'] = '040'
+    rows['REGION'] = states['region']
+    rows['DIVISION'] = states['division']
+    rows['STATE'] = states['fips'].map('{:02d}'.format)
+    rows['NAME'] = states['name']
+    for col in real.columns[5:]:
+        rows[col] = states['pop'].astype(str)
+    paths['nst-est2020.csv'] = os.path.join(directory, 'nst-est2020.csv')
+    pd.concat([header, rows], ignore_index=True).to_csv(paths['nst-est2020.csv'], index=False)
+
+    paths['states-sqmi20.csv'] = os.path.join(directory, 'states-sqmi20.csv')
+    pd.DataFrame({'states':states['name'], 'ppsm':(states['pop']/states['sq_mi']).round(2),
+                  'sq_mi':states['sq_mi']}).to_csv(paths['states-sqmi20.csv'], index=False)
+
+    paths['abbr.csv'] = os.path.join(directory, 'abbr.csv')
+    states[['abbr','name']].rename(columns={'name':'full_name'}).to_csv(paths['abbr.csv'], index=False)
+
+    return paths
+
+def main(argv=None):
+    """Writes the files picked on the command line, see generate()
+
+    Args:
+        argv (list):  command line arguments, sys.argv by default
+
+    Side effects:
+        the path of every file written is printed
+    """
+
+    parser = argparse.ArgumentParser(description="Writes synthetic COVID-19 data in the New York Times format.")
+    parser.add_argument('directory')
+    parser.add_argument('--copies', type=int, default=1, help="copies of every state")
+    parser.add_argument('--counties', type=int, default=0, help="counties per state, 0 skips us-counties.csv")
+    parser.add_argument('--start', default='2020-01-21')
+    parser.add_argument('--end', default=None, help="last date, yesterday by default")
+    parser.add_argument('--no-territories', action='store_true')
+    parser.add_argument('--gap-rate', type=float, default=0.002)
+    parser.add_argument('--revision-rate', type=float, default=0.002)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    paths = generate(args.directory, args.copies, args.counties, args.start, args.end,
+                     not args.no_territories, args.gap_rate, args.revision_rate, args.seed)
+    for name, path in paths.items():
+        print(name+": "+path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from covid_counties import CountyStore
+
+""" Checks that a CountyStore built from a county file gives back the
+totals and daily counts of the file, for counties with and without a
+FIPS code. """
+
+def counties(days=90, seed=0):
+    """Generates a 'us-counties.csv'-like DataFrame of a few counties, each
+    missing some days, with New York City and an unknown Maryland county
+    reported without a FIPS code
+
+    Args:
+        days (int):  number of days from 2021-01-01
+        seed (int):  seed for the random numbers
+
+    Returns:
+        df (DataFrame):  'date', 'county', 'state', 'fips', 'cases' and
+        'deaths', ordered by date like the New York Times file
+    """
+
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2021-01-01', periods=days).strftime('%Y-%m-%d')
+    places = [('Montgomery', 'Maryland', 24031), ('Howard', 'Maryland', 24027),
+              ('Albany', 'New York', 36001), ('New York City', 'New York', np.nan),
+              ('Unknown', 'Maryland', np.nan), ('Travis', 'Texas', 48453)]
+    frames = []
+    for county, state, fips in places:
+        keep = rng.random(days) > 0.1
+        keep[0] = True
+        if county == 'Travis':
+            # starts reporting after the first month
+            keep[:40] = False
+        frames.append(pd.DataFrame({'date':dates, 'county':county, 'state':state, 'fips':fips,
+                                    'cases':np.cumsum(rng.poisson(200, days)),
+                                    'deaths':np.cumsum(rng.poisson(3, days))})[keep])
+
+    return pd.concat(frames).sort_values('date', kind='stable').reset_index(drop=True)
+
+@pytest.fixture(scope='module')
+def store(tmp_path_factory):
+    """Store of counties() built in a temporary directory, read in small
+    chunks so counties span several of them"""
+
+    folder = tmp_path_factory.mktemp('counties')
+    path = str(folder/'us-counties.csv')
+    counties().to_csv(path, index=False)
+
+    return CountyStore.load(path, str(folder/'store'), chunksize=50)
+
+def fipsOf(store, county, state):
+    """Finds the code of a county, negative when it has no FIPS code"""
+
+    every = store.everyCounty()
+
+    return int(every['fips'][every['names'].index([county, state])])
+
+def test_totals_match_the_file(store):
+    df = counties()
+    window = store.window(2, 2, 21, 21)
+    countyDF = store.countyTable(window).set_index(['state', 'county'])
+
+    assert len(countyDF) == 6
+    for (state, county), reports in df.groupby(['state', 'county']):
+        before = reports[reports['date'] < '2021-02-01']
+        during = reports[(reports['date'] >= '2021-02-01') & (reports['date'] <= '2021-02-28')]
+        start = before.iloc[-1] if len(before) else {'cases':0, 'deaths':0}
+        row = countyDF.loc[(state, county)]
+        assert row['total_cases'] == during['cases'].iloc[-1]-start['cases']
+        assert row['total_deaths'] == during['deaths'].iloc[-1]-start['deaths']
+        assert row['days'] == len(during)
+
+    assert countyDF.loc[('New York', 'New York City'), 'fips'] < 0
+    assert countyDF.loc[('Maryland', 'Unknown'), 'fips'] < 0
+    marylandDF = store.countyTable(window, 'Maryland')
+    assert sorted(marylandDF['county']) == ['Howard', 'Montgomery', 'Unknown']
+    assert sorted(marylandDF['total_cases_state_rank']) == [1, 2, 3]
+
+@pytest.mark.parametrize("county, state", [('Howard', 'Maryland'), ('New York City', 'New York'),
+                                           ('Travis', 'Texas')])
+def test_daily_matches_the_file(store, county, state):
+    reports = counties()
+    reports = reports[(reports['county'] == county) & (reports['state'] == state)]
+    fips = fipsOf(store, county, state)
+
+    datesDF = store.daily(fips, store.window(3, 1, 21, 21))
+
+    assert datesDF['date'].tolist() == reports['date'].tolist()
+    assert datesDF['cases'].tolist() == np.diff(reports['cases'], prepend=0).tolist()
+    assert datesDF['deaths'].tolist() == np.diff(reports['deaths'], prepend=0).tolist()
+
+    report = store.report(fips, store.window(3, 2, 21, 21))
+    during = datesDF[datesDF['date'] >= '2021-02-01']
+    assert report.fips == fips
+    assert report.values['total_cases'] == during['cases'].sum()
+    assert report.days == len(during)
+
+def test_every_county_matches_the_partitions(store):
+    every = store.everyCounty()
+    column = 0
+    for code in store.manifest['partitions']:
+        part = store.partition(code)
+        count = len(part['fips'])
+        assert (every['fips'][column:column+count] == part['fips']).all()
+        assert every['names'][column:column+count] == part['names']
+        for name in ['cases', 'deaths', 'reported']:
+            assert (every[name][:, column:column+count] == part[name].T).all()
+        column += count
+
+    assert column == store.manifest['counties']
+    # counties without a FIPS code are filed under their state
+    assert (store.partition(36)['fips'] < 0).sum() == 1
+    assert (store.partition(24)['fips'] < 0).sum() == 1
+
+def test_load_rebuilds_only_a_changed_file(tmp_path):
+    path = str(tmp_path/'us-counties.csv')
+    directory = str(tmp_path/'store')
+    manifest = os.path.join(directory, "manifest.json")
+    counties().to_csv(path, index=False)
+    first = CountyStore.load(path, directory)
+    built = os.stat(manifest).st_mtime_ns
+
+    assert CountyStore.load(path, directory).manifest == first.manifest
+    assert os.stat(manifest).st_mtime_ns == built
+
+    counties(days=100).to_csv(path, index=False)
+    again = CountyStore.load(path, directory)
+    assert again.days == 100
+    with open(manifest) as f:
+        assert json.load(f)['source']['size'] == os.path.getsize(path)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+import covid_stats as cs
+import synthetic
+
+""" Checks of the DataQuality correction policies on cumulative counts
+that fall, go negative or fall to 0. """
+
+def frame(counts, feat='deaths'):
+    """Generates a getDF()-like DataFrame with one row per day
+
+    Args:
+        counts (dict):  cumulative counts of every state, keyed by name
+        feat (str):  column holding the counts, the other one counts up
+
+    Returns:
+        df (DataFrame):  'date', 'state', 'cases' and 'deaths'
+    """
+
+    frames = []
+    for state, values in counts.items():
+        dates = pd.date_range('2021-01-01', periods=len(values)).strftime('%Y-%m-%d')
+        other = np.arange(1, len(values)+1)*10
+        frames.append(pd.DataFrame({'date':dates, 'state':state, 'cases':other, 'deaths':other}))
+        frames[-1][feat] = values
+
+    return pd.concat(frames, ignore_index=True)
+
+@pytest.mark.filterwarnings("error")
+@pytest.mark.parametrize("policy, expected", [('clip', [1, 1, 1, 2, 2]), ('redistribute', [0, 0, 0, 2, 2])])
+def test_drop_from_zero_and_negative_counts(policy, expected):
+    df = frame({'A':[1, 0, -1, 2, 2]})
+
+    assert cs.DataQuality(df).correct(policy)['deaths'].tolist() == expected
+
+@pytest.mark.filterwarnings("error")
+@pytest.mark.parametrize("policy", ['clip', 'redistribute'])
+def test_negative_first_and_last_counts(policy):
+    df = frame({'A':[-3, 4, 6, 5, -2], 'B':[0, 0, 7, 7, 9]})
+
+    corrected = cs.DataQuality(df).correct(policy)
+
+    assert corrected['deaths'].min() >= 0
+    for state, values in corrected.groupby('state')['deaths']:
+        assert (np.diff(values.to_numpy()) >= 0).all()
+    assert corrected[corrected['state'] == 'B']['deaths'].tolist() == [0, 0, 7, 7, 9]
+
+def test_clip_keeps_the_last_count():
+    df = frame({'A':[5, 50, 20, 60, 45]})
+
+    assert cs.DataQuality(df).correct('clip')['deaths'].tolist() == [5, 45, 45, 45, 45]
+
+def test_redistribute_spreads_a_drop_over_earlier_days():
+    df = frame({'A':[10, 20, 30, 40, 50, 20, 60, 70]})
+
+    assert cs.DataQuality(df).correct('redistribute')['deaths'].tolist() == [4, 8, 12, 16, 20, 20, 60, 70]
+
+@pytest.mark.filterwarnings("error")
+@pytest.mark.parametrize("policy", ['clip', 'redistribute'])
+def test_synthetic_revisions(policy):
+    rng = np.random.default_rng(0)
+    cases, deaths = synthetic.dailyCurves(np.full(6, 1e6), 300, rng)
+    synthetic.revise(cases, deaths, 0.05, rng)
+    df = synthetic.longFormat(np.array(["State %d" % num for num in range(6)]), np.arange(6), '2020-03-01',
+                              cases, deaths, 0.0, rng)
+
+    corrected = cs.DataQuality(df).correct(policy)
+    last = df.groupby('state').tail(1).set_index('state')
+
+    for feat in ['cases', 'deaths']:
+        assert corrected[feat].min() >= 0
+        assert corrected.groupby('state')[feat].apply(lambda values: (np.diff(values.to_numpy()) >= 0).all()).all()
+        assert (corrected.groupby('state')[feat].last() == np.maximum(last[feat], 0)).all()
@@ -0,0 +1,58 @@
+import numpy as np
+import covid_stats as cs
+
+""" Checks of DeathLag on windows that cut through a wave, where the
+trend of the window used to pull the lag short. """
+
+def waves(lags, days=600, seed=0):
+    """Generates daily cases over two waves and the deaths following them
+    by 'lags' days
+
+    Args:
+        lags (numpy array):  lag of every state in days
+        days (int):  number of days
+        seed (int):  seed for the random numbers
+
+    Returns:
+        cases (numpy array):  [state, day] daily cases
+        deaths (numpy array):  [state, day] daily deaths
+    """
+
+    rng = np.random.default_rng(seed)
+    n = len(lags)
+    t = np.arange(days+lags.max())
+    rate = np.zeros((n, len(t)))
+    for center, width, height in [(150, 30, 2000), (420, 45, 5000)]:
+        shift = rng.normal(0, 10, size=(n, 1))
+        rate += height*rng.lognormal(0, 0.3, size=(n, 1))*np.exp(-0.5*((t-center-shift)/width)**2)
+    rate *= np.array([1.25, 1.1, 1.0, 1.0, 1.05, 0.6, 0.5])[t % 7]
+    cases = rng.poisson(rate).astype('float64')
+
+    deaths = np.stack([rng.binomial(cases[num, lags.max()-lag:lags.max()-lag+days].astype('int64'), 0.02)
+                       for num, lag in enumerate(lags)]).astype('float64')
+
+    return cases[:, lags.max():], deaths
+
+def test_lag_on_a_window_cut_mid_wave():
+    lags = np.arange(12, 28)
+    cases, deaths = waves(lags)
+    states = np.array(["State %d" % num for num in range(len(lags))])
+
+    # 300 days from just before the peak of the first wave
+    found = cs.DeathLag(states, cases[:, 100:400], deaths[:, 100:400])
+
+    assert not found.fixed
+    assert np.abs(found.lags-lags).max() <= 2
+    assert abs(np.mean(found.lags-lags)) <= 1
+
+def test_short_window_uses_the_fallback_lag():
+    lags = np.full(4, 20)
+    cases, deaths = waves(lags)
+    states = np.array(["State %d" % num for num in range(len(lags))])
+
+    found = cs.DeathLag(states, cases[:, 100:190], deaths[:, 100:190], fallback=18)
+
+    assert found.fixed
+    assert (found.lags == 18).all()
+    assert found.lagDF['lag_fixed'].all()
+    assert np.isfinite(found.lagCFR).all()
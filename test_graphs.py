@@ -0,0 +1,91 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import matplotlib
+matplotlib.use('Agg')
+import covid_stats as cs
+import covid_graphs as cg
+import matplotlib.pyplot as plt
+
+""" Checks that downsampling only thins the plotted line: the statistics
+printed with a graph and the days it highlights stay those of every day. """
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture(scope='module')
+def graph(tmp_path_factory):
+    """Graph of Maryland from June '20 to January '22 on the offline data,
+    with the daily CSV caches written to a temporary directory"""
+
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('stats'))
+    try:
+        data = [os.path.join(here, name) for name in ['us-states.csv', 'nst-est2020.csv',
+                                                      'states-sqmi20.csv', 'unused', 'abbr.csv']]
+        stats = cs.Stats('MD', 1, 6, 22, 20, data=data, offline=True)
+    finally:
+        os.chdir(cwd)
+
+    return cg.Graph(stats.result)
+
+def frame(counts):
+    """Daily deaths as a Stats DataFrame would hold them
+
+    Args:
+        counts (list):  deaths of every day
+
+    Returns:
+        df (DataFrame):  one row per day with 'date' and 'deaths'
+    """
+
+    return pd.DataFrame({'date': pd.date_range('2021-01-01', periods=len(counts)),
+                         'deaths': counts})
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_keeps_the_extreme_days(graph, method):
+    rng = np.random.default_rng(0)
+    counts = rng.poisson(50, size=2000).astype('float64')
+    counts[700] = 400
+    counts[701] = -30
+    counts[1500] = -10
+    df = frame(counts)
+
+    sampled = graph.downsample(df, 'deaths', points=100, method=method)
+    kept = set(sampled['pos'])
+
+    assert {700, 701, 1500}.issubset(kept)
+    # the days around the largest increase and drop
+    assert {699, 700, 701}.issubset(kept)
+    assert (sampled['deaths'].to_numpy() == counts[sampled['pos']]).all()
+
+@pytest.mark.parametrize("downsample", ["lttb", "minmax", "pyramid"])
+def test_downsampled_text_matches_the_daily_text(graph, capsys, monkeypatch, downsample):
+    monkeypatch.chdir(here)
+    df = graph.data.datesDF
+    graph.statsText(df, df.columns[0], df.columns[1])
+    daily = capsys.readouterr().out
+
+    graph.getGraph('info', downsample=downsample, points=60)
+    plt.close("all")
+    shown = capsys.readouterr().out
+
+    assert daily.strip()
+    assert daily in shown
+
+def test_cache_hit_prints_the_same_text(graph, capsys, monkeypatch, tmp_path):
+    monkeypatch.chdir(here)
+    cached = cg.Graph(graph.data, cache=cg.ChartCache(str(tmp_path)))
+    capsys.readouterr()
+
+    shown = []
+    for _ in range(2):
+        for view in ['info', 'monthly']:
+            cached.getGraph(view)
+            plt.close("all")
+            # a cache hit displays the saved chart, or prints its path
+            shown.append([line for line in capsys.readouterr().out.splitlines()
+                          if str(tmp_path) not in line and not line.startswith('<IPython')])
+
+    assert "Largest drop in cases: 22,397.0" in shown[2]
+    assert shown[:2] == shown[2:]
@@ -0,0 +1,95 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import covid_stats as cs
+
+""" Checks that the totals of the rolled up levels and of every month
+range of a WindowSweep add up to those of the states. """
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+states = ['Maryland', 'Virginia', 'Texas', 'Puerto Rico']
+
+def frame(days=120, seed=0):
+    """Generates a getDF()-like DataFrame of a few states, each missing
+    some days
+
+    Args:
+        days (int):  number of days from 2021-01-01
+        seed (int):  seed for the random numbers
+
+    Returns:
+        df (DataFrame):  'date', 'state', 'cases' and 'deaths'
+    """
+
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2021-01-01', periods=days).strftime('%Y-%m-%d')
+    frames = []
+    for state in states:
+        keep = rng.random(days) > 0.1
+        keep[0] = True
+        frames.append(pd.DataFrame({'date':dates, 'state':state,
+                                    'cases':np.cumsum(rng.poisson(500, days)),
+                                    'deaths':np.cumsum(rng.poisson(5, days))})[keep])
+
+    return pd.concat(frames, ignore_index=True)
+
+@pytest.fixture(scope='module')
+def rollup():
+    """Rollup of frame() with the bundled population file"""
+
+    popFile = os.path.join(here, 'nst-est2020.csv')
+
+    return cs.Rollup.fromFrame(frame(), popFile, cs.Populations.fromFiles([popFile]))
+
+def test_levels_add_up_to_their_states(rollup):
+    window = rollup.window(3, 1, 21, 21)
+    stateDF = rollup.table('state', window).set_index('name')
+    inside = stateDF.drop('Puerto Rico')
+
+    nationDF = rollup.table('nation', window)
+    assert nationDF['name'].tolist() == ['United States']
+    assert nationDF['total_cases'][0] == inside['total_cases'].sum()
+    assert nationDF['total_deaths'][0] == inside['total_deaths'].sum()
+    assert nationDF['pop'][0] == inside['pop'].sum()
+
+    divisionDF = rollup.table('division', window).set_index('name')
+    assert divisionDF.loc['South Atlantic', 'total_cases'] == inside.loc[['Maryland', 'Virginia'], 'total_cases'].sum()
+    assert divisionDF.loc['West South Central', 'total_cases'] == inside.loc['Texas', 'total_cases']
+    assert rollup.table('region', window).set_index('name').loc['South', 'total_cases'] == nationDF['total_cases'][0]
+
+    # Puerto Rico stays at the state level only
+    assert stateDF.loc['Puerto Rico', ['division', 'region']].isna().all()
+
+def test_state_totals_match_the_reports(rollup):
+    df = frame()
+    window = rollup.window(2, 2, 21, 21)
+    stateDF = rollup.table('state', window).set_index('name')
+
+    for state, reports in df.groupby('state'):
+        before = reports[reports['date'] < '2021-02-01'].iloc[-1]
+        during = reports[(reports['date'] >= '2021-02-01') & (reports['date'] <= '2021-02-28')]
+        assert stateDF.loc[state, 'total_cases'] == during['cases'].iloc[-1]-before['cases']
+        assert stateDF.loc[state, 'total_deaths'] == during['deaths'].iloc[-1]-before['deaths']
+        assert stateDF.loc[state, 'days'] == len(during)
+
+        daily = rollup.daily('state', state, window)
+        assert daily['date'].tolist() == during['date'].tolist()
+        assert daily['cases'].sum() == stateDF.loc[state, 'total_cases']
+
+@pytest.mark.parametrize("level", ['state', 'division', 'nation'])
+def test_sweep_matches_the_table_of_every_range(rollup, level):
+    sweep = rollup.sweep(level)
+    metrics = cs.WindowSweep.metrics
+
+    for lastmo in range(1, 5):
+        for currmo in range(lastmo, 5):
+            levelDF = rollup.table(level, rollup.window(currmo, lastmo, 21, 21))
+            sweepDF = sweep.table(sweep.window(currmo, lastmo, 21, 21))
+            assert sweepDF['name'].tolist() == levelDF['name'].tolist()
+            pd.testing.assert_frame_equal(sweepDF[metrics], levelDF[metrics], check_dtype=False)
+
+    # ranges ending before they start are left empty
+    assert np.isnan(sweep.values[2, 1]).all()
+    assert (sweep.ranks[2, 1] == 0).all()
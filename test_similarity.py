@@ -0,0 +1,66 @@
+import numpy as np
+import covid_stats as cs
+
+""" Checks that Similarity scores scaled and shifted curves as alike and
+orders similar curves next to each other. """
+
+def curves(days=300, seed=0):
+    """Generates noisy daily curves of two shapes, scaled and shifted
+
+    Args:
+        days (int):  number of days
+        seed (int):  seed for the random numbers
+
+    Returns:
+        names (numpy array):  name of every curve
+        values (numpy array):  [curve, day] daily values
+    """
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    early = np.exp(-0.5*((t-80)/20)**2)
+    late = np.exp(-0.5*((t-220)/25)**2)
+    shapes = {'early':early, 'early x10':10*early, 'early +5':np.roll(early, 5),
+              'late':late, 'late x3':3*late, 'late +5':np.roll(late, 5)}
+    names = np.array(['early', 'late', 'early x10', 'late x3', 'early +5', 'late +5'])
+    values = np.stack([1000*shapes[name]+rng.normal(0, 1, days) for name in names])
+
+    return names, values
+
+def test_scaled_curves_correlate():
+    names, values = curves()
+
+    found = cs.Similarity(names, [values])
+    row = {name:num for num, name in enumerate(names)}
+
+    assert found.matrix[row['early'], row['early x10']] > 0.99
+    assert found.matrix[row['late'], row['late x3']] > 0.99
+    assert found.matrix[row['early'], row['late']] < 0.1
+    assert np.allclose(found.matrix, found.matrix.T)
+    assert (np.diag(found.matrix) == 1).all()
+
+def test_order_keeps_clusters_together():
+    names, values = curves()
+
+    found = cs.Similarity(names, [values])
+    order = found.order(2)
+    groups = [name.split()[0] for name in order]
+
+    assert sorted(order) == sorted(names)
+    assert groups == sorted(groups, key=groups[0].__ne__)
+    # every cluster starts at its medoid
+    clusterDF = found.table(2)
+    assert clusterDF.groupby('cluster')['medoid'].first().tolist() == clusterDF.groupby('cluster')['name'].first().tolist()
+    assert (clusterDF['cluster'].diff().dropna() >= 0).all()
+
+def test_lag_finds_the_shift():
+    names, values = curves()
+    row = {name:num for num, name in enumerate(names)}
+
+    found = cs.Similarity(names, [values], lag=10, block=4)
+
+    assert found.lags[row['early +5'], row['early']] == 5
+    assert found.lags[row['early'], row['early +5']] == -5
+    assert found.lags[row['late +5'], row['late x3']] == 5
+    assert found.matrix[row['early +5'], row['early']] > 0.99
+    assert np.allclose(cs.Similarity(names, [values], lag=10).matrix, found.matrix)
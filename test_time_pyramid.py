@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+import covid_stats as cs
+
+""" Checks that every level of a TimePyramid sums the daily counts of
+its buckets, leaving out days without a report. """
+
+def daily(days=200, seed=0):
+    """Generates daily counts of two states with missing days
+
+    Args:
+        days (int):  number of days from 2021-01-01
+        seed (int):  seed for the random numbers
+
+    Returns:
+        states (numpy array):  name of every state
+        dates (numpy array):  datetime64[D] dates
+        cases (numpy array):  [state, day] daily cases, NaN when missing
+        deaths (numpy array):  [state, day] daily deaths, NaN when missing
+    """
+
+    rng = np.random.default_rng(seed)
+    states = np.array(['A', 'B'])
+    dates = np.arange(np.datetime64('2021-01-01'), np.datetime64('2021-01-01')+days)
+    cases = rng.poisson(100, (2, days)).astype('float64')
+    deaths = rng.poisson(2, (2, days)).astype('float64')
+    missing = rng.random((2, days)) < 0.2
+    # nothing reported by B during the week of Monday 2021-03-01
+    missing[1, 59:66] = True
+    cases[missing] = np.nan
+    deaths[missing] = np.nan
+
+    return states, dates, cases, deaths
+
+@pytest.mark.parametrize("level, freq", [('week', 'W-SUN'), ('month', 'M'), ('quarter', 'Q')])
+def test_levels_sum_the_daily_counts(level, freq):
+    states, dates, cases, deaths = daily()
+    pyramid = cs.TimePyramid(states, dates, cases, deaths)
+
+    for row, state in enumerate(states):
+        df = pd.DataFrame({'cases':cases[row], 'deaths':deaths[row]}, index=pd.DatetimeIndex(dates))
+        df = df.dropna()
+        # weeks ending on Sunday start on Monday
+        start = df.index.to_period(freq).start_time
+        expected = df.groupby(start).agg(['sum', 'count'])
+        found = pyramid.table(level, state)
+
+        assert found['date'].tolist() == expected.index.strftime('%Y-%m-%d').tolist()
+        assert found['cases'].tolist() == expected[('cases', 'sum')].tolist()
+        assert found['deaths'].tolist() == expected[('deaths', 'sum')].tolist()
+        assert found['days'].tolist() == expected[('cases', 'count')].tolist()
+        assert (found['first'] >= found['date']).all()
+
+def test_buckets_without_reports():
+    states, dates, cases, deaths = daily()
+    pyramid = cs.TimePyramid(states, dates, cases, deaths)
+    week = pyramid.pyramid['week']
+    column = np.flatnonzero(week['start'] == np.datetime64('2021-03-01'))[0]
+
+    assert week['days'][1, column] == 0
+    assert np.isnan(week['cases'][1, column])
+    assert week['first'][1, column] == -1
+    assert '2021-03-01' not in pyramid.table('week', 'B')['date'].tolist()
+    assert '2021-03-01' in pyramid.table('week', 'A')['date'].tolist()
+
+def test_query_picks_the_coarsest_level_filling_the_chart():
+    states, dates, cases, deaths = daily(days=400)
+    pyramid = cs.TimePyramid(states, dates, cases, deaths)
+
+    assert pyramid.pick(5) == 'quarter'
+    assert pyramid.pick(14) == 'month'
+    assert pyramid.pick(50) == 'week'
+    assert pyramid.pick(500) == 'day'
+
+    level, pyramidDF = pyramid.query('A', 5, start='2021-03-01', end='2021-06-30')
+    assert level == 'week'
+    assert pyramidDF['date'].min() >= '2021-03-01'
+    assert pyramidDF['date'].max() <= '2021-06-30'
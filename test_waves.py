@@ -0,0 +1,60 @@
+import numpy as np
+import covid_stats as cs
+
+""" Checks that Waves finds the peaks and troughs of smoothed curves and
+drops bumps that do not stand out. """
+
+def curves(shape, days=500):
+    """Generates smooth daily curves made of Gaussian waves
+
+    Args:
+        shape (list):  one list of (center, width, height) waves per state
+        days (int):  number of days from 2021-01-01
+
+    Returns:
+        states (numpy array):  name of every state
+        dates (numpy array):  datetime64[D] dates
+        values (numpy array):  [state, day] daily values
+    """
+
+    t = np.arange(days)
+    values = np.zeros((len(shape), days))
+    for row, waves in enumerate(shape):
+        for center, width, height in waves:
+            values[row] += height*np.exp(-0.5*((t-center)/width)**2)
+    states = np.array(["State %d" % num for num in range(len(shape))])
+
+    return states, np.arange(np.datetime64('2021-01-01'), np.datetime64('2021-01-01')+days), values
+
+def test_two_waves_and_the_trough_between():
+    states, dates, values = curves([[(100, 20, 500), (350, 30, 2000)], [(250, 25, 800)]])
+
+    found = cs.Waves(states, dates, values, values)
+    first = found.forState('State 0')
+    second = found.forState('State 1')
+
+    assert first['wave'].tolist() == [1, 2]
+    assert first['peak'].tolist() == [str(dates[100]), str(dates[350])]
+    # the lowest day between the peaks ends one wave and starts the next
+    trough = 100+np.argmin(values[0, 100:350])
+    assert first['end'][0] == first['start'][1] == str(dates[trough])
+    assert first['start'][0] == str(dates[0])
+    assert first['end'][1] == str(dates[-1])
+    assert abs(first['total'].sum()-values[0].sum()) < 1e-6*values[0].sum()
+
+    assert second['peak'].tolist() == [str(dates[250])]
+
+def test_small_bumps_are_dropped():
+    # a bump on the shoulder of a wave and one below minHeight
+    states, dates, values = curves([[(200, 40, 1000), (280, 5, 60), (450, 10, 10)]])
+
+    found = cs.Waves(states, dates, values, values)
+
+    assert found.forState('State 0')['peak'].tolist() == [str(dates[200])]
+
+def test_small_early_wave_next_to_a_large_one():
+    states, dates, values = curves([[(80, 15, 100), (300, 30, 5000)]])
+
+    found = cs.Waves(states, dates, values, values)
+
+    assert found.forState('State 0')['peak'].tolist() == [str(dates[80]), str(dates[300])]